@@ -1,23 +1,27 @@
 import argparse
+import io
+import random
+import re
 import sqlite3
+import string
 import sys
 import time
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Tuple, Union
 
 from vgdb import VGDB_FILE_SUFFIX
+from vgdb.codec import RowCodec
 from vgdb.evaluator import Evaluator
 from vgdb.get_tables import get_tables
 from vgdb.lexer import Lexer
 from vgdb.parser import Parser
-from vgdb.table import Table
+from vgdb.storage import ReadMode, read_int, read_null_terminated_string
+from vgdb.table import StorageType, Table, create_like_key
+from vgdb.writer import Durability, WritePolicy
 
 
 def run_command(evaluator: Evaluator, sql_string: str) -> Union[str, List[List[Union[str, int]]]]:
-    lexer = Lexer(program=sql_string)
-    parser = Parser(lexer=lexer)
-    commands = list(parser.parse())
-    return evaluator.handle_command(commands[0])
+    return evaluator.execute(sql_string)
 
 
 def time_command(sql_string: str) -> None:
@@ -53,22 +57,24 @@ def read_words() -> List[str]:
     return words
 
 
-def insert_words(evaluator: Evaluator, table: str, words: List[str]) -> None:
-    for i, word in enumerate(words):
-        command = f"INSERT INTO {table} VALUES ({i}, '{word}')"
-        run_command(evaluator, command)
+def insert_words(evaluator: Evaluator, table: str, words: List[str], rows_per_insert: int = 1) -> None:
+    for start in range(0, len(words), rows_per_insert):
+        end = min(start + rows_per_insert, len(words))
+        statement = evaluator.prepare(f"INSERT INTO {table} VALUES " + ", ".join(["(?, ?)"] * (end - start)))
+        evaluator.execute(statement, [value for i in range(start, end) for value in (i, words[i])])
 
 
-def run_insert_benchmark(table: str) -> None:
+def run_insert_benchmark(table: str, durability: Durability, rows_per_insert: int) -> None:
     create_table(table)
-    evaluator = Evaluator(tables=get_tables())
+    evaluator = Evaluator(tables=get_tables(write_policy=WritePolicy(durability=durability)))
     words = read_words()
     n = len(words)
-    insert_printout = f"Inserting {n} records... (to disk)"
+    insert_printout = f"Inserting {n} records... (to disk, {durability.value}, {rows_per_insert} per INSERT)"
     print(f"{insert_printout:<70}", end="")
     sys.stdout.flush()
     start = time.time()
-    insert_words(evaluator, table, words)
+    insert_words(evaluator, table, words, rows_per_insert)
+    evaluator.flush()
     elapsed = time.time() - start
     print(f"{elapsed:>10.5f} seconds")
 
@@ -135,10 +141,10 @@ def sqlite_bench() -> None:
     delete_db(db_name)
 
 
-def insert() -> None:
+def insert(durability: Durability, rows_per_insert: int) -> None:
     insert_db_name = "bench_insert"
     try:
-        run_insert_benchmark(insert_db_name)
+        run_insert_benchmark(insert_db_name, durability, rows_per_insert)
     except Exception as e:
         print(e)
     finally:
@@ -164,6 +170,142 @@ def select() -> None:
     run_select_benchmark(table_name)
 
 
+def random_words(n: int) -> List[str]:
+    rng = random.Random(0)
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 15))) for _ in range(n)]
+
+
+def decode_byte_at_a_time(data: bytes) -> List[List[Union[int, str]]]:
+    f = io.BytesIO(data)
+    rows: List[List[Union[int, str]]] = []
+    while f.tell() < len(data):
+        rows.append([read_int(f), read_null_terminated_string(f)])
+    return rows
+
+
+def time_decoder(description: str, decode: Callable[[bytes], List[List[Union[int, str]]]], data: bytes) -> None:
+    start = time.time()
+    rows = decode(data)
+    elapsed = time.time() - start
+    megabytes_per_second = len(data) / elapsed / 1_000_000
+    print(f"{description:<50}{len(rows):>10} rows{elapsed:>10.5f} seconds{megabytes_per_second:>8.1f} MB/s")
+
+
+def codec() -> None:
+    n = 235886
+    codec = RowCodec((int, str))
+    data = codec.encode_many([[i, word] for i, word in enumerate(random_words(n))])
+    time_decoder("Decoding one byte at a time", decode_byte_at_a_time, data)
+    time_decoder("Decoding with RowCodec", lambda d: list(codec.iter_file(io.BytesIO(d))), data)
+
+
+def wide_scan(storage_type: StorageType, n: int) -> None:
+    name = f"bench_wide_{storage_type}"
+    letters = string.ascii_lowercase[:8]
+    columns = [(f"number_{c}", int) for c in letters] + [(f"words_{c}", str) for c in letters]
+    table = Table(name=name, columns=columns, storage_type=storage_type)
+    table.persist()
+    try:
+        words = random_words(n)
+        table.insert_many([[i + j for j in range(8)] + [words[(i + j) % n] for j in range(8)] for i in range(n)])
+        evaluator = Evaluator(tables={name: table})
+        sql_string = f"SELECT number_a FROM {name} WHERE number_a > 5"
+        start = time.time()
+        run_command(evaluator, sql_string)
+        elapsed = time.time() - start
+        print(f"{sql_string:<70}{elapsed:>10.5f} seconds")
+    finally:
+        table.delete()
+
+
+def columnar() -> None:
+    n = 100_000
+    wide_scan("persistent", n)
+    wide_scan("columnar", n)
+
+
+def time_scans(read_mode: ReadMode, name: str, scans: int) -> None:
+    table = Table.from_file(name, read_mode=read_mode)
+    start = time.time()
+    for _ in range(scans):
+        for _ in table.all_rows():
+            pass
+    elapsed = time.time() - start
+    printout = f"{scans} full scans ({read_mode})"
+    print(f"{printout:<70}{elapsed:>10.5f} seconds")
+
+
+def mmap_scans() -> None:
+    name = "bench_scan"
+    table = Table(name=name, columns=[("number", int), ("words", str)])
+    table.persist()
+    try:
+        table.insert_many([[i, word] for i, word in enumerate(random_words(235886))])
+        read_modes: Tuple[ReadMode, ...] = ("buffered", "mmap")
+        for read_mode in read_modes:
+            time_scans(read_mode, name, scans=5)
+    finally:
+        table.delete()
+
+
+def create_like_key_with_capture_groups(like: str) -> Callable[[str], bool]:
+    pattern = "^"
+    for i in like:
+        if i == "%":
+            pattern += "(.*)"
+        elif i == "_":
+            pattern += "(.){1}"
+        else:
+            pattern += i
+    pattern += "$"
+    regex_rule = re.compile(pattern)
+
+    def f(cell: str) -> bool:
+        return regex_rule.search(cell) is not None
+
+    return f
+
+
+def like() -> None:
+    words = random_words(235886)
+    for pattern in ("abc", "a%", "%ing", "%foo%", "a%b", "a_c%"):
+        for description, compile_like in (
+            ("capture groups", create_like_key_with_capture_groups),
+            ("compiled", create_like_key),
+        ):
+            start = time.time()
+            key = compile_like(pattern)
+            matches = sum(1 for word in words if key(word))
+            elapsed = time.time() - start
+            printout = f"LIKE '{pattern}' ({description}, {matches} matches)"
+            print(f"{printout:<70}{elapsed:>10.5f} seconds")
+
+
+def sql_script(n: int) -> str:
+    words = random_words(n)
+    statements = []
+    for i, word in enumerate(words):
+        statements.append(f"INSERT INTO bench_parse VALUES ({i}, '{word}'), ({i + 1}, '{word[::-1]}')")
+        if i % 10 == 0:
+            statements.append(f"SELECT number FROM bench_parse WHERE words LIKE '{word[:2]}%' ORDER BY number LIMIT 5")
+    return ";\n".join(statements) + ";"
+
+
+def time_script(description: str, run: Callable[[str], int], script: str) -> None:
+    start = time.time()
+    count = run(script)
+    elapsed = time.time() - start
+    megabytes_per_second = len(script) / elapsed / 1_000_000
+    print(f"{description:<50}{count:>10} items{elapsed:>10.5f} seconds{megabytes_per_second:>8.1f} MB/s")
+
+
+def lex_and_parse() -> None:
+    script = sql_script(235886)
+    print(f"{len(script) / 1_000_000:.1f} MB script")
+    time_script("Tokenizing", lambda s: sum(1 for _ in Lexer(program=s).tokens()), script)
+    time_script("Parsing", lambda s: sum(1 for _ in Parser(lexer=Lexer(program=s)).parse()), script)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group()
@@ -171,20 +313,38 @@ def main() -> None:
     group.add_argument("--memory", action="store_true")
     group.add_argument("--select", action="store_true")
     group.add_argument("--sqlite", action="store_true")
+    group.add_argument("--codec", action="store_true")
+    group.add_argument("--columnar", action="store_true")
+    group.add_argument("--mmap", action="store_true")
+    group.add_argument("--like", action="store_true")
+    group.add_argument("--parse", action="store_true")
+    parser.add_argument("--durability", choices=[d.value for d in Durability], default=Durability.STATEMENT.value)
+    parser.add_argument("--rows-per-insert", type=int, default=1)
     args = parser.parse_args()
+    durability = Durability(args.durability)
     if args.insert:
-        insert()
+        insert(durability, args.rows_per_insert)
     if args.memory:
         insert_in_memory()
     elif args.select:
         select()
     elif args.sqlite:
         sqlite_bench()
+    elif args.codec:
+        codec()
+    elif args.columnar:
+        columnar()
+    elif args.mmap:
+        mmap_scans()
+    elif args.like:
+        like()
+    elif args.parse:
+        lex_and_parse()
     else:
         print()
         print("VGDB")
         print()
-        insert()
+        insert(durability, args.rows_per_insert)
         insert_in_memory()
         select()
         print()
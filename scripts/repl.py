@@ -2,11 +2,11 @@ import readline  # noqa
 import sys
 from typing import List, Optional, Union
 
+from vgdb.catalog import Catalog
 from vgdb.evaluator import Evaluator
-from vgdb.get_tables import get_tables
 from vgdb.lexer import Lexer
 from vgdb.parser import Parser
-from vgdb.statement import CreateTable, Insert, Select
+from vgdb.statement import CreateIndex, CreateTable, Explain, Insert, Select
 
 
 def copy_nested_list(lst: List[List[str]]) -> List[List[str]]:
@@ -53,6 +53,7 @@ def prompt_with_color() -> str:
 
 
 def repl() -> None:
+    catalog = Catalog()
     while True:
         try:
             user_input = input(prompt_with_color())
@@ -62,7 +63,7 @@ def repl() -> None:
             break
         lexer = Lexer(program=user_input)
         parser = Parser(lexer=lexer)
-        commands: List[Optional[Union[CreateTable, Insert, Select]]] = []
+        commands: List[Optional[Union[CreateTable, CreateIndex, Insert, Select, Explain]]] = []
         try:
             commands = list(parser.parse())
         except ValueError as e:
@@ -74,7 +75,7 @@ def repl() -> None:
             if command is None:
                 continue
             try:
-                tables = get_tables()
+                tables = catalog.refresh()
                 evaluator = Evaluator(tables=tables)
                 result = evaluator.handle_command(command)
             except ValueError as e:
@@ -0,0 +1,29 @@
+from vgdb.batch import Batch, batched_blocks, batched_rows
+
+
+class TestBatch:
+    def test_to_rows(self):
+        batch = Batch(columns=[["a", "b", "c"], None, [1, 2, 3]], length=3)
+        assert batch.to_rows() == [["a", None, 1], ["b", None, 2], ["c", None, 3]]
+
+    def test_to_rows_with_selection(self):
+        batch = Batch(columns=[["a", "b", "c"], [1, 2, 3]], length=3, selection=[0, 2])
+        assert len(batch) == 2
+        assert batch.to_rows() == [["a", 1], ["c", 3]]
+
+    def test_from_rows_with_columns(self):
+        batch = Batch.from_rows([["a", None, 1], ["b", None, 2]], 3, columns=[2])
+        assert batch.columns == [None, None, [1, 2]]
+        assert batch.to_rows() == [[None, None, 1], [None, None, 2]]
+
+    def test_batched_rows(self):
+        rows = [[i, str(i)] for i in range(10)]
+        batches = list(batched_rows(rows, 2, batch_size=4))
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert [row for batch in batches for row in batch.to_rows()] == rows
+
+    def test_batched_blocks(self):
+        blocks = [[[i] for i in range(start, start + 3)] for start in range(0, 9, 3)]
+        batches = list(batched_blocks(blocks, 1, batch_size=4))
+        assert [len(batch) for batch in batches] == [6, 3]
+        assert [row for batch in batches for row in batch.to_rows()] == [[i] for i in range(9)]
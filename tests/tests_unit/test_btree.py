@@ -0,0 +1,72 @@
+from itertools import islice
+
+import pytest
+
+from vgdb.btree import LEAF_CAPACITY, BTree
+from vgdb.index import BTreeIndex
+from vgdb.where import Predicate, Where
+
+
+@pytest.fixture
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestBTree:
+    def test_create_and_range(self, tmp_path):
+        tree = BTree(tmp_path / "t")
+        entries = [(i % 100, i) for i in range(5000)]
+        tree.create(entries, end=5000)
+        assert list(tree.range()) == sorted(entries)
+        assert list(tree.range(10, 11)) == sorted(e for e in entries if 10 <= e[0] <= 11)
+        assert list(tree.range(11, 10)) == []
+
+    def test_insert_splits_nodes(self, tmp_path):
+        tree = BTree(tmp_path / "t")
+        tree.create([], end=0)
+        entries = [((i * 7919) % 10007, i) for i in range(LEAF_CAPACITY * 50)]
+        tree.insert_many(entries, end=len(entries))
+        assert list(tree.range()) == sorted(entries)
+        assert list(tree.range(low=5000, high=5000)) == sorted(e for e in entries if e[0] == 5000)
+
+    def test_reopen(self, tmp_path):
+        tree = BTree(tmp_path / "t")
+        tree.create([(1, 0)], end=10)
+        tree.insert_many([(i, i) for i in range(2000)], end=20)
+        reopened = BTree(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.end == 20
+        assert list(reopened.range(1, 1)) == [(1, 0), (1, 1)]
+        assert len(list(reopened.range())) == 2001
+
+    def test_open_missing(self, tmp_path):
+        assert not BTree(tmp_path / "t").open()
+
+    def test_descending_keeps_location_order_of_equal_keys(self, tmp_path):
+        tree = BTree(tmp_path / "t")
+        tree.create([(1, 0), (2, 1), (1, 2), (2, 3)], end=4)
+        assert list(tree.descending()) == [(2, 1), (2, 3), (1, 0), (1, 2)]
+
+    def test_descending_reads_leaves_from_the_last(self, tmp_path):
+        tree = BTree(tmp_path / "t")
+        entries = [(i // 3, i) for i in range(LEAF_CAPACITY * 40)]
+        tree.create(entries, end=len(entries))
+        expected = sorted(entries, key=lambda entry: (-entry[0], entry[1]))
+        reopened = BTree(tmp_path / "t")
+        assert reopened.open()
+        assert list(islice(reopened.descending(), 5)) == expected[:5]
+        assert len(reopened._nodes) <= 4
+        assert list(reopened.descending()) == expected
+
+
+class TestBTreeIndex:
+    def test_lookup(self, in_tmp_path):
+        index = BTreeIndex("a", "a_b", "b", int)
+        index.build([(i, i * 10) for i in range(10)], end=100)
+        assert list(index.lookup(Where("b", Predicate.EQUALS, 3))) == [30]
+        assert list(index.lookup(Where("b", Predicate.LT, 2))) == [0, 10]
+        assert list(index.lookup(Where("b", Predicate.GTEQ, 8))) == [80, 90]
+        assert list(index.lookup(Where("b", Predicate.GT, -5))) == [i * 10 for i in range(10)]
+        assert list(index.lookup(Where("b", Predicate.LT, 0))) == []
+        assert index.lookup(Where("b", Predicate.NOT_EQUALS, 3)) is None
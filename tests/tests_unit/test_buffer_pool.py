@@ -0,0 +1,36 @@
+import pytest
+
+from vgdb.buffer_pool import BufferPool
+
+
+class TestBufferPool:
+    def test_capacity_must_be_positive(self):
+        with pytest.raises(ValueError):
+            BufferPool(capacity=0)
+
+    def test_hits_and_misses(self):
+        pool = BufferPool(capacity=2)
+        assert pool.get(("a", 1), lambda: ((1,),)) == ((1,),)
+        assert pool.get(("a", 1), lambda: ((2,),)) == ((1,),)
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        pool = BufferPool(capacity=2)
+        pool.get(("a", 1), lambda: ())
+        pool.get(("a", 2), lambda: ())
+        pool.get(("a", 1), lambda: ())
+        pool.get(("a", 3), lambda: ())
+        assert len(pool) == 2
+        assert pool.evictions == 1
+        pool.get(("a", 1), lambda: ())
+        assert pool.hits == 2
+        pool.get(("a", 2), lambda: ())
+        assert pool.misses == 4
+
+    def test_invalidate_file(self):
+        pool = BufferPool(capacity=4)
+        pool.get(("a", 1), lambda: ())
+        pool.get(("b", 1), lambda: ())
+        pool.invalidate_file("a")
+        assert len(pool) == 1
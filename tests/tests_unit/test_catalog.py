@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from vgdb.catalog import Catalog
+from vgdb.table import Table
+
+
+@pytest.fixture
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCatalog:
+    def test_finds_tables(self, in_tmp_path):
+        Table(name="a", columns=[("b", str)]).persist()
+        Table(name="b", columns=[("c", int)], storage_type="paged").persist()
+        (in_tmp_path / "not_a_table.txt").write_text("")
+        tables = Catalog().refresh()
+        assert sorted(tables) == ["a", "b"]
+        assert tables["b"].storage_type == "paged"
+
+    def test_reads_headers_only_once(self, in_tmp_path):
+        Table(name="a", columns=[("b", str)]).persist()
+        catalog = Catalog()
+        table = catalog.refresh()["a"]
+        assert catalog.refresh()["a"] is table
+        assert catalog.headers_read == 1
+
+    def test_notices_changed_files(self, in_tmp_path):
+        Table(name="a", columns=[("b", str)]).persist()
+        catalog = Catalog()
+        table = catalog.refresh()["a"]
+        table.insert(["hei"])
+        assert catalog.refresh()["a"] is table
+        assert catalog.headers_read == 2
+        touch_later(in_tmp_path / "a.vgdb")
+        assert catalog.refresh()["a"] is table
+        assert catalog.headers_read == 3
+
+    def test_notices_new_and_deleted_tables(self, in_tmp_path):
+        catalog = Catalog()
+        assert catalog.refresh() == {}
+        Table(name="a", columns=[("b", str)]).persist()
+        assert list(catalog.refresh()) == ["a"]
+        (in_tmp_path / "a.vgdb").unlink()
+        assert catalog.refresh() == {}
+
+    def test_replaced_schema(self, in_tmp_path):
+        Table(name="a", columns=[("b", str)]).persist()
+        catalog = Catalog()
+        table = catalog.refresh()["a"]
+        (in_tmp_path / "a.vgdb").unlink()
+        Table(name="a", columns=[("b", int), ("c", str)]).persist()
+        touch_later(in_tmp_path / "a.vgdb")
+        new_table = catalog.refresh()["a"]
+        assert new_table is not table
+        assert new_table.columns == "(b int, c text)"
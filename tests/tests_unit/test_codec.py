@@ -0,0 +1,72 @@
+import io
+
+import pytest
+
+from vgdb.codec import RowCodec
+
+
+@pytest.fixture
+def codec():
+    return RowCodec((int, int, str, int))
+
+
+class TestRowCodec:
+    def test_roundtrip(self, codec):
+        rows = [[1, 2, "a", 3], [4, 5, "", 6], [2_147_483_647, 0, "abc def", 7]]
+        assert codec.decode(codec.encode_many(rows)) == (rows, len(codec.encode_many(rows)))
+
+    def test_encoding_matches_file_format(self):
+        assert RowCodec((int, str)).encode([1, "hei"]) == b"\x01\x00\x00\x00hei\x00"
+
+    def test_encode_errors(self, codec):
+        with pytest.raises(ValueError):
+            codec.encode([1, 2, "a"])
+        with pytest.raises(ValueError):
+            codec.encode(["a", 2, "a", 3])
+        with pytest.raises(ValueError):
+            codec.encode([2 ** 32, 2, "a", 3])
+
+    def test_decode_stops_at_incomplete_row(self, codec):
+        data = codec.encode([1, 2, "a", 3]) + codec.encode([4, 5, "b", 6])[:-1]
+        rows, pos = codec.decode(data)
+        assert rows == [[1, 2, "a", 3]]
+        assert pos == len(codec.encode([1, 2, "a", 3]))
+
+    def test_iter_file_across_chunks(self, codec):
+        rows = [[i, i, "x" * (i % 7), i] for i in range(100)]
+        f = io.BytesIO(codec.encode_many(rows))
+        assert list(codec.iter_file(f, chunk_size=10)) == rows
+
+    def test_iter_file_incomplete(self, codec):
+        f = io.BytesIO(codec.encode([1, 2, "a", 3])[:-2])
+        with pytest.raises(ValueError):
+            list(codec.iter_file(f))
+
+    def test_iter_buffer_with_rows_larger_than_window(self):
+        codec = RowCodec((str,))
+        rows = [["x" * 50], ["y"], ["z" * 30]]
+        data = b"header" + codec.encode_many(rows)
+        assert list(codec.iter_buffer(data, 6, len(data), chunk_size=8)) == rows
+
+    def test_row_filter_decodes_other_cells_only_for_accepted_rows(self, codec):
+        rows = [[i, i * 2, f"x{i}", i * 3] for i in range(10)]
+        seen = []
+
+        def matches(row):
+            seen.append(list(row))
+            return row[0] % 4 == 0
+
+        data = codec.encode_many(rows)
+        assert list(codec.iter_buffer(data, 0, len(data), row_filter=([0], matches))) == rows[::4]
+        assert seen == [[i, i * 2, None, None] for i in range(10)]
+        f = io.BytesIO(data)
+        assert list(codec.iter_file(f, chunk_size=7, row_filter=([2], lambda row: row[2] == "x3"))) == [rows[3]]
+
+    def test_columns_skip_other_cells(self, codec):
+        rows = [[i, i * 2, f"x{i}", i * 3] for i in range(10)]
+        data = codec.encode_many(rows)
+        assert list(codec.iter_buffer(data, 0, len(data), columns=[3])) == [[None, None, None, r[3]] for r in rows]
+        f = io.BytesIO(data)
+        assert list(codec.iter_file(f, chunk_size=5, columns=[2])) == [[None, None, r[2], None] for r in rows]
+        row_filter = ([0], lambda row: row[0] == 4)
+        assert list(codec.iter_buffer(data, 0, len(data), columns=[2], row_filter=row_filter)) == [[4, 8, "x4", None]]
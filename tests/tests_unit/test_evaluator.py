@@ -7,6 +7,10 @@ from vgdb.statement import CreateTable, Insert, Select
 from vgdb.table import Table
 
 
+def run(evaluator, program):
+    return evaluator.handle_command(next(Parser(lexer=Lexer(program=program)).parse()))
+
+
 class TestEvaluator:
     def test_eval_persistent(self):
         user_input = "select * from family"
@@ -33,3 +37,84 @@ class TestEvaluator:
         result = evaluator.handle_command(commands[0])
         assert len(result) > 10
         assert result[0] == ["vegard", 26]
+
+    def test_eval_columnar(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("a", int), ("b", str), ("c", int)], storage_type="columnar")
+        table.persist()
+        table.insert_many([[1, "x", 3], [2, "y", 2], [3, "z", 1]])
+        evaluator = Evaluator(tables={"c": table})
+        assert run(evaluator, "select b from c where a > 1 order by c") == [["z"], ["y"]]
+
+    def test_eval_create_index(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("a", int), ("b", str)])
+        table.persist()
+        table.insert_many([[i % 10, str(i)] for i in range(100)])
+        evaluator = Evaluator(tables={"c": table})
+
+        assert run(evaluator, "create index c_a on c (a)") == "Created index c_a on c (a)."
+        assert run(evaluator, "insert into c values (3, 'new')") == "OK"
+        assert run(evaluator, "select b from c where a = 3") == [[str(i)] for i in range(3, 100, 10)] + [["new"]]
+        assert run(evaluator, "select a from c where a >= 8 order by a desc limit 3") == [[9], [9], [9]]
+        assert run(evaluator, "select b from c order by a limit 2") == [["0"], ["10"]]
+
+    def test_eval_order_by_with_limit_and_offset(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("a", int), ("b", str)])
+        table.persist()
+        table.insert_many([[(i * 7) % 20, str(i)] for i in range(20)] + [[5, "tie"]])
+        evaluator = Evaluator(tables={"c": table})
+
+        assert run(evaluator, "select a, b from c order by a limit 3 offset 4") == [[4, "12"], [5, "15"], [5, "tie"]]
+        assert run(evaluator, "select a from c order by a desc limit 2") == [[19], [18]]
+
+    def test_eval_order_by_spills_to_disk(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("a", int), ("b", str), ("c", str)])
+        table.persist()
+        table.insert_many([[(i * 7) % 50, str(i), "x"] for i in range(50)])
+        table.sort_memory_budget = 64
+        evaluator = Evaluator(tables={"c": table})
+        assert run(evaluator, "select b from c order by a") == [[str((i * 43) % 50)] for i in range(50)]
+        assert table.sort_counters.runs_spilled > 1
+
+    def test_eval_explain(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("a", int), ("b", str)])
+        table.persist()
+        table.insert_many([[i % 10, str(i)] for i in range(100)])
+        table.create_index(name="c_a", column="a")
+        evaluator = Evaluator(tables={"c": table})
+
+        plan = run(evaluator, "explain select b from c where b like '1%' order by a desc limit 2 offset 1")
+        assert plan.split("\n") == [
+            "Project b",
+            "  Limit 2 offset 1",
+            "    Filter b like '1%'",
+            "      Index scan c using c_a columns a, b",
+        ]
+        plan = run(evaluator, "explain select b from c where a = 3 and b != '3'")
+        assert plan.split("\n") == [
+            "Project b",
+            "  Filter a = 3 and b != '3'",
+            "    Index scan c using c_a columns a, b",
+        ]
+        lines = run(evaluator, "explain analyze select a from c where b like '1%' order by b limit 3").split("\n")
+        assert lines[0].startswith("Project a (rows in=3 rows out=3 ")
+        assert lines[1].startswith("  Limit 3 (rows in=3 rows out=3 ")
+        assert lines[2].startswith("    Sort b top 3 (rows in=11 rows out=3 ")
+        assert lines[3].startswith("      Scan c persistent columns a, b where b like '1%' (rows out=11 ")
+        assert int(lines[3].split("bytes read=")[1].rstrip(")")) > 0
+        assert lines[4].startswith("Execution time: ")
+
+    def test_eval_order_by_column_with_trigram_index(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        table = Table(name="c", columns=[("w", str)])
+        table.persist()
+        table.insert_many([["zabcx"], ["yabcx"], ["abc"], ["xyz"], ["aabcz"]])
+        table.create_index(name="c_w", column="w", kind="trigram")
+        evaluator = Evaluator(tables={"c": table})
+        expected = [["aabcz"], ["abc"], ["yabcx"], ["zabcx"]]
+        assert run(evaluator, "select w from c where w like '%abc%' order by w") == expected
+        assert run(evaluator, "select w from c where w like '%abc%' order by w desc limit 2") == expected[::-1][:2]
@@ -0,0 +1,29 @@
+from operator import itemgetter
+
+from vgdb.external_sort import ExternalSort
+
+
+class TestExternalSort:
+    def test_sorts_in_memory_within_budget(self):
+        external_sort = ExternalSort((int, str), key=itemgetter(0))
+        assert list(external_sort.sort([[3, "c"], [1, "a"], [2, "b"]])) == [[1, "a"], [2, "b"], [3, "c"]]
+        assert external_sort.counters.runs_spilled == 0
+
+    def test_spills_runs_and_merges_them(self):
+        rows = [[(i * 37) % 100, f"row{i}"] for i in range(100)]
+        external_sort = ExternalSort((int, str), key=itemgetter(0), memory_budget=50)
+        assert list(external_sort.sort(rows)) == sorted(rows, key=itemgetter(0))
+        assert external_sort.counters.runs_spilled > 1
+        assert 0 < external_sort.counters.bytes_written <= sum(4 + len(row[1]) + 1 for row in rows)
+
+    def test_ties_keep_input_order(self):
+        rows = [[i % 3, str(i)] for i in range(30)]
+        external_sort = ExternalSort((int, str), key=itemgetter(0), memory_budget=20)
+        assert list(external_sort.sort(rows)) == sorted(rows, key=itemgetter(0))
+
+    def test_spills_only_given_columns(self):
+        rows = [[None, i, None] for i in (5, 3, 9, 1)]
+        external_sort = ExternalSort((str, int, str), key=itemgetter(1), columns=[1], memory_budget=4)
+        assert list(external_sort.sort(rows)) == [[None, i, None] for i in (1, 3, 5, 9)]
+        assert external_sort.counters.runs_spilled == 4
+        assert external_sort.counters.bytes_written == 16
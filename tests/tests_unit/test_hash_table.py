@@ -0,0 +1,42 @@
+import zlib
+
+from vgdb.hash_table import PAGE_CAPACITY, HashTable, hash_key
+
+
+class TestHashTable:
+    def test_lookup(self, tmp_path):
+        table = HashTable(tmp_path / "t")
+        table.create([("apple", 0), ("pear", 10), ("apple", 20)], end=30)
+        assert table.lookup("apple") == [0, 20]
+        assert table.lookup("plum") == []
+
+    def test_grows_and_reopens(self, tmp_path):
+        table = HashTable(tmp_path / "t")
+        table.create([], end=0)
+        for start in range(0, 10000, 1000):
+            table.insert_many([(i % 500, i) for i in range(start, start + 1000)], end=start + 1000)
+        assert table.bucket_count > 1
+        reopened = HashTable(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.end == 10000
+        assert reopened.lookup(42) == list(range(42, 10000, 500))
+
+    def test_overflow_pages(self, tmp_path):
+        table = HashTable(tmp_path / "t")
+        table.create([("same", i) for i in range(PAGE_CAPACITY // 2)], end=0)
+        table.insert_many([("same", i) for i in range(PAGE_CAPACITY // 2, PAGE_CAPACITY + 10)], end=1)
+        assert table.lookup("same") == list(range(PAGE_CAPACITY + 10))
+
+    def test_hash_key_is_stable(self):
+        assert hash_key("apple") == zlib.crc32(b"apple")
+        assert hash_key(1) != hash_key("1")
+        assert hash_key(-1) != hash_key(2 ** 32 - 1)
+        assert hash_key(99999999999) != hash_key(99999999999 % 2 ** 32)
+
+    def test_overflow_pages_are_saved(self, tmp_path):
+        table = HashTable(tmp_path / "t")
+        table.create([("same", 0)], end=0)
+        table.insert_many([("same", i) for i in range(1, PAGE_CAPACITY + 10)], end=1)
+        reopened = HashTable(tmp_path / "t")
+        reopened.open()
+        assert reopened.lookup("same") == list(range(PAGE_CAPACITY + 10))
@@ -0,0 +1,65 @@
+import struct
+
+import pytest
+
+from vgdb import kernels
+from vgdb.batch import Batch
+from vgdb.operators import IndexScan, Scan, Sort
+from vgdb.statement import Conjunction, OrderBy, WhereStatement
+from vgdb.table import Table
+from vgdb.where import Predicate, Where
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(kernels, "numpy", None)
+    return request.param
+
+
+@pytest.fixture(params=["persistent", "columnar"])
+def table(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    t = Table(name="a", columns=[("b", str), ("a", int), ("c", int)], storage_type=request.param)
+    t.persist()
+    t.insert_many([[f"row{i}", (i * 7) % 11, i % 3] for i in range(50)])
+    return t
+
+
+class TestKernels:
+    def test_ints_from_bytes(self, backend):
+        ints = kernels.ints_from_bytes(struct.pack("<3I", 1, 2, 2 ** 32 - 1))
+        assert list(kernels.take(ints)) == [1, 2, 2 ** 32 - 1]
+        assert kernels.take(ints, [2, 0]) == [2 ** 32 - 1, 1]
+        assert all(type(value) is int for value in kernels.take(ints, [0, 1]))
+
+    def test_batch_where_matches_where(self, backend, table):
+        where = WhereStatement(
+            conditions=[
+                Where(column="a", predicate=Predicate.GT, value=3),
+                Where(column="c", predicate=Predicate.NOT_EQUALS, value=1),
+                Where(column="a", predicate=Predicate.EQUALS, value=0),
+            ],
+            conjunctions=[Conjunction.AND, Conjunction.OR],
+        )
+        rows = list(table.all_rows())
+        expected = [row for row in rows if table.compile_where(where)(row)]
+        assert [list(row) for row in Scan(table, where=where).rows()] == expected
+        batch = Batch(columns=[None, [row[1] for row in rows], [row[2] for row in rows]], length=50)
+        selection = list(range(0, 50, 2))
+        assert table.compile_batch_where(where)(batch) == [k for k in range(50) if table.compile_where(where)(rows[k])]
+        batch.selection = selection
+        assert table.compile_batch_where(where)(batch) == [k for k in selection if table.compile_where(where)(rows[k])]
+
+    @pytest.mark.parametrize(
+        "columns,descending",
+        [(["a"], [False]), (["a"], [True]), (["c", "a"], [True, False]), (["c", "b"], [False, True])],
+    )
+    def test_sort_with_limit_matches_order_by(self, backend, table, columns, descending):
+        order_by = OrderBy(columns=columns, descending=descending)
+        expected = list(table.order_by(table.all_rows(), order_by))
+        for limit in (1, 7, 60):
+            scan = IndexScan(table, table.all_rows(), batch_size=8)
+            assert [list(row) for row in Sort(scan, table, order_by, limit=limit).rows()] == expected[:limit]
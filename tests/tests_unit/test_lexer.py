@@ -1,3 +1,5 @@
+import pytest
+
 from vgdb.lexer import Lexer
 from vgdb.sql_token import Token, TokenType
 
@@ -58,3 +60,32 @@ class TestLexer:
         assert lexer.next_token() == Token(token_type=TokenType.IDENTIFIER, literal="a")
         assert lexer.next_token() == Token(token_type=TokenType.SEMICOLON, literal=";")
         assert lexer.next_token() is None
+
+    def test_parameters(self):
+        lexer = Lexer("VALUES (?, ?) WHERE a = ?;")
+        assert lexer.next_token() == Token(token_type=TokenType.VALUES, literal="values")
+        assert lexer.next_token() == Token(token_type=TokenType.LPAREN, literal="(")
+        assert lexer.next_token() == Token(token_type=TokenType.PARAMETER, literal="?")
+        assert lexer.next_token() == Token(token_type=TokenType.COMMA, literal=",")
+        assert lexer.next_token() == Token(token_type=TokenType.PARAMETER, literal="?")
+        assert lexer.next_token() == Token(token_type=TokenType.RPAREN, literal=")")
+        assert lexer.next_token() == Token(token_type=TokenType.WHERE, literal="where")
+        assert lexer.next_token() == Token(token_type=TokenType.IDENTIFIER, literal="a")
+        assert lexer.next_token() == Token(token_type=TokenType.EQUALS, literal="=")
+        assert lexer.next_token() == Token(token_type=TokenType.PARAMETER, literal="?")
+        assert lexer.next_token() == Token(token_type=TokenType.SEMICOLON, literal=";")
+        assert lexer.next_token() is None
+
+    def test_whitespace_is_optional_between_tokens(self):
+        tokens = list(Lexer("select\ta,b\nfrom c where d>=1;").tokens())
+        assert [token.literal for token in tokens] == ["select", "a", ",", "b", "from", "c", "where", "d", ">=", 1, ";"]
+        assert [token.literal for token in Lexer("select" + " " * 10000 + "a").tokens()] == ["select", "a"]
+
+    def test_long_program(self):
+        program = "insert into a values " + ", ".join(f"({i}, 'x')" for i in range(20000)) + ";"
+        assert sum(1 for _ in Lexer(program).tokens()) == 4 + 20000 * 5 + 20000
+
+    @pytest.mark.parametrize("program", ["select 'a", "select a # b", "a !"])
+    def test_errors(self, program):
+        with pytest.raises(ValueError):
+            list(Lexer(program).tokens())
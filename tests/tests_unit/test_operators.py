@@ -0,0 +1,90 @@
+import pytest
+
+from vgdb.batch import Batch
+from vgdb.operators import Filter, IndexScan, Limit, Operator, Project, Scan, Sort
+from vgdb.statement import Conjunction, OrderBy, WhereStatement
+from vgdb.table import Table
+from vgdb.where import Predicate, Where
+
+
+class Batches(Operator):
+    def __init__(self, batches):
+        self.batch_list = batches
+        self.children = []
+
+    def _batches(self):
+        return iter(self.batch_list)
+
+    def describe(self):
+        return "Batches"
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    t = Table(name="a", columns=[("b", str), ("a", int)])
+    t.persist()
+    t.insert_many([[f"row{i}", i % 7] for i in range(20)])
+    return t
+
+
+class TestOperators:
+    def test_scan(self, table):
+        where = WhereStatement(conditions=[Where(column="a", predicate=Predicate.LT, value=2)])
+        rows = list(Scan(table, where=where).rows())
+        assert rows == [(f"row{i}", i % 7) for i in range(20) if i % 7 < 2]
+
+    def test_filter_narrows_selection(self, table):
+        where = WhereStatement(
+            conditions=[
+                Where(column="a", predicate=Predicate.EQUALS, value=1),
+                Where(column="b", predicate=Predicate.LIKE, value="%9"),
+            ],
+            conjunctions=[Conjunction.OR],
+        )
+        rows = [[f"row{i}", i % 7] for i in range(20)]
+        batches = list(Filter(IndexScan(table, rows), table, where).batches())
+        assert batches[0].selection == [1, 8, 9, 15, 19]
+        assert batches[0].columns[1] == tuple(i % 7 for i in range(20))
+
+    def test_limit_across_batches(self):
+        batches = [
+            Batch(columns=[[0, 1, 2]], length=3),
+            Batch(columns=[[3, 4, 5, 6]], length=4, selection=[0, 2, 3]),
+            Batch(columns=[[7, 8]], length=2),
+        ]
+        limit = Limit(Batches(batches), limit=4, offset=2)
+        assert [row for batch in limit.batches() for row in batch.to_rows()] == [[2], [3], [5], [6]]
+
+    def test_sort_with_limit_keeps_ties_in_order(self, table):
+        order_by = OrderBy(columns=["a"], descending=[True])
+        rows = list(Sort(Scan(table), table, order_by, limit=4).rows())
+        assert rows == [("row6", 6), ("row13", 6), ("row5", 5), ("row12", 5)]
+
+    def test_sort_matches_order_by(self, table):
+        order_by = OrderBy(columns=["a", "b"], descending=[False, True])
+        expected = list(table.order_by(table.all_rows(), order_by))
+        assert [list(row) for row in Sort(Scan(table), table, order_by).rows()] == expected
+        assert [list(row) for row in Sort(Scan(table), table, order_by, limit=5).rows()] == expected[:5]
+
+    def test_project(self, table):
+        batches = [Batch(columns=[["a", "b"], [1, 2]], length=2, selection=[1])]
+        project = Project(Batches(batches), table, [1, 0])
+        assert [row for batch in project.batches() for row in batch.to_rows()] == [[2, "b"]]
+
+    def test_explain(self, table):
+        where = WhereStatement(conditions=[Where(column="a", predicate=Predicate.LT, value=2)])
+        plan = Limit(Sort(Scan(table, where=where), table, OrderBy(columns=["b"], descending=[True])), limit=2)
+        assert plan.explain() == ["Limit 2", "  Sort b desc", "    Scan a persistent where a < 2"]
+
+    def test_instrumented_counts(self, table):
+        plan = Limit(Scan(table), limit=3, offset=1)
+        plan.instrument(lambda: table.bytes_read)
+        assert len(list(plan.rows())) == 3
+        assert plan.counters.rows_out == 3
+        assert plan.children[0].counters.rows_out == 20
+        assert plan.children[0].counters.bytes_read > 0
+        assert plan.counters.bytes_read == plan.children[0].counters.bytes_read
+        lines = plan.explain()
+        assert lines[0].startswith("Limit 3 offset 1 (rows in=20 rows out=3 time=")
+        assert lines[1].startswith("  Scan a persistent (rows out=20 time=")
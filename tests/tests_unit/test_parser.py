@@ -2,7 +2,7 @@ import pytest
 
 from vgdb.lexer import Lexer
 from vgdb.parser import Parser
-from vgdb.statement import Conjunction, CreateTable, Insert, OrderBy, Select, WhereStatement
+from vgdb.statement import Conjunction, CreateIndex, CreateTable, Explain, Insert, OrderBy, Select, WhereStatement
 from vgdb.where import Predicate, Where
 
 
@@ -223,8 +223,9 @@ class TestParser:
     @pytest.mark.parametrize(
         argnames=("statement", "expected"),
         argvalues=[
-            ("insert into b values ('a', 'b', 1)", Insert(values=["a", "b", 1], table_name="b")),
-            ("insert into b values ('a')", Insert(values=["a"], table_name="b")),
+            ("insert into b values ('a', 'b', 1)", Insert(values=[["a", "b", 1]], table_name="b")),
+            ("insert into b values ('a')", Insert(values=[["a"]], table_name="b")),
+            ("insert into b values ('a', 1), ('b', 2)", Insert(values=[["a", 1], ["b", 2]], table_name="b")),
         ],
     )
     def test_parse_insert(self, statement, expected):
@@ -247,7 +248,51 @@ class TestParser:
         assert statements == [expected]
 
     @pytest.mark.parametrize(
-        argnames="statement", argvalues=["INSERT INTO a VALUES (2147483648)", "INSERT INTO a VALUES (æ)"],
+        argnames=("statement", "expected"),
+        argvalues=[
+            ("create index a_b on a (b)", CreateIndex(index_name="a_b", table_name="a", column="b")),
+            ("CREATE INDEX a_b ON a (b);", CreateIndex(index_name="a_b", table_name="a", column="b")),
+            (
+                "create index a_b on a (b) using hash",
+                CreateIndex(index_name="a_b", table_name="a", column="b", kind="hash"),
+            ),
+        ],
+    )
+    def test_parse_create_index(self, statement, expected):
+        lexer = Lexer(program=statement)
+        parser = Parser(lexer=lexer)
+        statements = list(parser.parse())
+        assert statements == [expected]
+
+    @pytest.mark.parametrize(
+        "statement,expected",
+        [
+            ("explain select * from a", Explain(select=Select(columns=["all"], table_name="a"))),
+            (
+                "EXPLAIN ANALYZE SELECT b FROM a LIMIT 1",
+                Explain(select=Select(columns=["b"], table_name="a", limit=1), analyze=True),
+            ),
+        ],
+    )
+    def test_parse_explain(self, statement, expected):
+        lexer = Lexer(program=statement)
+        parser = Parser(lexer=lexer)
+        statements = list(parser.parse())
+        assert statements == [expected]
+
+    def test_parse_explain_requires_select(self):
+        parser = Parser(lexer=Lexer(program="explain insert into a values (1)"))
+        with pytest.raises(ValueError):
+            list(parser.parse())
+
+    @pytest.mark.parametrize(
+        argnames="statement",
+        argvalues=[
+            "INSERT INTO a VALUES (2147483648)",
+            "INSERT INTO a VALUES (æ)",
+            "INSERT INTO a VALUES (1), (2147483648)",
+            "INSERT INTO a VALUES (1) (2)",
+        ],
     )
     def test_parse_int_errors_if_too_big(self, statement):
         lexer = Lexer(program=statement)
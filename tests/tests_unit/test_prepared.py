@@ -0,0 +1,82 @@
+import pytest
+
+from vgdb.evaluator import Evaluator
+from vgdb.lexer import Lexer
+from vgdb.parser import Parser
+from vgdb.prepared import PreparedStatement, StatementCache
+from vgdb.statement import Explain, Insert, Parameter, Select, WhereStatement
+from vgdb.table import Table
+from vgdb.where import Predicate, Where
+
+
+@pytest.fixture
+def evaluator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    table = Table(name="c", columns=[("a", int), ("b", str)])
+    table.persist()
+    return Evaluator(tables={"c": table})
+
+
+class TestPreparedStatement:
+    def test_bind_insert(self):
+        statement = PreparedStatement.from_sql("insert into c values (?, ?), (3, ?)")
+        assert statement.statement == Insert(values=[[Parameter(0), Parameter(1)], [3, Parameter(2)]], table_name="c")
+        bound = statement.bind([1, "x", "y"])
+        assert bound == Insert(values=[[1, "x"], [3, "y"]], table_name="c")
+        assert statement.bind([2, "z", "w"]) == Insert(values=[[2, "z"], [3, "w"]], table_name="c")
+
+    def test_bind_select(self):
+        statement = PreparedStatement.from_sql("select b from c where a > ? and b like 'x%' limit 1")
+        where = WhereStatement(
+            conditions=[
+                Where(column="a", predicate=Predicate.GT, value=5),
+                Where(column="b", predicate=Predicate.LIKE, value="x%"),
+            ],
+            conjunctions=statement.statement.where.conjunctions,
+        )
+        assert statement.bind([5]) == Select(columns=["b"], table_name="c", where=where, limit=1)
+        assert statement.statement.where.conditions[0].value == Parameter(0)
+
+    @pytest.mark.parametrize("parameters", [[], [1, 2], [2 ** 31], [1.5], [None]])
+    def test_bind_rejects_wrong_parameters(self, parameters):
+        statement = PreparedStatement.from_sql("select b from c where a = ?")
+        with pytest.raises(ValueError):
+            statement.bind(parameters)
+
+    def test_prepare_one_statement(self):
+        with pytest.raises(ValueError):
+            PreparedStatement.from_sql("select a from c; select b from c")
+
+
+class TestStatementCache:
+    def test_evicts_least_recently_used(self):
+        cache = StatementCache(capacity=2)
+        first = cache.get("select a from c")
+        cache.get("select b from c")
+        assert cache.get("select a from c") is first
+        cache.get("select a, b from c")
+        assert len(cache) == 2
+        assert cache.get("select a from c") is first
+        cache.get("select b from c")
+        assert (cache.hits, cache.misses) == (2, 4)
+
+
+class TestExecute:
+    def test_execute_with_parameters(self, evaluator):
+        insert = evaluator.prepare("insert into c values (?, ?)")
+        for i in range(5):
+            assert evaluator.execute(insert, [i, f"row{i}"]) == "OK"
+        select = evaluator.prepare("select b from c where a >= ? and b != ?")
+        assert evaluator.execute(select, [2, "row3"]) == [["row2"], ["row4"]]
+        assert evaluator.execute("select a from c where b = 'row1'") == [[1]]
+        assert evaluator.execute("select a from c where b = 'row1'") == [[1]]
+        assert evaluator.statement_cache.stats()["hits"] == 1
+
+    @pytest.mark.parametrize("program", ["insert into c values (?, ?)", "select b from c where a = ?"])
+    def test_unbound_parameters_are_rejected(self, evaluator, program):
+        statement = next(Parser(lexer=Lexer(program=program)).parse())
+        with pytest.raises(ValueError):
+            evaluator.handle_command(statement)
+        with pytest.raises(ValueError):
+            evaluator.handle_command(Explain(select=statement) if isinstance(statement, Select) else statement)
+        assert evaluator.execute("select a, b from c") == []
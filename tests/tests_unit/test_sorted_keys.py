@@ -0,0 +1,45 @@
+from vgdb.sorted_keys import MIN_TAIL_TO_MERGE, SortedKeys
+
+
+class TestSortedKeys:
+    def test_range(self, tmp_path):
+        keys = SortedKeys(tmp_path / "t")
+        keys.create([("pear", 0), ("apple", 10), ("apricot", 20), ("apple", 5)], end=30)
+        assert keys.range("ap", "aq", high_inclusive=False) == [("apple", 5), ("apple", 10), ("apricot", 20)]
+        assert keys.range("apple", "apple") == [("apple", 5), ("apple", 10)]
+        assert keys.range(low="apple", low_inclusive=False) == [("apricot", 20), ("pear", 0)]
+        assert keys.range(high="apricot", high_inclusive=False) == [("apple", 5), ("apple", 10)]
+
+    def test_inserts_are_appended_and_reopened(self, tmp_path):
+        keys = SortedKeys(tmp_path / "t")
+        keys.create([("b", 0)], end=1)
+        keys.insert_many([("c", 2), ("a", 1)], end=3)
+        keys.insert_many([("b", 3)], end=4)
+        assert keys.entries == [("a", 1), ("b", 0), ("b", 3), ("c", 2)]
+        reopened = SortedKeys(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.end == 4
+        assert reopened.entries == [("a", 1), ("b", 0), ("b", 3), ("c", 2)]
+
+    def test_tail_is_merged(self, tmp_path):
+        keys = SortedKeys(tmp_path / "t")
+        keys.create([], end=0)
+        keys.insert_many([(f"k{i}", i) for i in range(MIN_TAIL_TO_MERGE + 1)], end=1)
+        assert keys._tail_count == 0
+        reopened = SortedKeys(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.entries == sorted((f"k{i}", i) for i in range(MIN_TAIL_TO_MERGE + 1))
+
+    def test_open_rejects_truncated_file(self, tmp_path):
+        keys = SortedKeys(tmp_path / "t")
+        keys.create([("a", 0)], end=1)
+        keys.insert_many([("b", 1)], end=2)
+        path = tmp_path / "t"
+        path.write_bytes(path.read_bytes()[:-1])
+        assert not SortedKeys(path).open()
+        assert not SortedKeys(tmp_path / "missing").open()
+
+    def test_descending(self, tmp_path):
+        keys = SortedKeys(tmp_path / "t")
+        keys.create([("a", 0), ("b", 1), ("a", 2)], end=3)
+        assert list(keys.descending()) == [("b", 1), ("a", 0), ("a", 2)]
@@ -0,0 +1,55 @@
+from vgdb.stats import ColumnStats, TableStats, like_prefix
+from vgdb.where import Predicate
+
+
+class TestColumnStats:
+    def test_update(self):
+        stats = ColumnStats()
+        for value in [5, 3, 9]:
+            stats.update(value)
+        assert (stats.min, stats.max) == (3, 9)
+
+    def test_empty_column_matches_nothing(self):
+        assert not ColumnStats().may_match(Predicate.NOT_EQUALS, 1)
+
+    def test_may_match(self):
+        stats = ColumnStats(min=10, max=20)
+        assert stats.may_match(Predicate.EQUALS, 10)
+        assert not stats.may_match(Predicate.EQUALS, 21)
+        assert not stats.may_match(Predicate.LT, 10)
+        assert stats.may_match(Predicate.LTEQ, 10)
+        assert not stats.may_match(Predicate.GT, 20)
+        assert stats.may_match(Predicate.GTEQ, 20)
+        assert not ColumnStats(min=1, max=1).may_match(Predicate.NOT_EQUALS, 1)
+
+    def test_may_match_like(self):
+        stats = ColumnStats(min="bar", max="foo")
+        assert stats.may_match(Predicate.LIKE, "c%")
+        assert stats.may_match(Predicate.LIKE, "%z")
+        assert not stats.may_match(Predicate.LIKE, "a%")
+        assert not stats.may_match(Predicate.LIKE, "g_")
+
+    def test_like_prefix(self):
+        assert like_prefix("abc%d") == "abc"
+        assert like_prefix("a_c") == "a"
+        assert like_prefix("abc") == "abc"
+
+
+class TestTableStats:
+    def test_round_trip(self):
+        stats = TableStats(types=(int, str))
+        stats.update([[3, "z" * 20], [1, "a" * 20]], byte_size=50)
+        data = stats.to_bytes()
+        assert len(data) == TableStats.block_size((int, str))
+        loaded = TableStats.from_bytes((int, str), data)
+        assert (loaded.row_count, loaded.byte_size) == (2, 50)
+        assert (loaded.columns[0].min, loaded.columns[0].max) == (1, 3)
+        assert loaded.columns[1].min == "a" * 16
+        assert not loaded.columns[1].max_is_exact
+        assert loaded.columns[1].may_match(Predicate.EQUALS, "zzz")
+        assert not loaded.columns[1].may_match(Predicate.LT, "a")
+
+    def test_round_trip_empty(self):
+        loaded = TableStats.from_bytes((int, str), TableStats(types=(int, str)).to_bytes())
+        assert loaded.row_count == 0
+        assert loaded.columns[0].min is None and loaded.columns[1].max is None
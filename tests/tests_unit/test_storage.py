@@ -1,6 +1,9 @@
 import pytest
 
-from vgdb.storage import InMemoryStorage, PersistentStorage
+from vgdb.buffer_pool import BufferPool
+from vgdb.columnar_storage import ColumnarStorage
+from vgdb.paged_storage import PAGE_SIZE, PagedStorage
+from vgdb.storage import COLUMNAR_FORMAT, PAGED_FORMAT, InMemoryStorage, PersistentStorage, storage_format
 
 
 @pytest.fixture
@@ -39,6 +42,71 @@ class TestPersistentStorage:
         storage.insert(row)
         assert list(storage.read_rows()) == [row]
 
+    def test_insert_many(self, storage):
+        rows = [[1, "hei"], [2, "hallo"]]
+        storage.insert_many(rows)
+        assert list(storage.read_rows()) == rows
+
+    def test_bytes_read(self, storage):
+        storage.insert_many([[1, "hei"], [2, "hallo"]])
+        list(storage.read_rows())
+        assert storage.bytes_read == 18
+        list(storage.read_rows(columns=[0]))
+        assert storage.bytes_read == 36
+
+    def test_insert_many_writes_nothing_if_a_row_is_invalid(self, storage):
+        with pytest.raises(ValueError):
+            storage.insert_many([[1, "hei"], ["a", "hallo"]])
+        assert list(storage.read_rows()) == []
+
+    def test_stats_are_kept_in_header(self, storage):
+        storage.insert_many([[3, "hei"], [1, "hallo"]])
+        s = PersistentStorage.from_file(storage._filename)
+        assert s.stats is not None
+        assert s.stats.row_count == 2
+        assert (s.stats.columns[0].min, s.stats.columns[0].max) == (1, 3)
+        assert (s.stats.columns[1].min, s.stats.columns[1].max) == ("hallo", "hei")
+        assert list(s.read_rows()) == [[3, "hei"], [1, "hallo"]]
+
+    def test_stats_unknown_if_rows_were_appended_without_them(self, storage):
+        storage.insert([1, "hei"])
+        with open(storage._file, "ab") as f:
+            f.write(storage._codec.encode([2, "hallo"]))
+        storage.invalidate_cache()
+        assert storage.stats is None
+
+    def test_block_filter_skips_blocks(self, storage):
+        storage.insert_many([[i, "x"] for i in range(3000)])
+        rows = list(storage.read_rows(block_filter=lambda stats: stats.columns[0].min >= 2048))
+        assert rows == [[i, "x"] for i in range(2048, 3000)]
+        assert storage.blocks_skipped == 2
+
+    def test_row_filter(self, storage):
+        storage.insert_many([[i, f"x{i}"] for i in range(100)])
+        rows = storage.read_rows(row_filter=([1], lambda row: row[0] is None and row[1].endswith("7")))
+        assert list(rows) == [[i, f"x{i}"] for i in range(7, 100, 10)]
+
+    def test_zone_map_is_rebuilt_if_missing(self, storage):
+        storage.insert_many([[i, "x"] for i in range(1500)])
+        storage._zones_file.unlink()
+        s = PersistentStorage.from_file(storage._filename)
+        rows = list(s.read_rows(block_filter=lambda stats: stats.columns[0].max < 1024))
+        assert rows == [[i, "x"] for i in range(1024)]
+        assert s.blocks_skipped == 1
+        assert storage._zones_file.exists()
+
+    def test_reads_files_without_stats(self):
+        s = PersistentStorage("a", columns=(("a", int), ("b", str)), has_stats=False)
+        s.persist()
+        try:
+            s.insert([1, "hei"])
+            loaded = PersistentStorage.from_file("a")
+            assert loaded.stats is None
+            loaded.insert([2, "hallo"])
+            assert list(loaded.read_rows()) == [[1, "hei"], [2, "hallo"]]
+        finally:
+            s.delete()
+
 
 class TestInMemoryStorage:
     def test_insert_read(self):
@@ -48,3 +116,167 @@ class TestInMemoryStorage:
         storage.insert(row)
         rows = list(storage.read_rows())
         assert rows == [row]
+
+
+@pytest.fixture
+def paged_storage():
+    s = PagedStorage("a", columns=(("a", int), ("b", str)), pool=BufferPool(capacity=2))
+    s.persist()
+    yield s
+    s.delete()
+
+
+class TestPagedStorage:
+    def test_write_row(self, paged_storage):
+        row = [1, "hei"]
+        paged_storage.insert(row)
+        assert list(paged_storage.read_rows()) == [row]
+
+    def test_rows_span_pages(self, paged_storage):
+        rows = [[i, "x" * 100] for i in range(200)]
+        for row in rows:
+            paged_storage.insert(row)
+        assert paged_storage.number_of_pages > 2
+        assert list(paged_storage.read_rows()) == rows
+
+    def test_row_too_large(self, paged_storage):
+        with pytest.raises(ValueError):
+            paged_storage.insert([1, "x" * PAGE_SIZE])
+
+    def test_initialize_from_existing(self, paged_storage):
+        paged_storage.insert([1, "hei"])
+        s = PagedStorage.from_file("a")
+        assert s._columns == paged_storage._columns
+        assert list(s.read_rows()) == [[1, "hei"]]
+        assert storage_format("a") == PAGED_FORMAT
+
+    def test_reads_are_cached(self, paged_storage):
+        paged_storage.insert([1, "hei"])
+        pool = paged_storage.buffer_pool
+        list(paged_storage.read_rows())
+        list(paged_storage.read_rows())
+        assert (pool.misses, pool.hits) == (1, 1)
+        paged_storage.insert([2, "hallo"])
+        assert list(paged_storage.read_rows()) == [[1, "hei"], [2, "hallo"]]
+        assert pool.misses == 2
+        assert paged_storage.bytes_read == 2 * PAGE_SIZE
+
+    def test_insert_many_spans_pages(self, paged_storage):
+        paged_storage.insert([0, "first"])
+        rows = [[i, "x" * 100] for i in range(1, 200)]
+        paged_storage.insert_many(rows)
+        paged_storage.insert([200, "last"])
+        assert list(paged_storage.read_rows()) == [[0, "first"]] + rows + [[200, "last"]]
+
+    def test_stats(self, paged_storage):
+        paged_storage.insert_many([[i, "x" * 100] for i in range(1, 200)])
+        s = PagedStorage.from_file("a")
+        assert s.stats is not None
+        assert s.stats.row_count == 199
+        assert s.stats.byte_size == (s.number_of_pages - 1) * PAGE_SIZE
+        assert (s.stats.columns[0].min, s.stats.columns[0].max) == (1, 199)
+
+
+@pytest.fixture
+def columnar_storage():
+    s = ColumnarStorage("a", columns=(("a", int), ("b", str), ("c", int)))
+    s.persist()
+    yield s
+    s.delete()
+
+
+class TestColumnarStorage:
+    def test_write_rows(self, columnar_storage):
+        rows = [[1, "hei", 2], [3, "", 4], [5, "hallo", 6]]
+        columnar_storage.insert(rows[0])
+        columnar_storage.insert_many(rows[1:])
+        assert list(columnar_storage.read_rows()) == rows
+        assert columnar_storage.number_of_rows == 3
+
+    def test_block_filter_skips_blocks(self, columnar_storage):
+        columnar_storage.insert_many([[i, "x", 0] for i in range(2000)])
+        columnar_storage.insert([2000, "y", 0])
+        rows = list(columnar_storage.read_rows(columns=[0], block_filter=lambda stats: stats.columns[0].max >= 1500))
+        assert [row[0] for row in rows] == list(range(1024, 2001))
+        assert columnar_storage.blocks_skipped == 1
+
+    def test_stats(self, columnar_storage):
+        columnar_storage.insert_many([[1, "hei", 2], [3, "", 4]])
+        s = ColumnarStorage.from_file("a")
+        assert s.stats is not None
+        assert s.stats.row_count == 2
+        assert (s.stats.columns[2].min, s.stats.columns[2].max) == (2, 4)
+
+    def test_read_only_some_columns(self, columnar_storage):
+        columnar_storage.insert_many([[1, "hei", 2], [3, "hallo", 4]])
+        assert list(columnar_storage.read_rows(columns=[1])) == [[None, "hei", None], [None, "hallo", None]]
+        assert list(columnar_storage.read_rows(columns=[])) == [[None, None, None], [None, None, None]]
+
+    def test_bytes_read_only_counts_columns_read(self, columnar_storage):
+        columnar_storage.insert_many([[1, "hei", 2], [3, "hallo", 4]])
+        list(columnar_storage.read_rows(columns=[0]))
+        assert columnar_storage.bytes_read == 8
+        list(columnar_storage.read_rows(columns=[2]))
+        assert columnar_storage.bytes_read == 16
+
+    def test_read_in_chunks(self, columnar_storage, monkeypatch):
+        monkeypatch.setattr("vgdb.columnar_storage.ROWS_PER_CHUNK", 3)
+        rows = [[i, "x" * i, -i % 7] for i in range(10)]
+        columnar_storage.insert_many(rows)
+        assert list(columnar_storage.read_rows()) == rows
+        assert list(columnar_storage.read_rows(columns=[1])) == [[None, row[1], None] for row in rows]
+
+    def test_row_filter_reads_other_columns_for_accepted_rows(self, columnar_storage, monkeypatch):
+        monkeypatch.setattr("vgdb.columnar_storage.ROWS_PER_CHUNK", 4)
+        columnar_storage.insert_many([[i, f"x{i}", i * 2] for i in range(10)])
+        rows = columnar_storage.read_rows(columns=[0, 1], row_filter=([2], lambda row: row[2] in (4, 10, 12)))
+        assert list(rows) == [[2, "x2", 4], [5, "x5", 10], [6, "x6", 12]]
+
+    def test_invalid_row_writes_nothing(self, columnar_storage):
+        with pytest.raises(ValueError):
+            columnar_storage.insert_many([[1, "hei", 2], [3, "hallo", "x"]])
+        assert list(columnar_storage.read_rows()) == []
+
+    def test_initialize_from_existing(self, columnar_storage):
+        columnar_storage.insert([1, "hei", 2])
+        s = ColumnarStorage.from_file("a")
+        assert s._columns == columnar_storage._columns
+        assert list(s.read_rows()) == [[1, "hei", 2]]
+        assert storage_format("a") == COLUMNAR_FORMAT
+
+
+@pytest.fixture
+def mapped_storage():
+    s = PersistentStorage("a", columns=(("a", int), ("b", str)), read_mode="mmap")
+    s.persist()
+    yield s
+    s.delete()
+
+
+class TestMappedPersistentStorage:
+    def test_read_empty(self, mapped_storage):
+        assert list(mapped_storage.read_rows()) == []
+
+    def test_map_is_reused_until_file_grows(self, mapped_storage):
+        mapped_storage.insert([1, "hei"])
+        assert list(mapped_storage.read_rows()) == [[1, "hei"]]
+        mapped = mapped_storage._mapped
+        assert list(mapped_storage.read_rows()) == [[1, "hei"]]
+        assert mapped_storage._mapped is mapped
+        mapped_storage.insert([2, "hallo"])
+        assert list(mapped_storage.read_rows()) == [[1, "hei"], [2, "hallo"]]
+        assert mapped_storage._mapped is not mapped
+
+    def test_scan_in_progress_survives_remap(self, mapped_storage):
+        mapped_storage.insert_many([[i, "x"] for i in range(10)])
+        rows = mapped_storage.read_rows()
+        assert next(rows) == [0, "x"]
+        mapped_storage.insert([10, "y"])
+        assert list(mapped_storage.read_rows())[-1] == [10, "y"]
+        assert len(list(rows)) == 9
+
+    def test_block_filter_skips_blocks(self, mapped_storage):
+        mapped_storage.insert_many([[i, "x"] for i in range(2048)])
+        rows = list(mapped_storage.read_rows(block_filter=lambda stats: stats.columns[0].min > 0))
+        assert rows == [[i, "x"] for i in range(1024, 2048)]
+        assert mapped_storage.blocks_skipped == 1
@@ -1,9 +1,9 @@
-from operator import and_, or_
-
 import pytest
 
-from vgdb.statement import WhereStatement
-from vgdb.table import Table, create_like_key, reduce_booleans_using_conjunctions
+from vgdb.operators import Filter, IndexScan, Scan
+from vgdb.paged_storage import PagedStorage
+from vgdb.statement import Conjunction, OrderBy, WhereStatement
+from vgdb.table import Table, conjunction_groups, create_like_key, create_sort_key
 from vgdb.where import Predicate, Where
 
 
@@ -24,6 +24,10 @@ class TestTable:
         with pytest.raises(ValueError):
             table.insert(["a", "a"])
 
+    def test_insert_many(self, table):
+        table.insert_many([["a", 1], ["b", 2]])
+        assert list(table.all_rows()) == [["a", 1], ["b", 2]]
+
     def test_all_rows(self, table):
         table.insert(["a", "1"])
         table.insert(["b", "2"])
@@ -33,55 +37,61 @@ class TestTable:
     def test_rows_with_where(self, table):
         table.insert(["a", 1])
         table.insert(["b", 2])
-        result = table.where(
-            rows=table.all_rows(),
-            where=WhereStatement(conditions=[Where(column="a", predicate=Predicate.EQUALS, value=1)], conjunctions=[]),
-        )
-        assert list(result) == [["a", 1]]
-        result = table.where(
-            rows=table.all_rows(),
-            where=WhereStatement(conditions=[Where(column="a", predicate=Predicate.EQUALS, value=3)], conjunctions=[]),
-        )
-        assert list(result) == []
+        where = WhereStatement(conditions=[Where(column="a", predicate=Predicate.EQUALS, value=1)], conjunctions=[])
+        assert list(Scan(table, where=where).rows()) == [("a", 1)]
+        where = WhereStatement(conditions=[Where(column="a", predicate=Predicate.EQUALS, value=3)], conjunctions=[])
+        assert list(Scan(table, where=where).rows()) == []
 
     def test_rows_with_where_like(self, table):
         table.insert(["aaaa", 1])
         table.insert(["aaba", 2])
         table.insert(["abaaa", 3])
-        result = table.where(
-            rows=table.all_rows(),
-            where=WhereStatement(
-                conditions=[Where(column="b", predicate=Predicate.LIKE, value="aa%")], conjunctions=[]
-            ),
-        )
-        assert list(result) == [["aaaa", 1], ["aaba", 2]]
-        result = table.where(
-            rows=table.all_rows(),
-            where=WhereStatement(
-                conditions=[Where(column="b", predicate=Predicate.LIKE, value="a___")], conjunctions=[]
-            ),
+        where = WhereStatement(conditions=[Where(column="b", predicate=Predicate.LIKE, value="aa%")], conjunctions=[])
+        assert list(Scan(table, where=where).rows()) == [("aaaa", 1), ("aaba", 2)]
+        where = WhereStatement(conditions=[Where(column="b", predicate=Predicate.LIKE, value="a___")], conjunctions=[])
+        assert list(Scan(table, where=where).rows()) == [("aaaa", 1), ("aaba", 2)]
+        where = WhereStatement(conditions=[Where(column="b", predicate=Predicate.LIKE, value="a_%a")], conjunctions=[])
+        assert list(Scan(table, where=where).rows()) == [("aaaa", 1), ("aaba", 2), ("abaaa", 3)]
+
+    def test_conjunction_groups(self):
+        and_, or_ = Conjunction.AND, Conjunction.OR
+        assert conjunction_groups([]) == [[0]]
+        assert conjunction_groups([and_]) == [[0, 1]]
+        assert conjunction_groups([or_]) == [[0], [1]]
+        assert conjunction_groups([or_, and_, and_, or_]) == [[0], [1, 2, 3], [4]]
+
+    def test_where_and_binds_tighter_than_or(self, table):
+        table.insert_many([["a", 1], ["b", 2], ["c", 3]])
+        where = WhereStatement(
+            conditions=[
+                Where("a", Predicate.EQUALS, 1),
+                Where("b", Predicate.EQUALS, "b"),
+                Where("a", Predicate.GT, 2),
+            ],
+            conjunctions=[Conjunction.OR, Conjunction.AND],
         )
-        assert list(result) == [["aaaa", 1], ["aaba", 2]]
-        result = table.where(
-            rows=table.all_rows(),
-            where=WhereStatement(
-                conditions=[Where(column="b", predicate=Predicate.LIKE, value="a_%a")], conjunctions=[]
-            ),
+        assert list(Scan(table, where=where).rows()) == [("a", 1)]
+        assert table.may_match(where)
+        where = WhereStatement(
+            conditions=[Where("a", Predicate.GT, 5), Where("a", Predicate.EQUALS, 1), Where("b", Predicate.LIKE, "c%")],
+            conjunctions=[Conjunction.AND, Conjunction.OR],
         )
-        assert list(result) == [["aaaa", 1], ["aaba", 2], ["abaaa", 3]]
+        assert list(Scan(table, where=where).rows()) == [("c", 3)]
 
-    def test_limit(self, table):
-        table.insert(["a", 1])
-        table.insert(["b", 2])
-        result = table.limit(rows=table.all_rows(), limit=1, offset=0)
-        assert list(result) == [["a", 1]]
-
-    def test_reduce(self):
-        assert reduce_booleans_using_conjunctions(predicate_results=[True, False], conjunctions=[and_]) is False
-        assert reduce_booleans_using_conjunctions(predicate_results=[True, False], conjunctions=[or_]) is True
-        assert (
-            reduce_booleans_using_conjunctions(predicate_results=[False, False, True], conjunctions=[and_, or_]) is True
-        )
+    def test_sort_key_mixed_directions(self):
+        rows = [["b", 1], ["ab", 2], ["a", 2], ["b", 3], ["", 0], ["a\x00b", 1]]
+        sort_key = create_sort_key([0, 1], [True, False], (str, int))
+        assert isinstance(sort_key(rows[0]), bytes)
+        assert sorted(rows, key=sort_key) == [["b", 1], ["b", 3], ["ab", 2], ["a\x00b", 1], ["a", 2], ["", 0]]
+        sort_key = create_sort_key([1, 0], [True, False], (str, int))
+        assert sorted(rows, key=sort_key) == [["b", 3], ["a", 2], ["ab", 2], ["a\x00b", 1], ["b", 1], ["", 0]]
+        sort_key = create_sort_key([1], [False], (str, int))
+        assert sorted(rows, key=sort_key) == sorted(rows, key=lambda row: row[1])
+
+    def test_order_by_text_descending(self, table):
+        table.insert_many([["b", 1], ["c", 2], ["a", 3]])
+        rows = table.order_by(table.all_rows(), OrderBy(columns=["b"], descending=[True]))
+        assert list(rows) == [["c", 2], ["b", 1], ["a", 3]]
 
     def test_make_like(self):
         key1 = create_like_key(like="a_")
@@ -96,3 +106,203 @@ class TestTable:
         assert key3("aab") is True
         assert key3("aaaaaaab") is True
         assert key3("ab") is False
+
+    @pytest.mark.parametrize(
+        argnames="like,matches,non_matches",
+        argvalues=[
+            ("abc", ["abc"], ["abcd", "ab"]),
+            ("ab%", ["ab", "abc"], ["a", "cab"]),
+            ("%ab", ["ab", "cab"], ["abc"]),
+            ("%ab%", ["ab", "cabd"], ["a_b"]),
+            ("%%", ["", "a"], []),
+            ("", [""], ["a", " "]),
+            ("a.c%", ["a.cd"], ["abcd"]),
+            ("a(_)%", ["a(b)"], ["a(bc)", "ab"]),
+            ("a%b%c", ["abc", "axbxc"], ["acb"]),
+        ],
+    )
+    def test_make_like_pattern_classes(self, like, matches, non_matches):
+        key = create_like_key(like=like)
+        assert [key(s) for s in matches] == [True] * len(matches)
+        assert [key(s) for s in non_matches] == [False] * len(non_matches)
+
+    def test_make_like_is_cached(self):
+        assert create_like_key(like="x%y") is create_like_key(like="x%y")
+
+    def test_from_file_keeps_paged_storage(self):
+        t = Table(name="c", columns=[("b", str), ("a", int)], storage_type="paged")
+        t.persist()
+        try:
+            t.insert(["hei", 1])
+            loaded = Table.from_file("c")
+            assert isinstance(loaded._file, PagedStorage)
+            assert list(loaded.all_rows()) == [["hei", 1]]
+        finally:
+            t._file.delete()
+
+    def test_stats(self, table):
+        assert table.row_count == 0
+        table.insert_many([["a", 1], ["b", 5]])
+        assert table.row_count == 2
+        assert table.column_stats("a").max == 5
+        loaded = Table.from_file("a")
+        assert loaded.row_count == 2
+        assert loaded.byte_size == table.byte_size
+
+    def test_may_match(self, table):
+        table.insert_many([["a", 1], ["b", 5]])
+        impossible = WhereStatement(conditions=[Where("a", Predicate.GT, 5)], conjunctions=[])
+        assert not table.may_match(impossible)
+        either = WhereStatement(
+            conditions=[Where("a", Predicate.GT, 5), Where("b", Predicate.EQUALS, "b")], conjunctions=[Conjunction.OR]
+        )
+        assert table.may_match(either)
+        with pytest.raises(ValueError):
+            table.may_match(WhereStatement(conditions=[Where("a", Predicate.LIKE, "a%")], conjunctions=[]))
+
+    def test_all_rows_skips_blocks_with_where(self, table):
+        table.insert_many([["x", i] for i in range(2048)])
+        where = WhereStatement(conditions=[Where("a", Predicate.LT, 10)], conjunctions=[])
+        rows = list(Scan(table, where=where).rows())
+        assert rows == [("x", i) for i in range(10)]
+        assert table.blocks_skipped == 1
+
+
+@pytest.fixture
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestTableIndexes:
+    @pytest.mark.parametrize(argnames="storage_type", argvalues=["persistent", "paged", "columnar"])
+    def test_index_lookup(self, in_tmp_path, storage_type):
+        t = Table(name="a", columns=[("b", str), ("a", int)], storage_type=storage_type)
+        t.persist()
+        t.insert_many([[f"x{i}", i % 50] for i in range(500)])
+        t.create_index("a_a", "a")
+        t.insert_many([["new", 7]])
+        where = WhereStatement(conditions=[Where("a", Predicate.EQUALS, 7)], conjunctions=[])
+        rows, ordered = t.indexed_rows(where=where, order_by=None)
+        assert list(rows) == [[f"x{i}", 7] for i in range(7, 500, 50)] + [["new", 7]]
+
+    def test_index_gives_order(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([["x", 3], ["y", 1], ["z", 2]])
+        t.create_index("a_a", "a")
+        rows, ordered = t.indexed_rows(where=None, order_by=OrderBy(columns=["a"], descending=[True]))
+        assert ordered
+        assert list(rows) == [["x", 3], ["z", 2], ["y", 1]]
+        where = WhereStatement(conditions=[Where("a", Predicate.GT, 1)], conjunctions=[])
+        rows, ordered = t.indexed_rows(where=where, order_by=OrderBy(columns=["a"], descending=[False]))
+        assert ordered
+        assert list(rows) == [["z", 2], ["x", 3]]
+
+    def test_index_is_rebuilt_if_missing_or_out_of_date(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.create_index("a_a", "a")
+        t.insert(["x", 1])
+        (in_tmp_path / "a.vgdb.a_a.btree").unlink()
+        loaded = Table.from_file("a")
+        loaded._file.insert(["y", 1])
+        where = WhereStatement(conditions=[Where("a", Predicate.EQUALS, 1)], conjunctions=[])
+        rows, _ = loaded.indexed_rows(where=where, order_by=None)
+        assert list(rows) == [["x", 1], ["y", 1]]
+
+    def test_hash_index(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([[f"x{i % 30}", i] for i in range(300)])
+        t.create_index("a_b", "b")
+        assert t.indexes["a_b"].kind == "hash"
+        t.insert_many([["x7", 1000]])
+        where = WhereStatement(conditions=[Where("b", Predicate.EQUALS, "x7")], conjunctions=[])
+        rows, _ = t.indexed_rows(where=where, order_by=None)
+        assert [row[1] for row in rows] == list(range(7, 300, 30)) + [1000]
+
+    def test_sorted_index_for_like_prefix(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([["apple", 0], ["banana", 1], ["apricot", 2], ["avocado", 3]])
+        t.create_index("a_b", "b", kind="sorted")
+        t.insert_many([["ape", 4]])
+        where = WhereStatement(conditions=[Where("b", Predicate.LIKE, "ap%t")], conjunctions=[])
+        rows, ordered = t.indexed_rows(where=where, order_by=OrderBy(columns=["b"], descending=[False]))
+        assert ordered
+        rows = list(rows)
+        assert rows == [["ape", 4], ["apple", 0], ["apricot", 2]]
+        assert list(Filter(IndexScan(t, rows), t, where).rows()) == [("apricot", 2)]
+        where = WhereStatement(conditions=[Where("b", Predicate.LIKE, "%a")], conjunctions=[])
+        assert t.indexed_rows(where=where, order_by=None) is None
+
+    def test_trigram_index_for_like(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([["singing", 0], ["ring", 1], ["kingdom", 2], ["in", 3]])
+        t.create_index("a_b", "b", kind="trigram")
+        t.insert_many([["thinking", 4]])
+        where = WhereStatement(conditions=[Where("b", Predicate.LIKE, "%ing%o%")], conjunctions=[])
+        rows, ordered = t.indexed_rows(where=where, order_by=None)
+        rows = list(rows)
+        assert rows == [["singing", 0], ["ring", 1], ["kingdom", 2], ["thinking", 4]]
+        assert list(Filter(IndexScan(t, rows), t, where).rows()) == [("kingdom", 2)]
+        _, ordered = t.indexed_rows(where=where, order_by=OrderBy(columns=["b"], descending=[False]))
+        assert not ordered
+        where = WhereStatement(conditions=[Where("b", Predicate.LIKE, "%in%")], conjunctions=[])
+        assert t.indexed_rows(where=where, order_by=None) is None
+
+    def test_equalities_are_intersected(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([[f"x{i % 3}", i % 5] for i in range(30)])
+        t.create_index("a_b", "b", kind="hash")
+        t.create_index("a_a", "a", kind="hash")
+        where = WhereStatement(
+            conditions=[Where("b", Predicate.EQUALS, "x1"), Where("a", Predicate.EQUALS, 2)],
+            conjunctions=[Conjunction.AND],
+        )
+        rows, _ = t.indexed_rows(where=where, order_by=None)
+        assert list(rows) == [["x1", 2], ["x1", 2]]
+
+    def test_hash_index_lookup_out_of_range(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.insert_many([["x", 0], ["y", 2 ** 32 - 1]])
+        t.create_index("a_a", "a", kind="hash")
+        for value in (-1, -(2 ** 31), 2 ** 32, 99999999999):
+            rows, _ = t.indexed_rows(where=WhereStatement([Where("a", Predicate.EQUALS, value)], []), order_by=None)
+            assert list(rows) == []
+        rows, _ = t.indexed_rows(where=WhereStatement([Where("a", Predicate.EQUALS, 2 ** 32 - 1)], []), order_by=None)
+        assert list(rows) == [["y", 2 ** 32 - 1]]
+
+    def test_no_index_for_or(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.create_index("a_a", "a")
+        where = WhereStatement(
+            conditions=[Where("a", Predicate.EQUALS, 1), Where("b", Predicate.EQUALS, "x")],
+            conjunctions=[Conjunction.OR],
+        )
+        assert t.indexed_rows(where=where, order_by=None) is None
+
+    def test_create_index_errors(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.create_index("a_a", "a")
+        with pytest.raises(ValueError):
+            t.create_index("a_a", "a")
+        with pytest.raises(ValueError):
+            t.create_index("a_b", "b", kind="btree")
+        with pytest.raises(ValueError):
+            t.create_index("a_b", "b", kind="bitmap")
+        with pytest.raises(ValueError):
+            t.create_index("a_c", "c")
+
+    def test_delete_removes_indexes(self, in_tmp_path):
+        t = Table(name="a", columns=[("b", str), ("a", int)])
+        t.persist()
+        t.create_index("a_a", "a")
+        t.delete()
+        assert sorted(path.name for path in in_tmp_path.iterdir()) == []
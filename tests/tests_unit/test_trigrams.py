@@ -0,0 +1,50 @@
+from vgdb.trigrams import MIN_TAIL_TO_MERGE, TrigramPostings, like_trigrams, trigrams
+
+
+def test_trigrams():
+    assert trigrams("abcd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+    assert like_trigrams("%abc_de%fgh%") == {"abc", "fgh"}
+
+
+class TestTrigramPostings:
+    def test_lookup(self, tmp_path):
+        postings = TrigramPostings(tmp_path / "t")
+        postings.create([("banana", 0), ("bandana", 10), ("cabana", 20)], end=30)
+        assert postings.postings("ana") == [0, 10, 20]
+        assert postings.lookup("%ban%") == [0, 10, 20]
+        assert postings.lookup("%nan%") == [0]
+        assert postings.lookup("%dan%ban%") == [10]
+        assert postings.lookup("%xyz%") == []
+        assert postings.lookup("%an%") is None
+
+    def test_inserts_are_appended_and_reopened(self, tmp_path):
+        postings = TrigramPostings(tmp_path / "t")
+        postings.create([("banana", 0)], end=1)
+        postings.insert_many([("cabana", 1)], end=2)
+        reopened = TrigramPostings(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.end == 2
+        assert reopened.lookup("%ana%") == [0, 1]
+        assert reopened.lookup("%cab%") == [1]
+
+    def test_tail_is_merged(self, tmp_path):
+        postings = TrigramPostings(tmp_path / "t")
+        postings.create([], end=0)
+        postings.insert_many([(f"key{i % 7}", i) for i in range(MIN_TAIL_TO_MERGE + 1)], end=1)
+        assert postings._tail_count == 0
+        reopened = TrigramPostings(tmp_path / "t")
+        assert reopened.open()
+        assert reopened.key_count == MIN_TAIL_TO_MERGE + 1
+        assert reopened.lookup("%key%") == list(range(MIN_TAIL_TO_MERGE + 1))
+
+    def test_open_rejects_truncated_file(self, tmp_path):
+        postings = TrigramPostings(tmp_path / "t")
+        postings.create([("banana", 0)], end=1)
+        path = tmp_path / "t"
+        data = path.read_bytes()
+        path.write_bytes(data[:-1])
+        assert not TrigramPostings(path).open()
+        path.write_bytes(data[:40])
+        assert not TrigramPostings(path).open()
+        assert not TrigramPostings(tmp_path / "missing").open()
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from vgdb.storage import PersistentStorage
+from vgdb.writer import Durability, TableWriter, WritePolicy
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "a.vgdb"
+
+
+class TestTableWriter:
+    def test_statement_durability_flushes_every_statement(self, path):
+        writer = TableWriter(path)
+        writer.write(b"abc")
+        assert not path.exists()
+        writer.end_statement()
+        assert path.read_bytes() == b"abc"
+        writer.close()
+
+    def test_group_commit_waits_for_interval(self, path):
+        writer = TableWriter(path, WritePolicy(durability=Durability.GROUP, group_commit_ms=60_000))
+        writer.write(b"abc")
+        writer.end_statement()
+        writer.write(b"def")
+        writer.end_statement()
+        assert not path.exists()
+        assert writer.buffered_bytes == 6
+        writer.flush()
+        assert path.read_bytes() == b"abcdef"
+        assert writer.flushes == 1
+        writer.close()
+
+    def test_group_commit_timer_flushes_without_new_statements(self, path):
+        writer = TableWriter(path, WritePolicy(durability=Durability.GROUP, group_commit_ms=10))
+        writer.write(b"abc")
+        writer.end_statement()
+        deadline = time.monotonic() + 5
+        while writer.flushes == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert path.read_bytes() == b"abc"
+        assert writer.buffered_bytes == 0
+        writer.close()
+
+    def test_flushes_when_buffer_is_full(self, path):
+        policy = WritePolicy(durability=Durability.GROUP, group_commit_ms=60_000, max_buffer_bytes=4)
+        writer = TableWriter(path, policy)
+        writer.write(b"ab")
+        writer.write(b"cd")
+        assert path.read_bytes() == b"abcd"
+        writer.close()
+
+    def test_fsync_per_batch(self, path):
+        writer = TableWriter(path, WritePolicy(durability=Durability.FSYNC, group_commit_ms=0))
+        writer.write(b"abc")
+        writer.end_statement()
+        assert path.read_bytes() == b"abc"
+        assert writer.fsyncs == 1
+        writer.close()
+
+
+class TestPersistentStorageWithGroupCommit:
+    def test_reads_see_buffered_rows(self):
+        policy = WritePolicy(durability=Durability.GROUP, group_commit_ms=60_000)
+        s = PersistentStorage("a", columns=(("a", int), ("b", str)), write_policy=policy)
+        s.persist()
+        try:
+            s.insert([1, "hei"])
+            assert s.writer.buffered_bytes > 0
+            assert list(s.read_rows()) == [[1, "hei"]]
+            assert s.writer.buffered_bytes == 0
+        finally:
+            s.delete()
@@ -0,0 +1,42 @@
+import pytest
+
+from vgdb.zone_map import ZoneMap
+
+
+@pytest.fixture
+def zones_file(tmp_path):
+    return tmp_path / "a.vgdb.zones"
+
+
+class TestZoneMap:
+    def test_blocks(self, zones_file):
+        zone_map = ZoneMap(zones_file, (int,), start=10, rows_per_block=2)
+        zone_map.add([[1], [2], [3]], [4, 4, 4])
+        assert [(zone.start, zone.end) for zone in zone_map.zones] == [(10, 18), (18, 22)]
+        assert [(zone.stats.columns[0].min, zone.stats.columns[0].max) for zone in zone_map.zones] == [(1, 2), (3, 3)]
+        assert zone_map.end == 22
+
+    def test_save_and_load(self, zones_file):
+        zone_map = ZoneMap(zones_file, (int, str), start=0)
+        zone_map.add([[1, "a"]], [1])
+        zone_map.save()
+        zone_map.add([[2, "b"]], [1])
+        zone_map.save()
+        loaded = ZoneMap.load(zones_file, (int, str), start=0, end=2)
+        assert loaded is not None
+        assert loaded.zones[0].stats.row_count == 2
+        assert loaded.zones[0].stats.columns[1].max == "b"
+
+    def test_load_out_of_date(self, zones_file):
+        assert ZoneMap.load(zones_file, (int,), start=0, end=0) is None
+        zone_map = ZoneMap(zones_file, (int,), start=0)
+        zone_map.add([[1]], [1])
+        zone_map.save()
+        assert ZoneMap.load(zones_file, (int,), start=0, end=2) is None
+
+    def test_ranges(self, zones_file):
+        zone_map = ZoneMap(zones_file, (int,), start=0, rows_per_block=2)
+        zone_map.add([[i] for i in range(8)], [1] * 8)
+        ranges, skipped = zone_map.ranges(lambda stats: stats.columns[0].max != 3)
+        assert ranges == [(0, 2), (4, 8)]
+        assert skipped == 1
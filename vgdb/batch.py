@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from vgdb.codec import Row
+
+BATCH_SIZE = 4096
+
+Column = Sequence[Union[int, str]]
+BatchFilter = Callable[["Batch"], List[int]]
+
+
+@dataclass
+class Batch:
+    """Up to a few thousand rows stored as columns, of which the rows at the indices in selection are live
+
+    columns[i] holds the cells of column i for every row of the batch, or is None if column i was not read.
+    A selection of None means every row is live. Operators pass a batch on with a new selection instead of
+    copying the rows they drop.
+    """
+
+    columns: List[Optional[Column]]
+    length: int
+    selection: Optional[List[int]] = None
+
+    @property
+    def live(self) -> Sequence[int]:
+        return range(self.length) if self.selection is None else self.selection
+
+    def __len__(self) -> int:
+        return self.length if self.selection is None else len(self.selection)
+
+    def cells(self) -> Iterator[Tuple[Any, ...]]:
+        """The live rows as tuples, with None for the cells of columns that were not read"""
+        gathered: List[Any] = []
+        for column in self.columns:
+            if column is None:
+                gathered.append(repeat(None))
+            elif self.selection is None:
+                gathered.append(column)
+            else:
+                gathered.append([column[k] for k in self.selection])
+        return islice(zip(*gathered), len(self))
+
+    def row(self, k: int) -> Tuple[Any, ...]:
+        """The cells of row k of the batch"""
+        return tuple(None if column is None else column[k] for column in self.columns)
+
+    def to_rows(self) -> List[Row]:
+        """The live rows as lists, as read_rows yields them"""
+        return list(map(list, self.cells()))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], width: int, columns: Optional[Sequence[int]] = None) -> "Batch":
+        """Transpose rows of width cells into a batch, with only the columns at the indices in columns if given"""
+        if columns is None:
+            return cls(columns=list(zip(*rows)) if rows else [() for _ in range(width)], length=len(rows))
+        batch_columns: List[Optional[Column]] = [None] * width
+        for i in columns:
+            batch_columns[i] = list(map(itemgetter(i), rows))
+        return cls(columns=batch_columns, length=len(rows))
+
+
+def batched_rows(
+    rows: Iterable[Sequence[Any]], width: int, batch_size: int = BATCH_SIZE, columns: Optional[Sequence[int]] = None
+) -> Iterator[Batch]:
+    """Group rows of width cells into batches of batch_size rows, as in Batch.from_rows"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        yield Batch.from_rows(chunk, width, columns)
+
+
+def batched_blocks(
+    blocks: Iterable[List[Row]], width: int, batch_size: int = BATCH_SIZE, columns: Optional[Sequence[int]] = None
+) -> Iterator[Batch]:
+    """Batch rows that come in lists, joining lists into batches of at least batch_size rows but the last"""
+    pending: List[Row] = []
+    for rows in blocks:
+        pending += rows
+        if len(pending) >= batch_size:
+            yield Batch.from_rows(pending, width, columns)
+            pending = []
+    if pending:
+        yield Batch.from_rows(pending, width, columns)
@@ -0,0 +1,213 @@
+import struct
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from itertools import chain, groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from vgdb.storage import FORMAT_MARKER
+
+BTREE_FORMAT = b"B"
+NODE_SIZE = 4096
+TREE_HEADER = struct.Struct("<QQQ")
+NODE_HEADER = struct.Struct("<BHQ")
+ENTRY = struct.Struct("<IQ")
+CHILD = struct.Struct("<Q")
+LEAF_CAPACITY = (NODE_SIZE - NODE_HEADER.size) // ENTRY.size
+INTERNAL_CAPACITY = (NODE_SIZE - NODE_HEADER.size - CHILD.size) // (ENTRY.size + CHILD.size)
+MAX_KEY = (1 << 32) - 1
+
+Entry = Tuple[int, int]
+
+
+@dataclass
+class Node:
+    """A B-tree node
+
+    Leaves hold entries and the number of the next leaf, or 0 for the last one. Internal nodes hold
+    separator entries and one more child than separators, where child i holds the entries below entry i.
+    """
+
+    is_leaf: bool
+    entries: List[Entry] = field(default_factory=list)
+    children: List[int] = field(default_factory=list)
+    next_leaf: int = 0
+
+    def to_bytes(self) -> bytes:
+        parts = [NODE_HEADER.pack(self.is_leaf, len(self.entries), self.next_leaf)]
+        parts += [ENTRY.pack(*entry) for entry in self.entries]
+        parts += [CHILD.pack(child) for child in self.children]
+        data = b"".join(parts)
+        return data + bytes(NODE_SIZE - len(data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Node":
+        is_leaf, count, next_leaf = NODE_HEADER.unpack_from(data, 0)
+        end_of_entries = NODE_HEADER.size + count * ENTRY.size
+        entries = list(ENTRY.iter_unpack(data[NODE_HEADER.size : end_of_entries]))
+        children = [] if is_leaf else list(struct.unpack_from(f"<{count + 1}Q", data, end_of_entries))
+        return cls(is_leaf=bool(is_leaf), entries=entries, children=children, next_leaf=next_leaf)
+
+
+class BTree:
+    """B+tree from 4 byte int keys to row locations, stored in a file of NODE_SIZE byte nodes
+
+    Entries are (key, location) pairs, which are unique even when keys are not, and are kept in order of both.
+    Node 0 of the file holds FORMAT_MARKER, BTREE_FORMAT, the root node number, the number of nodes and the end
+    location of the table the tree covers. Nodes are read when first needed and kept in memory, and only the
+    nodes changed by inserts are written back, before the header.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._nodes: Dict[int, Node] = {}
+        self._dirty: Set[int] = set()
+        self.root = 1
+        self.number_of_nodes = 2
+        self.end = 0
+
+    def create(self, entries: Iterable[Entry], end: int) -> None:
+        """Write a new tree holding entries, by filling leaves in order and building each level above them"""
+        self._nodes = {}
+        self._dirty = set()
+        self.number_of_nodes = 1
+        ordered = sorted(entries)
+        level: List[Tuple[int, Optional[Entry]]] = []
+        for start in range(0, max(len(ordered), 1), LEAF_CAPACITY):
+            leaf = Node(is_leaf=True, entries=ordered[start : start + LEAF_CAPACITY])
+            if level:
+                self._nodes[level[-1][0]].next_leaf = self.number_of_nodes
+            level.append((self._add_node(leaf), leaf.entries[0] if leaf.entries else None))
+        while len(level) > 1:
+            parents: List[Tuple[int, Optional[Entry]]] = []
+            for start in range(0, len(level), INTERNAL_CAPACITY + 1):
+                group = level[start : start + INTERNAL_CAPACITY + 1]
+                node = Node(
+                    is_leaf=False,
+                    entries=[first for _, first in group[1:]],  # type: ignore
+                    children=[number for number, _ in group],
+                )
+                parents.append((self._add_node(node), group[0][1]))
+            level = parents
+        self.root = level[0][0]
+        self.end = end
+        self._path.write_bytes(b"")
+        self.save()
+
+    def open(self) -> bool:
+        """Read the header of the tree, returning False if there is no tree at path"""
+        try:
+            with self._path.open("rb") as f:
+                header = f.read(len(FORMAT_MARKER) + len(BTREE_FORMAT) + TREE_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) < len(FORMAT_MARKER) + len(BTREE_FORMAT) + TREE_HEADER.size:
+            return False
+        if not header.startswith(FORMAT_MARKER + BTREE_FORMAT):
+            return False
+        self.root, self.number_of_nodes, self.end = TREE_HEADER.unpack_from(header, len(FORMAT_MARKER) + 1)
+        self._nodes = {}
+        self._dirty = set()
+        return True
+
+    def save(self) -> None:
+        with self._path.open("r+b") as f:
+            for number in sorted(self._dirty):
+                f.seek(number * NODE_SIZE)
+                f.write(self._nodes[number].to_bytes())
+            f.seek(0)
+            f.write(FORMAT_MARKER + BTREE_FORMAT + TREE_HEADER.pack(self.root, self.number_of_nodes, self.end))
+        self._dirty = set()
+
+    def _add_node(self, node: Node) -> int:
+        number = self.number_of_nodes
+        self.number_of_nodes += 1
+        self._nodes[number] = node
+        self._dirty.add(number)
+        return number
+
+    def _node(self, number: int) -> Node:
+        node = self._nodes.get(number)
+        if node is None:
+            with self._path.open("rb") as f:
+                f.seek(number * NODE_SIZE)
+                node = Node.from_bytes(f.read(NODE_SIZE))
+            self._nodes[number] = node
+        return node
+
+    def insert_many(self, entries: Iterable[Entry], end: int) -> None:
+        for entry in entries:
+            split = self._insert(self.root, entry)
+            if split is not None:
+                separator, right = split
+                self.root = self._add_node(Node(is_leaf=False, entries=[separator], children=[self.root, right]))
+        self.end = end
+        self.save()
+
+    def _insert(self, number: int, entry: Entry) -> Optional[Tuple[Entry, int]]:
+        """Insert entry below node number, returning the separator and number of a new right sibling if it split"""
+        node = self._node(number)
+        if node.is_leaf:
+            insort(node.entries, entry)
+            self._dirty.add(number)
+            if len(node.entries) <= LEAF_CAPACITY:
+                return None
+            middle = len(node.entries) // 2
+            right = Node(is_leaf=True, entries=node.entries[middle:], next_leaf=node.next_leaf)
+            node.entries = node.entries[:middle]
+            node.next_leaf = self._add_node(right)
+            return right.entries[0], node.next_leaf
+        i = bisect_right(node.entries, entry)
+        split = self._insert(node.children[i], entry)
+        if split is None:
+            return None
+        separator, right_number = split
+        node.entries.insert(i, separator)
+        node.children.insert(i + 1, right_number)
+        self._dirty.add(number)
+        if len(node.entries) <= INTERNAL_CAPACITY:
+            return None
+        middle = len(node.entries) // 2
+        separator = node.entries[middle]
+        right = Node(is_leaf=False, entries=node.entries[middle + 1 :], children=node.children[middle + 1 :])
+        node.entries = node.entries[:middle]
+        node.children = node.children[: middle + 1]
+        return separator, self._add_node(right)
+
+    def range(self, low: Optional[int] = None, high: Optional[int] = None) -> Iterator[Entry]:
+        """Yield the entries with low <= key <= high in order, where a missing bound is unbounded"""
+        if low is not None and high is not None and low > high:
+            return
+        start: Entry = (-1, -1) if low is None else (low, -1)
+        number = self.root
+        node = self._node(number)
+        while not node.is_leaf:
+            number = node.children[bisect_right(node.entries, start)]
+            node = self._node(number)
+        i = bisect_left(node.entries, start)
+        while True:
+            for entry in node.entries[i:]:
+                if high is not None and entry[0] > high:
+                    return
+                yield entry
+            if node.next_leaf == 0:
+                return
+            node = self._node(node.next_leaf)
+            i = 0
+
+    def _leaves_from_last(self) -> Iterator[Node]:
+        """Yield the leaves from right to left, reading each one only when it is reached"""
+        numbers = [self.root]
+        while numbers:
+            node = self._node(numbers.pop())
+            if node.is_leaf:
+                yield node
+            else:
+                numbers += node.children
+
+    def descending(self) -> Iterator[Entry]:
+        """Yield the entries in descending key order, with the entries of each key still in location order"""
+        entries = chain.from_iterable(reversed(leaf.entries) for leaf in self._leaves_from_last())
+        for _, group in groupby(entries, key=itemgetter(0)):
+            yield from reversed(list(group))
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple, Union
+
+DEFAULT_CAPACITY_IN_PAGES = 1024
+
+PageKey = Tuple[str, int]
+DecodedPage = Tuple[Tuple[Union[int, str], ...], ...]
+
+
+class BufferPool:
+    """Size-bounded LRU cache of decoded pages
+
+    Pages are keyed by (filename, page number), so a single pool can be shared by every paged table.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY_IN_PAGES) -> None:
+        if capacity < 1:
+            raise ValueError("buffer pool capacity must be at least one page")
+        self.capacity = capacity
+        self._pages: "OrderedDict[PageKey, DecodedPage]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, key: PageKey, load: Callable[[], DecodedPage]) -> DecodedPage:
+        page = self._pages.get(key)
+        if page is not None:
+            self.hits += 1
+            self._pages.move_to_end(key)
+            return page
+        self.misses += 1
+        page = load()
+        self._pages[key] = page
+        while len(self._pages) > self.capacity:
+            self._pages.popitem(last=False)
+            self.evictions += 1
+        return page
+
+    def invalidate(self, key: PageKey) -> None:
+        self._pages.pop(key, None)
+
+    def invalidate_file(self, filename: str) -> None:
+        for key in [k for k in self._pages if k[0] == filename]:
+            del self._pages[key]
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pages": len(self._pages),
+            "capacity": self.capacity,
+        }
+
+
+buffer_pool = BufferPool()
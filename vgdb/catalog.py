@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from vgdb import VGDB_FILE_SUFFIX
+from vgdb.table import Table
+from vgdb.writer import WritePolicy
+
+FileSignature = Tuple[int, int]
+
+
+@dataclass
+class CatalogEntry:
+    table: Table
+    signature: FileSignature
+
+
+def file_signature(path: Path) -> FileSignature:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Catalog:
+    """The tables in the working directory, cached for a whole session
+
+    Tables are opened from their file headers only. On refresh, a table is opened again only if the
+    modification time or size of its file changed, and the cached Table is kept if its schema did not.
+    """
+
+    def __init__(self, write_policy: Optional[WritePolicy] = None) -> None:
+        self._write_policy = write_policy
+        self._entries: Dict[str, CatalogEntry] = {}
+        self.headers_read = 0
+
+    def refresh(self) -> Dict[str, Table]:
+        seen = set()
+        for p in Path.cwd().iterdir():
+            if p.suffix != f".{VGDB_FILE_SUFFIX}":
+                continue
+            table_name = p.stem
+            try:
+                signature = file_signature(p)
+            except FileNotFoundError:
+                continue
+            seen.add(table_name)
+            entry = self._entries.get(table_name)
+            if entry is not None and entry.signature == signature:
+                continue
+            table = Table.from_file(table_name, write_policy=self._write_policy)
+            self.headers_read += 1
+            if entry is None:
+                self._entries[table_name] = CatalogEntry(table=table, signature=signature)
+            elif entry.table.storage_type == table.storage_type and entry.table.columns == table.columns:
+                entry.table.invalidate_cache()
+                entry.signature = signature
+            else:
+                self._entries[table_name] = CatalogEntry(table=table, signature=signature)
+        for table_name in set(self._entries) - seen:
+            del self._entries[table_name]
+        return {table_name: entry.table for table_name, entry in self._entries.items()}
@@ -0,0 +1,253 @@
+import mmap
+import struct
+from itertools import chain
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+CHUNK_SIZE = 1 << 16
+NULL_BYTE = b"\x00"
+INT_STRUCT = struct.Struct("<I")
+
+Row = List[Union[int, str]]
+Buffer = Union[bytes, mmap.mmap]
+RowFilter = Tuple[Sequence[int], Callable[[Sequence[Union[int, str]]], bool]]
+
+
+def compile_decoder(
+    types: Sequence[Type],
+    single_row: bool = False,
+    columns: Optional[Sequence[int]] = None,
+    row_filter: Optional[RowFilter] = None,
+) -> Callable[[Buffer, int, int], Tuple[List[Row], int]]:
+    """Generate a decode function specialized for a schema
+
+    Each run of consecutive int columns is unpacked by one precompiled struct, and each text column is
+    sliced up to the next null byte. The generated function decodes the complete rows in data[pos:end]
+    and returns them along with the position right after the last complete row. With single_row, it
+    stops after the first row.
+
+    With columns, the cells of other columns are None: their text is skipped by finding the null byte
+    without building a string, and runs of their ints are skipped by their size.
+    With row_filter, only the cells of its columns are decoded at first, into a row where the other cells
+    are None. The other cells are only located, and decoded for the rows the filter accepts.
+    """
+    wanted = set(range(len(types))) if columns is None else set(columns)
+    early = set(wanted) if row_filter is None else set(row_filter[0])
+    wanted.update(early)
+    namespace: Dict[str, Any] = {"NULL_BYTE": NULL_BYTE}
+    lines = [
+        "def decode(data, pos, end):",
+        "    find = data.find",
+        "    rows = []",
+        "    append_row = rows.append",
+        "    while pos < end:",
+        "        cursor = pos",
+    ]
+    late_lines: List[str] = []
+    i = 0
+    while i < len(types):
+        if types[i] == str:
+            lines += [
+                f"        null_position_{i} = find(NULL_BYTE, cursor, end)",
+                f"        if null_position_{i} < 0:",
+                "            return rows, pos",
+            ]
+            if i in early:
+                lines.append(f"        cell_{i} = data[cursor:null_position_{i}].decode('ascii')")
+            elif i in wanted:
+                lines.append(f"        start_{i} = cursor")
+                late_lines.append(f"            row[{i}] = data[start_{i}:null_position_{i}].decode('ascii')")
+            lines.append(f"        cursor = null_position_{i} + 1")
+            i += 1
+        elif types[i] == int:
+            run = [i]
+            while i + len(run) < len(types) and types[i + len(run)] == int:
+                run.append(i + len(run))
+            unpack = struct.Struct(f"<{len(run)}I")
+            namespace[f"unpack_{i}"] = unpack.unpack_from
+            lines += [
+                f"        if cursor + {unpack.size} > end:",
+                "            return rows, pos",
+            ]
+            if early.intersection(run):
+                early.update(run)
+                lines.append(f"        {', '.join(f'cell_{j}' for j in run)}, = unpack_{i}(data, cursor)")
+            elif wanted.intersection(run):
+                lines.append(f"        start_{i} = cursor")
+                late_lines.append(f"            {', '.join(f'row[{j}]' for j in run)}, = unpack_{i}(data, start_{i})")
+            lines.append(f"        cursor += {unpack.size}")
+            i += len(run)
+        else:
+            raise ValueError(f"unsupported type {types[i]}")
+    cells = ", ".join(f"cell_{j}" if j in early else "None" for j in range(len(types)))
+    if row_filter is None:
+        lines.append(f"        append_row([{cells}])")
+    else:
+        namespace["matches"] = row_filter[1]
+        lines += [
+            f"        row = [{cells}]",
+            "        if matches(row):",
+            *late_lines,
+            "            append_row(row)",
+        ]
+    lines.append("        pos = cursor")
+    if single_row:
+        lines.append("        break")
+    lines.append("    return rows, pos")
+    exec(compile("\n".join(lines), "<row decoder>", "exec"), namespace)
+    return namespace["decode"]  # type: ignore
+
+
+class RowCodec:
+    """Encodes rows to and decodes rows from the table file row format
+
+    A row is its cells in column order: ints as 4 byte little-endian ints and text as null-terminated ascii.
+    Decoding works on whole blocks of bytes with a function generated for the schema by compile_decoder.
+    bytes_read counts the bytes that decode_row and the iter methods have gone through.
+    """
+
+    def __init__(self, types: Sequence[Type]) -> None:
+        self._types = tuple(types)
+        self._decode = compile_decoder(self._types)
+        self._decode_row = compile_decoder(self._types, single_row=True)
+        self.bytes_read = 0
+
+    def encode(self, row: Sequence[Union[int, str]]) -> bytes:
+        if len(row) != len(self._types):
+            raise ValueError(f"expected {len(self._types)} values, got {len(row)}")
+        values: List[bytes] = []
+        for cell, typ in zip(row, self._types):
+            if typ == str:
+                values.append(str(cell).encode("ascii") + NULL_BYTE)
+            else:
+                try:
+                    values.append(INT_STRUCT.pack(int(cell)))
+                except struct.error:
+                    raise ValueError(f"{cell} does not fit in a 4 byte int")
+        return b"".join(values)
+
+    def encode_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> bytes:
+        return b"".join(self.encode(row) for row in rows)
+
+    def decode(self, data: Buffer, pos: int = 0, end: Optional[int] = None) -> Tuple[List[Row], int]:
+        """Decode the complete rows in data[pos:end]
+
+        Returns the rows and the position right after the last complete row.
+        """
+        if end is None:
+            end = len(data)
+        return self._decode(data, pos, end)
+
+    def decode_row(self, data: Buffer, pos: int, end: Optional[int] = None) -> Tuple[Optional[Row], int]:
+        """Decode the row starting at pos, or return None if data[pos:end] does not hold all of it"""
+        rows, end_of_row = self._decode_row(data, pos, len(data) if end is None else end)
+        self.bytes_read += end_of_row - pos
+        return (rows[0] if rows else None), end_of_row
+
+    def _decoder(
+        self, columns: Optional[Sequence[int]], row_filter: Optional[RowFilter]
+    ) -> Callable[[Buffer, int, int], Tuple[List[Row], int]]:
+        if columns is None and row_filter is None:
+            return self._decode
+        return compile_decoder(self._types, columns=columns, row_filter=row_filter)
+
+    def iter_buffer(
+        self,
+        data: Buffer,
+        pos: int,
+        end: int,
+        chunk_size: int = CHUNK_SIZE,
+        columns: Optional[Sequence[int]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[Row]:
+        """Lazily decode the rows in data[pos:end], one window of about chunk_size bytes at a time
+
+        With columns, only the cells at these indices are decoded, and the others are None.
+        With row_filter, only the rows it accepts are yielded, and the other cells of the rows it rejects are
+        never decoded.
+        """
+        return chain.from_iterable(self.iter_buffer_blocks(data, pos, end, chunk_size, columns, row_filter))
+
+    def iter_buffer_blocks(
+        self,
+        data: Buffer,
+        pos: int,
+        end: int,
+        chunk_size: int = CHUNK_SIZE,
+        columns: Optional[Sequence[int]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Row]]:
+        """Yield the rows iter_buffer yields as the list decoded from each window"""
+        decode = self._decoder(columns, row_filter)
+        window = chunk_size
+        while pos < end:
+            rows, new_pos = decode(data, pos, min(pos + window, end))
+            if new_pos == pos:
+                if pos + window >= end:
+                    raise ValueError("table data ends with an incomplete row")
+                window *= 2
+                continue
+            window = chunk_size
+            self.bytes_read += new_pos - pos
+            pos = new_pos
+            yield rows
+
+    def iter_file_with_positions(
+        self, f: IO[bytes], pos: int, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[Tuple[int, Row]]:
+        """Decode the rows from position pos of f to its end, yielding each with the position it starts at"""
+        f.seek(pos)
+        data = b""
+        offset = 0
+        while True:
+            rows, end = self._decode_row(data, offset, len(data))
+            if rows:
+                yield pos + offset, rows[0]
+                offset = end
+                continue
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pos += offset
+            data = data[offset:] + chunk
+            offset = 0
+        if offset < len(data):
+            raise ValueError("table data ends with an incomplete row")
+
+    def iter_file(
+        self,
+        f: IO[bytes],
+        chunk_size: int = CHUNK_SIZE,
+        size: Optional[int] = None,
+        columns: Optional[Sequence[int]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[Row]:
+        """Decode the rows in the next size bytes of f, or up to its end, reading chunk_size bytes at a time
+
+        columns and row_filter are as in iter_buffer.
+        """
+        return chain.from_iterable(self.iter_file_blocks(f, chunk_size, size, columns, row_filter))
+
+    def iter_file_blocks(
+        self,
+        f: IO[bytes],
+        chunk_size: int = CHUNK_SIZE,
+        size: Optional[int] = None,
+        columns: Optional[Sequence[int]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Row]]:
+        """Yield the rows iter_file yields as the list decoded from each read"""
+        decode = self._decoder(columns, row_filter)
+        pending = b""
+        while size is None or size > 0:
+            chunk = f.read(chunk_size if size is None else min(chunk_size, size))
+            if not chunk:
+                break
+            if size is not None:
+                size -= len(chunk)
+            self.bytes_read += len(chunk)
+            data = pending + chunk if pending else chunk
+            rows, pos = decode(data, 0, len(data))
+            pending = data[pos:]
+            yield rows
+        if pending:
+            raise ValueError("table data ends with an incomplete row")
@@ -0,0 +1,298 @@
+import struct
+from contextlib import ExitStack
+from itertools import islice, repeat
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from vgdb import VGDB_FILE_SUFFIX
+from vgdb.batch import BATCH_SIZE, Batch, BatchFilter, Column
+from vgdb.codec import Row, RowFilter
+from vgdb.kernels import ints_from_bytes, take
+from vgdb.stats import TableStats
+from vgdb.storage import COLUMNAR_FORMAT, FORMAT_MARKER, StorageInterface, read_schema, write_schema
+from vgdb.zone_map import BlockFilter, ZoneMap
+
+ROWS_PER_CHUNK = 4096
+INT_SIZE = 4
+OFFSET_SIZE = 8
+
+
+def segment_paths(filename: str, column: str, typ: Type) -> Tuple[Path, ...]:
+    prefix = f"{filename}.{VGDB_FILE_SUFFIX}.{column}"
+    if typ == int:
+        return (Path(f"{prefix}.int"),)
+    return Path(f"{prefix}.offsets"), Path(f"{prefix}.text")
+
+
+def read_ints(f: IO[bytes], start: int, count: int) -> Tuple[int, ...]:
+    f.seek(start * INT_SIZE)
+    return struct.unpack(f"<{count}I", f.read(count * INT_SIZE))
+
+
+def read_int_array(f: IO[bytes], start: int, count: int) -> Sequence[int]:
+    f.seek(start * INT_SIZE)
+    return ints_from_bytes(f.read(count * INT_SIZE))
+
+
+def read_texts(
+    offsets: IO[bytes], blob: IO[bytes], start: int, count: int, indices: Optional[Sequence[int]] = None
+) -> Tuple[List[str], int]:
+    """The texts of rows start to start + count, or only of the rows at indices into them if given
+
+    Also returns the number of bytes read from the segments.
+    """
+    if start == 0:
+        offsets.seek(0)
+        ends = (0,) + struct.unpack(f"<{count}Q", offsets.read(count * OFFSET_SIZE))
+    else:
+        offsets.seek((start - 1) * OFFSET_SIZE)
+        ends = struct.unpack(f"<{count + 1}Q", offsets.read((count + 1) * OFFSET_SIZE))
+    first = ends[0]
+    blob.seek(first)
+    data = blob.read(ends[-1] - first)
+    if indices is None:
+        indices = range(count)
+    texts = [data[ends[k] - first : ends[k + 1] - first].decode("ascii") for k in indices]
+    return texts, len(ends) * OFFSET_SIZE + len(data)
+
+
+class ColumnarStorage(StorageInterface):
+    """Storage layer for a table, with each column in its own segment files
+
+    Table file schema:
+    - FORMAT_MARKER, COLUMNAR_FORMAT and the column count, names and types as in PersistentStorage
+    - TableStats, with the total size of the segments as byte size
+
+    A ZoneMap by row number is kept in {table}.vgdb.zones, and rebuilt from the segments if it is out of date.
+
+    Segment files, next to the table file:
+    - int columns: {table}.vgdb.{column}.int, the cells as packed 4 byte little-endian ints
+    - text columns: {table}.vgdb.{column}.text with the cells concatenated, and {table}.vgdb.{column}.offsets
+      with the end offset of each cell in it as an 8 byte little-endian int
+
+    Scans read only the segments of the columns they are asked for.
+    """
+
+    def __init__(self, filename: str, columns: Sequence[Tuple[str, Type]]) -> None:
+        self._file = Path(f"{filename}.{VGDB_FILE_SUFFIX}")
+        self._filename = filename
+        self._spec = tuple(type_ for name, type_ in columns)
+        self._columns_as_they_came = columns
+        self._columns: Dict[str, Type] = {name: type_ for name, type_ in columns}
+        self._segments = [segment_paths(filename, name, typ) for name, typ in self._columns.items()]
+        self._stats_offset = len(FORMAT_MARKER) + len(COLUMNAR_FORMAT) + self._infer_header_bytes()
+        self.stats: Optional[TableStats] = None
+        self._zones_file = Path(f"{self._file}.zones")
+        self._zone_map: Optional[ZoneMap] = None
+        self.blocks_skipped = 0
+        self._bytes_read = 0
+
+    def persist(self) -> None:
+        try:
+            with self._file.open("bx") as f:
+                f.write(FORMAT_MARKER)
+                f.write(COLUMNAR_FORMAT)
+                write_schema(f, self._columns)
+                f.write(TableStats(types=self._spec).to_bytes())
+        except FileExistsError:
+            raise ValueError("File exists")
+        for paths in self._segments:
+            for path in paths:
+                path.open("wb").close()
+        self.stats = TableStats(types=self._spec)
+
+    def _load_stats(self) -> None:
+        """Read the stats from the table file, and only trust them if they cover exactly the segments"""
+        with self._file.open("rb") as f:
+            f.seek(self._stats_offset)
+            stats = TableStats.from_bytes(self._spec, f.read(TableStats.block_size(self._spec)))
+        segments_size = sum(path.stat().st_size for paths in self._segments for path in paths)
+        self.stats = stats if stats.byte_size == segments_size else None
+
+    def _load_zones(self) -> ZoneMap:
+        number_of_rows = self.number_of_rows
+        zone_map = ZoneMap.load(self._zones_file, self._spec, 0, number_of_rows)
+        if zone_map is None:
+            zone_map = ZoneMap(self._zones_file, self._spec, 0)
+            rows = list(self.read_rows())
+            zone_map.add(rows, [1] * len(rows))
+            zone_map.save()
+        self._zone_map = zone_map
+        return zone_map
+
+    def invalidate_cache(self) -> None:
+        self._zone_map = None
+        self._load_stats()
+
+    def delete(self) -> None:
+        self._zone_map = None
+        self._file.unlink()
+        ZoneMap(self._zones_file, self._spec, 0).delete()
+        for paths in self._segments:
+            for path in paths:
+                if path.exists():
+                    path.unlink()
+
+    @classmethod
+    def from_file(cls, table_name: str) -> "ColumnarStorage":
+        with open(f"{table_name}.{VGDB_FILE_SUFFIX}", "rb") as f:
+            marker = f.read(len(FORMAT_MARKER) + len(COLUMNAR_FORMAT))
+            if marker != FORMAT_MARKER + COLUMNAR_FORMAT:
+                raise ValueError(f"table {table_name} is not stored in columns")
+            columns = read_schema(f)
+        s = ColumnarStorage(filename=table_name, columns=columns)
+        s._load_stats()
+        return s
+
+    @property
+    def number_of_rows(self) -> int:
+        typ = self._spec[0]
+        size = self._segments[0][0].stat().st_size
+        return size // INT_SIZE if typ == int else size // OFFSET_SIZE
+
+    def insert(self, row: Sequence[Union[int, str]]) -> None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> List[int]:
+        """Encode every column of the batch before appending one write to each segment
+
+        The location of a row is its row number.
+        """
+        if not rows:
+            return []
+        for row in rows:
+            if len(row) != len(self._spec):
+                raise ValueError(f"expected {len(self._spec)} values, got {len(row)}")
+        encoded: List[Tuple[bytes, ...]] = []
+        for i, (typ, paths) in enumerate(zip(self._spec, self._segments)):
+            if typ == int:
+                try:
+                    encoded.append((struct.pack(f"<{len(rows)}I", *(int(row[i]) for row in rows)),))
+                except struct.error:
+                    raise ValueError("int values must fit in 4 bytes")
+            else:
+                texts = [str(row[i]).encode("ascii") for row in rows]
+                end = paths[1].stat().st_size
+                ends = []
+                for text in texts:
+                    end += len(text)
+                    ends.append(end)
+                encoded.append((struct.pack(f"<{len(ends)}Q", *ends), b"".join(texts)))
+        zone_map = self._load_zones() if self._zone_map is None else self._zone_map
+        zone_map.add(rows, [1] * len(rows))
+        zone_map.save()
+        if self.stats is not None:
+            self.stats.update(rows, sum(len(segment_data) for data in encoded for segment_data in data))
+            with self._file.open("r+b") as f:
+                f.seek(self._stats_offset)
+                f.write(self.stats.to_bytes())
+        for paths, data in zip(self._segments, encoded):
+            for path, segment_data in zip(paths, data):
+                with path.open("ab") as f:
+                    f.write(segment_data)
+        return list(range(zone_map.end - len(rows), zone_map.end))
+
+    @property
+    def end_location(self) -> int:
+        return self.number_of_rows
+
+    @property
+    def bytes_read(self) -> int:
+        return self._bytes_read
+
+    def read_rows_with_locations(self, columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Row]]:
+        return enumerate(self.read_rows(columns=columns))
+
+    def read_rows_at(self, locations: Iterable[int], columns: Optional[Sequence[int]] = None) -> Iterator[Row]:
+        wanted = range(len(self._spec)) if columns is None else sorted(set(columns))
+        with ExitStack() as stack:
+            files: Dict[int, Tuple[IO[bytes], ...]] = {
+                i: tuple(stack.enter_context(path.open("rb")) for path in self._segments[i]) for i in wanted
+            }
+            for location in locations:
+                row: Row = [None] * len(self._spec)  # type: ignore
+                for i, segment_files in files.items():
+                    (row[i],) = self._read_cells(segment_files, i, location, 1)
+                yield row
+
+    def read_rows(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Union[int, str]]]:
+        for batch in self.read_batches(columns, block_filter, row_filter, batch_size=ROWS_PER_CHUNK):
+            yield from batch.to_rows()
+
+    def read_batches(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+        batch_size: int = BATCH_SIZE,
+        batch_filter: Optional[BatchFilter] = None,
+    ) -> Iterator[Batch]:
+        """Yield batches of batch_size rows, read from the segments of the wanted columns as they are
+
+        With row_filter, the columns of the filter are read first, and the other columns only for the span of
+        rows in the batch that the filter accepts. With batch_filter too, the int columns of the filter are
+        read as arrays if NumPy is installed, and the rows are selected by batch_filter.
+        """
+        wanted = range(len(self._spec)) if columns is None else sorted(set(columns))
+        early = wanted if row_filter is None else sorted(set(row_filter[0]))
+        late = [i for i in wanted if i not in early]
+        ranges = [(0, self.number_of_rows)]
+        if block_filter is not None:
+            zone_map = self._zone_map
+            if zone_map is None or zone_map.end != ranges[0][1]:
+                zone_map = self._load_zones()
+            ranges, skipped = zone_map.ranges(block_filter)
+            self.blocks_skipped += skipped
+        with ExitStack() as stack:
+            files: Dict[int, Tuple[IO[bytes], ...]] = {
+                i: tuple(stack.enter_context(path.open("rb")) for path in self._segments[i]) for i in {*early, *late}
+            }
+            chunks = (
+                (start, min(batch_size, end - start))
+                for first, end in ranges
+                for start in range(first, end, batch_size)
+            )
+            for start, count in chunks:
+                batch_columns: List[Optional[Column]] = [None] * len(self._spec)
+                if row_filter is None:
+                    for i in early:
+                        batch_columns[i] = self._read_cells(files[i], i, start, count)
+                    yield Batch(columns=batch_columns, length=count)
+                    continue
+                for i in early:
+                    if batch_filter is not None and self._spec[i] == int:
+                        batch_columns[i] = read_int_array(files[i][0], start, count)
+                        self._bytes_read += count * INT_SIZE
+                    else:
+                        batch_columns[i] = self._read_cells(files[i], i, start, count)
+                if batch_filter is not None:
+                    accepted = batch_filter(Batch(columns=batch_columns, length=count))
+                else:
+                    matches = row_filter[1]
+                    cells = [repeat(None) if column is None else column for column in batch_columns]
+                    accepted = [k for k, row in enumerate(islice(zip(*cells), count)) if matches(row)]
+                if not accepted:
+                    continue
+                first, last = accepted[0], accepted[-1]
+                indices = [k - first for k in accepted]
+                batch_columns = [None if column is None else take(column, accepted) for column in batch_columns]
+                for i in late:
+                    batch_columns[i] = self._read_cells(files[i], i, start + first, last - first + 1, indices)
+                yield Batch(columns=batch_columns, length=len(accepted))
+
+    def _read_cells(
+        self, files: Tuple[IO[bytes], ...], i: int, start: int, count: int, indices: Optional[Sequence[int]] = None
+    ) -> Sequence[Union[int, str]]:
+        """The cells of column i in rows start to start + count, or only of the rows at indices into them if given"""
+        if self._spec[i] == str:
+            texts, size = read_texts(files[0], files[1], start, count, indices)
+            self._bytes_read += size
+            return texts
+        ints = read_ints(files[0], start, count)
+        self._bytes_read += count * INT_SIZE
+        return ints if indices is None else [ints[k] for k in indices]
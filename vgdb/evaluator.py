@@ -1,21 +1,51 @@
-from typing import Dict, List, Union
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from vgdb.statement import CreateTable, Insert, Select
+from vgdb.operators import Filter, IndexScan, Limit, Operator, Project, Scan, Sort
+from vgdb.prepared import PreparedStatement, StatementCache, has_parameters
+from vgdb.statement import CreateIndex, CreateTable, Explain, Insert, Select
 from vgdb.table import Table
 
 
 class Evaluator:
-    def __init__(self, tables: Dict[str, Table]):
+    def __init__(self, tables: Dict[str, Table], statement_cache: Optional[StatementCache] = None):
         self.tables = tables
+        self.statement_cache = StatementCache() if statement_cache is None else statement_cache
 
-    def handle_command(self, command: Union[CreateTable, Insert, Select]) -> Union[str, List[List[Union[str, int]]]]:
+    def prepare(self, sql: str) -> PreparedStatement:
+        """Parse a statement, which may have ? placeholders, or take it from the cache if its text was seen"""
+        return self.statement_cache.get(sql)
+
+    def execute(
+        self, statement: Union[str, PreparedStatement], parameters: Sequence[Union[int, str]] = ()
+    ) -> Union[str, List[List[Union[str, int]]]]:
+        """Run a prepared statement, or the statement in a string, with parameters bound to its placeholders"""
+        if isinstance(statement, str):
+            statement = self.prepare(statement)
+        return self.run_command(statement.bind(parameters))
+
+    def handle_command(
+        self, command: Union[CreateTable, CreateIndex, Insert, Select, Explain]
+    ) -> Union[str, List[List[Union[str, int]]]]:
+        if has_parameters(command):
+            raise ValueError("? placeholders need parameters: prepare the statement and execute it with them")
+        return self.run_command(command)
+
+    def run_command(
+        self, command: Union[CreateTable, CreateIndex, Insert, Select, Explain]
+    ) -> Union[str, List[List[Union[str, int]]]]:
+        """Run a statement whose placeholders, if it had any, are bound"""
         result: Union[str, List[List[Union[str, int]]]]
         if isinstance(command, CreateTable):
             result = self.handle_create(command)
+        elif isinstance(command, CreateIndex):
+            result = self.handle_create_index(command)
         elif isinstance(command, Select):
             result = self.handle_select(command=command)
         elif isinstance(command, Insert):
             result = self.handle_insert(command=command)
+        elif isinstance(command, Explain):
+            result = self.handle_explain(command=command)
         else:
             raise ValueError("Command not handled. This shouldn't happen")
         return result
@@ -29,17 +59,52 @@ class Evaluator:
             table.persist()
             return f"Created table {table.name} with schema {table.columns}."
 
+    def handle_create_index(self, command: CreateIndex) -> str:
+        table = self.tables.get(command.table_name)
+        if table is None:
+            raise ValueError(f"table {command.table_name} does not exist")
+        table.create_index(name=command.index_name, column=command.column, kind=command.kind)
+        return f"Created index {command.index_name} on {table.name} ({command.column})."
+
     def handle_insert(self, command: Insert) -> str:
         table = self.tables.get(command.table_name)
         if table is None:
             raise ValueError(f"table {command.table_name} does not exist")
         try:
-            table.insert(command.values)
+            table.insert_many(command.values)
         except ValueError:
             raise ValueError(f"attempted to insert invalid record, table has schema {table.columns}")
         return "OK"
 
+    def flush(self) -> None:
+        """Write rows buffered under a group commit policy to the table files"""
+        for table in self.tables.values():
+            table.flush()
+
     def handle_select(self, command: Select) -> List[List[Union[str, int]]]:
+        table, table_indices = self.select_table(command)
+        if table.row_count == 0:
+            return []
+        if command.where is not None and not table.may_match(command.where):
+            return []
+        return self.run(self.plan_select(command, table, table_indices))
+
+    def handle_explain(self, command: Explain) -> str:
+        """Describe the operators a SELECT runs as, one per line below the one it feeds
+
+        With ANALYZE, the SELECT is run, and each line tells how many rows the operator took in and passed
+        on, and the time spent and the bytes of table data read in the operator itself.
+        """
+        table, table_indices = self.select_table(command.select)
+        plan = self.plan_select(command.select, table, table_indices)
+        if command.analyze:
+            plan.instrument(lambda: table.bytes_read)
+            start = perf_counter()
+            self.run(plan)
+            return "\n".join(plan.explain() + [f"Execution time: {(perf_counter() - start) * 1000:.3f} ms"])
+        return "\n".join(plan.explain())
+
+    def select_table(self, command: Select) -> Tuple[Table, List[int]]:
         table = self.tables.get(command.table_name)
         if table is None:
             raise ValueError(f"table {command.table_name} does not exist")
@@ -48,15 +113,30 @@ class Evaluator:
             raise ValueError(
                 f"incorrect columns {', '.join(command.columns)} in SELECT: table has schema {table.columns}"
             )
-        rows = table.all_rows()
-        if command.where is not None:
-            rows = table.where(rows=rows, where=command.where)
-        if command.order_by is not None:
-            rows = table.order_by(rows=rows, order_by=command.order_by)
+        return table, table_indices
+
+    def run(self, plan: Operator) -> List[List[Union[str, int]]]:
+        rows: List[List[Union[str, int]]] = []
+        for batch in plan.batches():
+            rows += batch.to_rows()
+        return rows
+
+    def plan_select(self, command: Select, table: Table, table_indices: Sequence[int]) -> Operator:
+        """Build the operators of a SELECT, reading through an index if one applies"""
+        columns = table.referenced_column_indices(command)
+        indexed = table.indexed_rows(where=command.where, order_by=command.order_by, columns=columns)
+        plan: Operator
+        ordered = False
+        if indexed is None:
+            plan = Scan(table, columns=columns, where=command.where)
+        else:
+            rows, ordered = indexed
+            plan = IndexScan(table, rows, columns, index_names=table.indexes_used)
+            if command.where is not None:
+                plan = Filter(plan, table, command.where)
+        if command.order_by is not None and not ordered:
+            top = None if command.limit is None else command.limit + (command.offset or 0)
+            plan = Sort(plan, table, command.order_by, limit=top, columns=columns)
         if command.limit is not None:
-            rows = table.limit(rows=rows, limit=command.limit, offset=command.offset)
-        to_return = []
-        for row in rows:
-            row_subset = [row[i] for i in table_indices]
-            to_return.append(row_subset)
-        return to_return
+            plan = Limit(plan, command.limit, command.offset)
+        return Project(plan, table, table_indices)
@@ -0,0 +1,88 @@
+import heapq
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Type
+
+from vgdb.codec import Row, RowCodec
+
+SORT_MEMORY_BUDGET = 64 << 20
+INT_SIZE = 4
+ROWS_PER_WRITE = 4096
+
+
+@dataclass
+class SortCounters:
+    runs_spilled: int = 0
+    bytes_written: int = 0
+
+
+class ExternalSort:
+    """Sort rows within a memory budget, spilling sorted runs to temporary files
+
+    Rows are collected until their size in the row encoding reaches memory_budget bytes, and then sorted
+    and written to a temporary file as one run. The runs are merged lazily as the sorted rows are consumed,
+    along with the rows still in memory. Only the cells at the indices in columns are written, so rows
+    where the other cells are None can be spilled, and they are None again when read back. Ties keep the
+    order the rows came in.
+    """
+
+    def __init__(
+        self,
+        types: Sequence[Type],
+        key: Callable[[Sequence[Any]], Any],
+        columns: Optional[Sequence[int]] = None,
+        memory_budget: int = SORT_MEMORY_BUDGET,
+        counters: Optional[SortCounters] = None,
+    ) -> None:
+        self._types = tuple(types)
+        self._key = key
+        self._columns = list(range(len(types))) if columns is None else sorted(set(columns))
+        self._codec = RowCodec([self._types[i] for i in self._columns])
+        self._text_columns = [i for i in self._columns if self._types[i] == str]
+        self._fixed_size = INT_SIZE * (len(self._columns) - len(self._text_columns)) + len(self._text_columns)
+        self.memory_budget = memory_budget
+        self.counters = SortCounters() if counters is None else counters
+
+    def _size(self, row: Sequence[Any]) -> int:
+        return self._fixed_size + sum(len(row[i]) for i in self._text_columns)  # type: ignore
+
+    def _spill(self, rows: List[Sequence[Any]]) -> IO[bytes]:
+        rows.sort(key=self._key)
+        f = tempfile.TemporaryFile()
+        for start in range(0, len(rows), ROWS_PER_WRITE):
+            batch = rows[start : start + ROWS_PER_WRITE]
+            data = self._codec.encode_many([[row[i] for i in self._columns] for row in batch])
+            f.write(data)
+            self.counters.bytes_written += len(data)
+        self.counters.runs_spilled += 1
+        f.seek(0)
+        return f
+
+    def _read_run(self, f: IO[bytes]) -> Iterator[Row]:
+        width = len(self._types)
+        for cells in self._codec.iter_file(f):
+            row: Row = [None] * width  # type: ignore
+            for i, cell in zip(self._columns, cells):
+                row[i] = cell
+            yield row
+
+    def sort(self, rows: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        runs: List[IO[bytes]] = []
+        try:
+            buffer: List[Sequence[Any]] = []
+            size = 0
+            for row in rows:
+                buffer.append(row)
+                size += self._size(row)
+                if size >= self.memory_budget:
+                    runs.append(self._spill(buffer))
+                    buffer = []
+                    size = 0
+            buffer.sort(key=self._key)
+            if not runs:
+                yield from buffer
+                return
+            yield from heapq.merge(*(self._read_run(f) for f in runs), buffer, key=self._key)
+        finally:
+            for f in runs:
+                f.close()
@@ -1,15 +1,9 @@
-from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
-from vgdb import VGDB_FILE_SUFFIX
+from vgdb.catalog import Catalog
 from vgdb.table import Table
+from vgdb.writer import WritePolicy
 
 
-def get_tables() -> Dict[str, Table]:
-    tables: Dict[str, Table] = {}
-    for p in Path.cwd().iterdir():
-        if p.suffix == f".{VGDB_FILE_SUFFIX}":
-            table_name = p.stem
-            table = Table.from_file(table_name)
-            tables[table_name] = table
-    return tables
+def get_tables(write_policy: Optional[WritePolicy] = None) -> Dict[str, Table]:
+    return Catalog(write_policy=write_policy).refresh()
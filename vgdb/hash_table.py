@@ -0,0 +1,160 @@
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from vgdb.storage import FORMAT_MARKER
+
+HASH_FORMAT = b"H"
+PAGE_SIZE = 4096
+TABLE_HEADER = struct.Struct("<QQQQ")
+PAGE_HEADER = struct.Struct("<HQ")
+ENTRY = struct.Struct("<IQ")
+PAGE_CAPACITY = (PAGE_SIZE - PAGE_HEADER.size) // ENTRY.size
+MAX_LOAD = 0.75
+MAX_INT_KEY = (1 << 32) - 1
+
+Entry = Tuple[int, int]
+
+
+def hash_key(key: Union[int, str]) -> int:
+    """A hash of key that is the same in every process, unlike hash() of a str
+
+    Ints that a row can hold are hashed as 4 byte unsigned ints, and any other int by its signed bytes.
+    """
+    if isinstance(key, int):
+        if 0 <= key <= MAX_INT_KEY:
+            return zlib.crc32(struct.pack("<I", key))
+        return zlib.crc32(key.to_bytes(key.bit_length() // 8 + 1, "little", signed=True))
+    return zlib.crc32(key.encode("ascii"))
+
+
+@dataclass
+class BucketPage:
+    """A page of (hash, location) entries in a bucket, and the number of its overflow page, or 0 if none"""
+
+    entries: List[Entry] = field(default_factory=list)
+    overflow: int = 0
+
+    def to_bytes(self) -> bytes:
+        data = PAGE_HEADER.pack(len(self.entries), self.overflow) + b"".join(ENTRY.pack(*e) for e in self.entries)
+        return data + bytes(PAGE_SIZE - len(data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BucketPage":
+        count, overflow = PAGE_HEADER.unpack_from(data, 0)
+        entries = list(ENTRY.iter_unpack(data[PAGE_HEADER.size : PAGE_HEADER.size + count * ENTRY.size]))
+        return cls(entries=entries, overflow=overflow)
+
+
+class HashTable:
+    """Static hash table from keys to row locations, stored in a file of PAGE_SIZE byte pages
+
+    Page 0 holds FORMAT_MARKER, HASH_FORMAT, the number of buckets, the number of pages, the number of entries
+    and the end location of the table it covers. Bucket i starts at page i + 1, and full bucket pages are
+    chained to overflow pages at the end of the file. Entries hold the hash of a key rather than the key,
+    so a lookup reads one bucket and returns the locations of every row whose key has the same hash.
+    The buckets are doubled by building the table again once it is loaded beyond MAX_LOAD.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._pages: Dict[int, BucketPage] = {}
+        self._dirty: Set[int] = set()
+        self.bucket_count = 1
+        self.number_of_pages = 2
+        self.number_of_entries = 0
+        self.end = 0
+
+    def create(self, entries: Iterable[Tuple[Union[int, str], int]], end: int) -> None:
+        self._create([(hash_key(key), location) for key, location in entries], end)
+
+    def _create(self, hashed: List[Entry], end: int, bucket_count: int = 1) -> None:
+        while len(hashed) > bucket_count * PAGE_CAPACITY * MAX_LOAD / 2:
+            bucket_count *= 2
+        self.bucket_count = bucket_count
+        self.number_of_pages = bucket_count + 1
+        self.number_of_entries = 0
+        self._pages = {number: BucketPage() for number in range(1, bucket_count + 1)}
+        self._dirty = set(self._pages)
+        self._path.write_bytes(b"")
+        self._add(hashed)
+        self.end = end
+        self.save()
+
+    def open(self) -> bool:
+        """Read the header of the table, returning False if there is no table at path"""
+        header_size = len(FORMAT_MARKER) + len(HASH_FORMAT) + TABLE_HEADER.size
+        try:
+            with self._path.open("rb") as f:
+                header = f.read(header_size)
+        except FileNotFoundError:
+            return False
+        if len(header) < header_size or not header.startswith(FORMAT_MARKER + HASH_FORMAT):
+            return False
+        self.bucket_count, self.number_of_pages, self.number_of_entries, self.end = TABLE_HEADER.unpack_from(
+            header, len(FORMAT_MARKER) + len(HASH_FORMAT)
+        )
+        self._pages = {}
+        self._dirty = set()
+        return True
+
+    def save(self) -> None:
+        with self._path.open("r+b") as f:
+            for number in sorted(self._dirty):
+                f.seek(number * PAGE_SIZE)
+                f.write(self._pages[number].to_bytes())
+            f.seek(0)
+            header = TABLE_HEADER.pack(self.bucket_count, self.number_of_pages, self.number_of_entries, self.end)
+            f.write(FORMAT_MARKER + HASH_FORMAT + header)
+        self._dirty = set()
+
+    def _page(self, number: int) -> BucketPage:
+        page = self._pages.get(number)
+        if page is None:
+            with self._path.open("rb") as f:
+                f.seek(number * PAGE_SIZE)
+                page = BucketPage.from_bytes(f.read(PAGE_SIZE))
+            self._pages[number] = page
+        return page
+
+    def _bucket(self, hashed_key: int) -> Iterator[Tuple[int, BucketPage]]:
+        number = hashed_key % self.bucket_count + 1
+        while number:
+            page = self._page(number)
+            yield number, page
+            number = page.overflow
+
+    def _add(self, hashed: Iterable[Entry]) -> None:
+        for entry in hashed:
+            *_, (number, page) = self._bucket(entry[0])
+            if len(page.entries) == PAGE_CAPACITY:
+                page.overflow = self.number_of_pages
+                self._dirty.add(number)
+                number, page = self.number_of_pages, BucketPage()
+                self._pages[number] = page
+                self.number_of_pages += 1
+            page.entries.append(entry)
+            self._dirty.add(number)
+            self.number_of_entries += 1
+
+    def insert_many(self, entries: Iterable[Tuple[Union[int, str], int]], end: int) -> None:
+        hashed = [(hash_key(key), location) for key, location in entries]
+        if self.number_of_entries + len(hashed) > self.bucket_count * PAGE_CAPACITY * MAX_LOAD:
+            self._create(list(self._entries()) + hashed, end, self.bucket_count * 2)
+            return
+        self._add(hashed)
+        self.end = end
+        self.save()
+
+    def _entries(self) -> Iterator[Entry]:
+        for bucket in range(self.bucket_count):
+            for _, page in self._bucket(bucket):
+                yield from page.entries
+
+    def lookup(self, key: Union[int, str]) -> List[int]:
+        """The locations of the rows whose key has the same hash as key, in order"""
+        hashed_key = hash_key(key)
+        pages = self._bucket(hashed_key)
+        return sorted(location for _, page in pages for h, location in page.entries if h == hashed_key)
@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from vgdb import VGDB_FILE_SUFFIX
+from vgdb.btree import MAX_KEY, BTree
+from vgdb.hash_table import HashTable
+from vgdb.sorted_keys import SortedKeys
+from vgdb.stats import like_prefix, prefix_successor
+from vgdb.trigrams import TrigramPostings
+from vgdb.where import Predicate, Where
+
+IndexEntry = Tuple[Union[int, str], int]
+
+
+class Index(ABC):
+    """Secondary index from the values of one column to the locations of the rows holding them
+
+    An index is stored in {table}.vgdb.{name}.{kind}, along with the end location of the table when it was
+    last saved, so an index that does not cover every row can be told apart and built again.
+    lookup_is_ordered tells whether lookup returns the locations in order of the column.
+    """
+
+    kind: str
+    types: Tuple[Type, ...]
+    lookup_is_ordered = True
+
+    def __init__(self, table_name: str, name: str, column: str, typ: Type) -> None:
+        self.name = name
+        self.column = column
+        self.type = typ
+        self.path = Path(f"{table_name}.{VGDB_FILE_SUFFIX}.{name}.{self.kind}")
+
+    @property
+    @abstractmethod
+    def end(self) -> Optional[int]:
+        """The end location of the table the index covers, or None if it is not read yet"""
+        ...
+
+    @abstractmethod
+    def build(self, entries: Iterable[IndexEntry], end: int) -> None:
+        ...
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Read the index, returning False if it is missing"""
+        ...
+
+    @abstractmethod
+    def insert_many(self, entries: Iterable[IndexEntry], end: int) -> None:
+        ...
+
+    @abstractmethod
+    def lookup(self, where: Where) -> Optional[Iterator[int]]:
+        """Locations of the rows that may satisfy where, or None if the index cannot answer it"""
+        ...
+
+    def ordered(self, descending: bool = False) -> Optional[Iterator[int]]:
+        """Locations of every row in order of the column, or None if the index does not keep an order"""
+        return None
+
+    def delete(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+class BTreeIndex(Index):
+    """Index on an int column, backed by a BTree
+
+    Answers equality and range predicates with locations in order of the column, and returns the whole
+    table in order of the column for ORDER BY.
+    """
+
+    kind = "btree"
+    types = (int,)
+
+    def __init__(self, table_name: str, name: str, column: str, typ: Type) -> None:
+        super().__init__(table_name, name, column, typ)
+        self._tree = BTree(self.path)
+        self._opened = False
+
+    @property
+    def end(self) -> Optional[int]:
+        return self._tree.end if self._opened else None
+
+    def build(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._tree.create(((int(key), location) for key, location in entries), end)
+        self._opened = True
+
+    def open(self) -> bool:
+        self._opened = self._tree.open()
+        return self._opened
+
+    def insert_many(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._tree.insert_many(((int(key), location) for key, location in entries), end)
+
+    def lookup(self, where: Where) -> Optional[Iterator[int]]:
+        value = int(where.value)
+        bounds: Dict[Predicate, Tuple[Optional[int], Optional[int]]] = {
+            Predicate.EQUALS: (value, value),
+            Predicate.LT: (None, value - 1),
+            Predicate.LTEQ: (None, value),
+            Predicate.GT: (value + 1, None),
+            Predicate.GTEQ: (value, None),
+        }
+        if where.predicate not in bounds:
+            return None
+        low, high = bounds[where.predicate]
+        if (low is not None and low > MAX_KEY) or (high is not None and high < 0):
+            return iter(())
+        low = None if low is None or low < 0 else low
+        high = None if high is None or high > MAX_KEY else high
+        return (location for _, location in self._tree.range(low, high))
+
+    def ordered(self, descending: bool = False) -> Optional[Iterator[int]]:
+        entries = self._tree.descending() if descending else self._tree.range()
+        return (location for _, location in entries)
+
+
+class HashIndex(Index):
+    """Index on a text or int column, backed by a HashTable
+
+    Answers equality predicates by reading a single bucket, whatever the size of the table.
+    """
+
+    kind = "hash"
+    types = (str, int)
+
+    def __init__(self, table_name: str, name: str, column: str, typ: Type) -> None:
+        super().__init__(table_name, name, column, typ)
+        self._table = HashTable(self.path)
+        self._opened = False
+
+    @property
+    def end(self) -> Optional[int]:
+        return self._table.end if self._opened else None
+
+    def build(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._table.create(((self.type(key), location) for key, location in entries), end)
+        self._opened = True
+
+    def open(self) -> bool:
+        self._opened = self._table.open()
+        return self._opened
+
+    def insert_many(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._table.insert_many(((self.type(key), location) for key, location in entries), end)
+
+    def lookup(self, where: Where) -> Optional[Iterator[int]]:
+        if where.predicate != Predicate.EQUALS:
+            return None
+        key = self.type(where.value)
+        if isinstance(key, int) and not 0 <= key <= MAX_KEY:
+            return iter(())
+        return iter(self._table.lookup(key))
+
+
+class SortedIndex(Index):
+    """Index on a text column, backed by SortedKeys
+
+    Answers LIKE patterns with a literal prefix, such as 'abc%', with the rows in the range of keys starting with
+    the prefix, so the rest of the pattern is only checked on them. Also answers equality and range predicates,
+    and returns the whole table in order of the column for ORDER BY.
+    """
+
+    kind = "sorted"
+    types = (str,)
+
+    def __init__(self, table_name: str, name: str, column: str, typ: Type) -> None:
+        super().__init__(table_name, name, column, typ)
+        self._keys = SortedKeys(self.path)
+        self._opened = False
+
+    @property
+    def end(self) -> Optional[int]:
+        return self._keys.end if self._opened else None
+
+    def build(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._keys.create(((str(key), location) for key, location in entries), end)
+        self._opened = True
+
+    def open(self) -> bool:
+        self._opened = self._keys.open()
+        return self._opened
+
+    def insert_many(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._keys.insert_many(((str(key), location) for key, location in entries), end)
+
+    def lookup(self, where: Where) -> Optional[Iterator[int]]:
+        value = str(where.value)
+        if where.predicate == Predicate.LIKE:
+            prefix = like_prefix(value)
+            if not prefix:
+                return None
+            entries = self._keys.range(prefix, prefix_successor(prefix), high_inclusive=False)
+        elif where.predicate == Predicate.EQUALS:
+            entries = self._keys.range(value, value)
+        elif where.predicate in (Predicate.LT, Predicate.LTEQ):
+            entries = self._keys.range(high=value, high_inclusive=where.predicate == Predicate.LTEQ)
+        elif where.predicate in (Predicate.GT, Predicate.GTEQ):
+            entries = self._keys.range(low=value, low_inclusive=where.predicate == Predicate.GTEQ)
+        else:
+            return None
+        return (location for _, location in entries)
+
+    def ordered(self, descending: bool = False) -> Optional[Iterator[int]]:
+        entries = self._keys.descending() if descending else iter(self._keys.entries)
+        return (location for _, location in entries)
+
+
+class TrigramIndex(Index):
+    """Index on a text column, backed by TrigramPostings
+
+    Answers LIKE patterns such as '%abc%', which no prefix helps with, with the rows whose value contains every
+    trigram of the literal parts of the pattern, so the pattern is only checked on them.
+    """
+
+    kind = "trigram"
+    types = (str,)
+    lookup_is_ordered = False
+
+    def __init__(self, table_name: str, name: str, column: str, typ: Type) -> None:
+        super().__init__(table_name, name, column, typ)
+        self._postings = TrigramPostings(self.path)
+        self._opened = False
+
+    @property
+    def end(self) -> Optional[int]:
+        return self._postings.end if self._opened else None
+
+    def build(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._postings.create(((str(key), location) for key, location in entries), end)
+        self._opened = True
+
+    def open(self) -> bool:
+        self._opened = self._postings.open()
+        return self._opened
+
+    def insert_many(self, entries: Iterable[IndexEntry], end: int) -> None:
+        self._postings.insert_many(((str(key), location) for key, location in entries), end)
+
+    def lookup(self, where: Where) -> Optional[Iterator[int]]:
+        if where.predicate != Predicate.LIKE:
+            return None
+        locations = self._postings.lookup(str(where.value))
+        return None if locations is None else iter(locations)
+
+
+index_kinds: Dict[str, Type[Index]] = {
+    BTreeIndex.kind: BTreeIndex,
+    HashIndex.kind: HashIndex,
+    SortedIndex.kind: SortedIndex,
+    TrigramIndex.kind: TrigramIndex,
+}
+
+
+def index_definitions_path(table_name: str) -> Path:
+    return Path(f"{table_name}.{VGDB_FILE_SUFFIX}.indexes")
+
+
+def read_index_definitions(table_name: str) -> List[Tuple[str, str, str]]:
+    """The (name, column, kind) of every index on a table, one per line of {table}.vgdb.indexes"""
+    try:
+        lines = index_definitions_path(table_name).read_text().splitlines()
+    except FileNotFoundError:
+        return []
+    definitions = []
+    for line in lines:
+        name, column, kind = line.split()
+        definitions.append((name, column, kind))
+    return definitions
+
+
+def write_index_definitions(table_name: str, indexes: Iterable[Index]) -> None:
+    path = index_definitions_path(table_name)
+    lines = [f"{index.name} {index.column} {index.kind}\n" for index in indexes]
+    if lines:
+        path.write_text("".join(lines))
+    elif path.exists():
+        path.unlink()
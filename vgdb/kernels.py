@@ -0,0 +1,42 @@
+import struct
+from typing import Any, List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+INT_SIZE = 4
+MAX_INT = (1 << 32) - 1
+
+
+def ints_from_bytes(data: bytes) -> Sequence[int]:
+    """The 4 byte little-endian ints packed in data, as an array over data if NumPy is installed"""
+    if numpy is not None:
+        return numpy.frombuffer(data, dtype="<u4")
+    return struct.unpack(f"<{len(data) // INT_SIZE}I", data)
+
+
+def take(column: Sequence[Any], indices: Optional[Sequence[int]] = None) -> Sequence[Any]:
+    """The cells of column at indices, or all of them, as Python values whether column is an array or not"""
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return (column if indices is None else column[indices]).tolist()
+    if indices is None:
+        return column
+    return [column[k] for k in indices]
+
+
+def smallest_ints(
+    columns: Sequence[Sequence[int]], selection: Optional[Sequence[int]], descending: Sequence[bool], limit: int
+) -> List[int]:
+    """Positions among the rows at selection, or all rows, of the first limit rows ordered by int columns
+
+    The first column decides, and ties keep the order of the rows. Only called when NumPy is installed.
+    """
+    keys = []
+    for column, reverse in zip(columns, descending):
+        key = numpy.asarray(column, dtype=numpy.int64)
+        if selection is not None:
+            key = key[numpy.asarray(selection, dtype=numpy.intp)]
+        keys.append(-key if reverse else key)
+    return numpy.lexsort(keys[::-1])[:limit].tolist()  # type: ignore
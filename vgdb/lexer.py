@@ -1,106 +1,60 @@
-from typing import Optional
+import re
+from typing import Dict, Iterator, Optional
 
 from vgdb.sql_token import Token, TokenType, keywords, operators
 
+TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+        (?P<word>[^\W\d]+)
+        |(?P<integer>\d+)
+        |'(?P<string>[^']*)'
+        |(?P<symbol><=|>=|!=|[=<>,();*?])
+    )?""",
+    re.VERBOSE,
+)
+symbols: Dict[str, TokenType] = {
+    **operators,
+    ",": TokenType.COMMA,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "?": TokenType.PARAMETER,
+}
 
-class Lexer:
-    def __init__(self, program: str):
-        self.program = program
-        self.pos = 0
-        self.current_character = ""
-
-    @property
-    def next_character(self) -> str:
-        if len(self.program) <= self.pos:
-            return ""
-        return self.program[self.pos]
-
-    def read_char(self) -> None:
-        self.current_character = self.next_character
-        self.pos += 1
 
-    def read_identifier(self) -> Optional[Token]:
-        start_position = self.pos
-        while self.next_character.isalpha() or self.next_character == "_":
-            self.read_char()
-        end_position = self.pos
-        identifier = self.program[start_position:end_position].lower()
-        keyword_token = keywords.get(identifier)
-        if keyword_token is None:
-            token_type = TokenType.IDENTIFIER
-        else:
-            token_type = keyword_token
-        self.read_char()
-        if len(identifier) == 0:
-            return None
-        return Token(token_type=token_type, literal=identifier)
-
-    def read_string(self) -> Token:
-        start_position = self.pos
-        while not self.next_character == "'":
-            if self.next_character == ";":
-                raise ValueError("String must end with a '")
-            self.read_char()
-        end_position = self.pos
-        self.read_char()
-        return Token(token_type=TokenType.STRING, literal=self.program[start_position:end_position])
+class Lexer:
+    """Splits a program into tokens, matching one token and the whitespace before it at a time
 
-    def read_integer(self) -> Token:
-        start_position = self.pos
-        while self.next_character.isnumeric():
-            self.read_char()
-        end_position = self.pos
-        self.read_char()
-        return Token(token_type=TokenType.INT, literal=int(self.program[start_position:end_position]))
+    Every kind of token is an alternative of TOKEN_PATTERN, so a program is scanned once from start to end.
+    Words are identifiers or keywords, lowercased, and may only contain letters and underscores.
+    """
 
-    def read_operator(self) -> Token:
-        start_position = self.pos
-        while self.next_character != " " and self.next_character != ";":
-            self.read_char()
-        end_position = self.pos
-        possible_operator = self.program[start_position:end_position]
-        token_type = operators.get(possible_operator)
-        if token_type is None:
-            raise ValueError(f"{possible_operator} is not a supported operator")
-        self.read_char()
-        return Token(token_type=token_type, literal=possible_operator)
+    def __init__(self, program: str):
+        self.program = program
+        self._tokens = self.tokens()
 
     def next_token(self) -> Optional[Token]:
-        if self.current_character == ";":
-            self.read_char()
-            return Token(token_type=TokenType.SEMICOLON, literal=";")
-        if self.current_character == ",":
-            self.read_char()
-            return Token(token_type=TokenType.COMMA, literal=",")
-        if self.current_character == "'":
-            self.read_char()
-            return self.next_token()
-        if self.current_character == ")":
-            self.read_char()
-            return Token(token_type=TokenType.RPAREN, literal=")")
-        if self.next_character == ")":
-            self.read_char()  # to not let the above one kick in
-            self.read_char()
-            return Token(token_type=TokenType.RPAREN, literal=")")
-        if self.next_character == " ":
-            self.read_char()
-            return self.next_token()
-        if self.next_character == "'":
-            self.read_char()
-            return self.read_string()
-        if self.next_character.isdigit():
-            return self.read_integer()
-        if (
-            self.next_character == "="
-            or self.next_character == ">"
-            or self.next_character == "<"
-            or self.next_character == "!"
-        ):
-            return self.read_operator()
-        if self.next_character == "(":
-            self.read_char()
-            return Token(token_type=TokenType.LPAREN, literal="(")
-        if self.next_character == "*":
-            self.read_char()
-            return Token(token_type=TokenType.STAR, literal="*")
-        return self.read_identifier()
+        return next(self._tokens, None)
+
+    def tokens(self) -> Iterator[Token]:
+        """The tokens of the program, raising ValueError at a character no token starts with"""
+        program = self.program
+        for match in TOKEN_PATTERN.finditer(program):
+            kind = match.lastgroup
+            if kind == "word":
+                word = match[kind].lower()
+                yield Token(keywords.get(word, TokenType.IDENTIFIER), word)
+            elif kind == "symbol":
+                yield Token(symbols[match[kind]], match[kind])
+            elif kind == "integer":
+                yield Token(TokenType.INT, int(match[kind]))
+            elif kind == "string":
+                yield Token(TokenType.STRING, match[kind])
+            elif match.end() < len(program):
+                pos = match.end()
+                if program[pos] == "'":
+                    raise ValueError("String must end with a '")
+                raise ValueError(f"unexpected character {program[pos]!r} at position {pos}")
+            else:
+                return
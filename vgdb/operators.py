@@ -0,0 +1,269 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from heapq import merge
+from itertools import chain, compress, islice
+from operator import itemgetter
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from vgdb import kernels
+from vgdb.batch import BATCH_SIZE, Batch, Column, batched_rows
+from vgdb.codec import Row
+from vgdb.statement import OrderBy, WhereStatement
+from vgdb.table import Table
+
+
+@dataclass
+class OperatorCounters:
+    """What an operator did while its batches were pulled, including the operators below it"""
+
+    rows_out: int = 0
+    seconds: float = 0.0
+    bytes_read: int = 0
+
+
+def format_where(where: WhereStatement) -> str:
+    terms = [f"{w.column} {w.predicate.value} {w.value!r}" for w in where.conditions]
+    conjunctions = [f" {c.value} " for c in where.conjunctions] + [""]
+    return "".join(term + conjunction for term, conjunction in zip(terms, conjunctions))
+
+
+class Operator(ABC):
+    """A node in the plan of a query, producing its rows as batches pulled from the operators below it
+
+    Once instrumented, every operator of the plan counts the rows it passes on, and the time spent and the
+    bytes of table data read while its batches are pulled.
+    """
+
+    children: List["Operator"]
+    counters: Optional[OperatorCounters] = None
+    _bytes_read: Callable[[], int]
+
+    @abstractmethod
+    def _batches(self) -> Iterator[Batch]:
+        ...
+
+    @abstractmethod
+    def describe(self) -> str:
+        """One line telling what the operator does"""
+        ...
+
+    def batches(self) -> Iterator[Batch]:
+        if self.counters is None:
+            return self._batches()
+        return self._counted(self.counters)
+
+    def _counted(self, counters: OperatorCounters) -> Iterator[Batch]:
+        start, bytes_read = perf_counter(), self._bytes_read()
+        batches = self._batches()
+        while True:
+            batch = next(batches, None)
+            counters.seconds += perf_counter() - start
+            counters.bytes_read += self._bytes_read() - bytes_read
+            if batch is None:
+                return
+            counters.rows_out += len(batch)
+            yield batch
+            start, bytes_read = perf_counter(), self._bytes_read()
+
+    def rows(self) -> Iterator[Sequence[Union[int, str]]]:
+        """The live rows of the batches as tuples"""
+        return chain.from_iterable(map(Batch.cells, self.batches()))
+
+    def instrument(self, bytes_read: Callable[[], int]) -> None:
+        """Count what this operator and the operators below it do, with bytes_read giving the bytes read so far"""
+        self.counters = OperatorCounters()
+        self._bytes_read = bytes_read
+        for child in self.children:
+            child.instrument(bytes_read)
+
+    def explain(self, depth: int = 0) -> List[str]:
+        """The lines describing the plan from this operator down, with the counters if it is instrumented
+
+        The time and bytes read on a line are those of the operator itself, not of the operators below it.
+        """
+        line = "  " * depth + self.describe()
+        if self.counters is not None:
+            children = [child.counters for child in self.children if child.counters is not None]
+            seconds = self.counters.seconds - sum(counters.seconds for counters in children)
+            bytes_read = self.counters.bytes_read - sum(counters.bytes_read for counters in children)
+            rows_in = f"rows in={sum(counters.rows_out for counters in children)} " if self.children else ""
+            line += (
+                f" ({rows_in}rows out={self.counters.rows_out} time={seconds * 1000:.3f} ms bytes read={bytes_read})"
+            )
+        return [line] + [line for child in self.children for line in child.explain(depth + 1)]
+
+
+class Scan(Operator):
+    """Read the columns of the rows of a table that satisfy where, with the filter pushed into the storage"""
+
+    def __init__(self, table: Table, columns: Optional[Sequence[int]] = None, where: Optional[WhereStatement] = None):
+        self.table = table
+        self.columns = columns
+        self.where = where
+        self.children = []
+
+    def _batches(self) -> Iterator[Batch]:
+        return self.table.all_batches(columns=self.columns, where=self.where)
+
+    def describe(self) -> str:
+        description = f"Scan {self.table.name} {self.table.storage_type}"
+        if self.columns is not None:
+            description += " columns " + ", ".join(self.table.column_names[i] for i in self.columns)
+        if self.where is not None:
+            description += f" where {format_where(self.where)}"
+        return description
+
+
+class IndexScan(Operator):
+    """Batch the rows of a table read through its indexes, of which only the columns at the indices in columns"""
+
+    def __init__(
+        self,
+        table: Table,
+        rows: Iterable[Row],
+        columns: Optional[Sequence[int]] = None,
+        index_names: Sequence[str] = (),
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        self.table = table
+        self._rows = rows
+        self.columns = columns
+        self.index_names = list(index_names)
+        self.batch_size = batch_size
+        self.children = []
+
+    def _batches(self) -> Iterator[Batch]:
+        return batched_rows(self._rows, self.table.width, self.batch_size, self.columns)
+
+    def describe(self) -> str:
+        description = f"Index scan {self.table.name} using {', '.join(self.index_names)}"
+        if self.columns is not None:
+            description += " columns " + ", ".join(self.table.column_names[i] for i in self.columns)
+        return description
+
+
+class Filter(Operator):
+    """Narrow the selection of each batch to the rows that satisfy where, dropping batches left empty"""
+
+    def __init__(self, child: Operator, table: Table, where: WhereStatement) -> None:
+        self.where = where
+        self.children = [child]
+        self._select = table.compile_batch_where(where)
+
+    def _batches(self) -> Iterator[Batch]:
+        for batch in self.children[0].batches():
+            selection = self._select(batch)
+            if selection:
+                yield Batch(columns=batch.columns, length=batch.length, selection=selection)
+
+    def describe(self) -> str:
+        return f"Filter {format_where(self.where)}"
+
+
+class Sort(Operator):
+    """Order the rows of the batches, keeping only the first limit rows if given
+
+    With a limit, the first limit rows seen so far are kept in order, and the rows of a batch whose key is
+    below the last of them, found without a Python loop over the batch, are sorted and merged into them. If
+    NumPy is installed and every sort column is an int column, the first limit rows of each batch by a stable
+    array sort are merged instead. Ties keep the order the rows came in. Without a limit, the rows are sorted
+    by Table.order_by, within the memory budget of the table.
+    """
+
+    def __init__(
+        self,
+        child: Operator,
+        table: Table,
+        order_by: OrderBy,
+        limit: Optional[int] = None,
+        columns: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.table = table
+        self.order_by = order_by
+        self.limit = limit
+        self.columns = columns
+        self.children = [child]
+
+    def _batches(self) -> Iterator[Batch]:
+        if self.limit is None:
+            rows: Iterable[Sequence[Union[int, str]]] = self.table.order_by(
+                self.children[0].rows(), self.order_by, columns=self.columns
+            )
+        else:
+            rows = self._top(self.limit)
+        return batched_rows(rows, self.table.width, columns=self.columns)
+
+    def _top(self, limit: int) -> List[Sequence[Union[int, str]]]:
+        key = self.table.sort_key(self.order_by)
+        indices = self.table.column_indices_from_names(self.order_by.columns) or []
+        by_ints = kernels.numpy is not None and all(self.table.types[i] == int for i in indices)
+        top: List[Tuple[Any, Sequence[Union[int, str]]]] = []
+        for batch in self.children[0].batches():
+            live = batch.live
+            if by_ints:
+                columns = [batch.columns[i] for i in indices]
+                order = kernels.smallest_ints(columns, batch.selection, self.order_by.descending, limit)  # type: ignore
+                rows = [batch.row(live[k]) for k in order]
+                entries = [(key(row), row) for row in rows]
+                if len(top) == limit:
+                    entries = [entry for entry in entries if entry[0] < top[-1][0]]
+            else:
+                keys = list(map(key, batch.cells()))
+                candidates: Iterable[int] = range(len(keys))
+                if len(top) == limit:
+                    candidates = compress(candidates, map(top[-1][0].__gt__, keys))
+                entries = sorted(((keys[k], batch.row(live[k])) for k in candidates), key=itemgetter(0))
+            if entries:
+                top = list(islice(merge(top, entries, key=itemgetter(0)), limit))
+        return [row for _, row in top]
+
+    def describe(self) -> str:
+        keys = ", ".join(
+            f"{column} desc" if descending else column
+            for column, descending in zip(self.order_by.columns, self.order_by.descending)
+        )
+        return f"Sort {keys}" + ("" if self.limit is None else f" top {self.limit}")
+
+
+class Limit(Operator):
+    """Pass on limit rows after skipping offset rows, and stop pulling batches once they are passed on"""
+
+    def __init__(self, child: Operator, limit: int, offset: Optional[int] = None) -> None:
+        self.limit = limit
+        self.offset = offset or 0
+        self.children = [child]
+
+    def _batches(self) -> Iterator[Batch]:
+        skip, remaining = self.offset, self.limit
+        for batch in self.children[0].batches():
+            live = batch.live
+            if skip >= len(live):
+                skip -= len(live)
+                continue
+            selection = list(live[skip : skip + remaining])
+            skip = 0
+            remaining -= len(selection)
+            yield Batch(columns=batch.columns, length=batch.length, selection=selection)
+            if remaining == 0:
+                return
+
+    def describe(self) -> str:
+        return f"Limit {self.limit}" + (f" offset {self.offset}" if self.offset else "")
+
+
+class Project(Operator):
+    """Reorder the columns of each batch into the selected columns of a table, without touching the cells"""
+
+    def __init__(self, child: Operator, table: Table, indices: Sequence[int]) -> None:
+        self.table = table
+        self.indices = list(indices)
+        self.children = [child]
+
+    def _batches(self) -> Iterator[Batch]:
+        for batch in self.children[0].batches():
+            columns: List[Optional[Column]] = [batch.columns[i] for i in self.indices]
+            yield Batch(columns=columns, length=batch.length, selection=batch.selection)
+
+    def describe(self) -> str:
+        return "Project " + ", ".join(self.table.column_names[i] for i in self.indices)
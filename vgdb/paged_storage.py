@@ -0,0 +1,235 @@
+import io
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from vgdb import VGDB_FILE_SUFFIX
+from vgdb.buffer_pool import BufferPool, DecodedPage, buffer_pool
+from vgdb.codec import Row, RowCodec, RowFilter
+from vgdb.stats import TableStats
+from vgdb.storage import FORMAT_MARKER, PAGED_FORMAT, StorageInterface, read_schema, write_schema
+from vgdb.zone_map import BlockFilter
+
+PAGE_SIZE = 4096
+PAGE_SIZE_STRUCT = struct.Struct("<I")
+PAGE_HEADER = struct.Struct("<HH")
+SLOT = struct.Struct("<HH")
+SLOT_BITS = 16
+
+
+def empty_page() -> bytearray:
+    page = bytearray(PAGE_SIZE)
+    PAGE_HEADER.pack_into(page, 0, 0, PAGE_SIZE)
+    return page
+
+
+def free_space(page: bytearray) -> int:
+    slot_count, free_end = PAGE_HEADER.unpack_from(page, 0)
+    return free_end - PAGE_HEADER.size - SLOT.size * slot_count
+
+
+def add_record(page: bytearray, record: bytes) -> None:
+    slot_count, free_end = PAGE_HEADER.unpack_from(page, 0)
+    offset = free_end - len(record)
+    page[offset:free_end] = record
+    SLOT.pack_into(page, PAGE_HEADER.size + SLOT.size * slot_count, offset, len(record))
+    PAGE_HEADER.pack_into(page, 0, slot_count + 1, offset)
+
+
+def page_records(page: bytes) -> Iterator[bytes]:
+    slot_count, _ = PAGE_HEADER.unpack_from(page, 0)
+    for slot in range(slot_count):
+        offset, length = SLOT.unpack_from(page, PAGE_HEADER.size + SLOT.size * slot)
+        yield page[offset : offset + length]
+
+
+class PagedStorage(StorageInterface):
+    """Storage layer for a table, laid out in fixed-size pages
+
+    Table file schema:
+    - Header page: FORMAT_MARKER, PAGED_FORMAT, the page size as a 4 byte int, the
+      column count, names and types as in PersistentStorage, and TableStats with the data pages as byte size
+    - Data pages: slot count and end of free space as 2 byte ints, followed by a slot directory
+      of (offset, length) pairs. Rows are encoded as in PersistentStorage and fill the page from the end.
+
+    The location of a row is its page number shifted left by SLOT_BITS, plus its slot in the page.
+    Reads go through a BufferPool holding decoded pages, which by default is shared by all paged tables.
+    """
+
+    def __init__(self, filename: str, columns: Sequence[Tuple[str, Type]], pool: Optional[BufferPool] = None) -> None:
+        self._file = Path(f"{filename}.{VGDB_FILE_SUFFIX}")
+        self._filename = filename
+        self._spec = tuple(type_ for name, type_ in columns)
+        self._columns_as_they_came = columns
+        self._columns: Dict[str, Type] = {name: type_ for name, type_ in columns}
+        self._codec = RowCodec(self._spec)
+        self._pool = buffer_pool if pool is None else pool
+        self._pool_key = str(self._file.resolve())
+        self._last_page: Optional[bytearray] = None
+        self._last_page_number = 0
+        self._bytes_read = 0
+        self._stats_offset = len(FORMAT_MARKER) + len(PAGED_FORMAT) + PAGE_SIZE_STRUCT.size + self._infer_header_bytes()
+        self.stats: Optional[TableStats] = None
+
+    @property
+    def buffer_pool(self) -> BufferPool:
+        return self._pool
+
+    def _header_page(self) -> bytes:
+        f = io.BytesIO()
+        f.write(FORMAT_MARKER)
+        f.write(PAGED_FORMAT)
+        f.write(PAGE_SIZE_STRUCT.pack(PAGE_SIZE))
+        write_schema(f, self._columns)
+        f.write(TableStats(types=self._spec).to_bytes())
+        header = f.getvalue()
+        if len(header) > PAGE_SIZE:
+            raise ValueError("table schema does not fit in the header page")
+        return header + bytes(PAGE_SIZE - len(header))
+
+    def persist(self) -> None:
+        try:
+            with self._file.open("bx") as f:
+                f.write(self._header_page())
+        except FileExistsError:
+            raise ValueError("File exists")
+        self.stats = TableStats(types=self._spec)
+
+    def _load_stats(self) -> None:
+        """Read the stats from the header page, and only trust them if they cover exactly the data pages"""
+        with self._file.open("rb") as f:
+            f.seek(self._stats_offset)
+            stats = TableStats.from_bytes(self._spec, f.read(TableStats.block_size(self._spec)))
+        self.stats = stats if stats.byte_size == (self.number_of_pages - 1) * PAGE_SIZE else None
+
+    def delete(self) -> None:
+        self.invalidate_cache()
+        self._file.unlink()
+
+    def invalidate_cache(self) -> None:
+        self._pool.invalidate_file(self._pool_key)
+        self._last_page = None
+        self._last_page_number = 0
+        if self._file.exists():
+            self._load_stats()
+
+    @classmethod
+    def from_file(cls, table_name: str) -> "PagedStorage":
+        with open(f"{table_name}.{VGDB_FILE_SUFFIX}", "rb") as f:
+            marker = f.read(len(FORMAT_MARKER) + len(PAGED_FORMAT))
+            if marker != FORMAT_MARKER + PAGED_FORMAT:
+                raise ValueError(f"table {table_name} is not stored in pages")
+            (page_size,) = PAGE_SIZE_STRUCT.unpack(f.read(PAGE_SIZE_STRUCT.size))
+            if page_size != PAGE_SIZE:
+                raise ValueError(f"unsupported page size {page_size}")
+            columns = read_schema(f)
+        s = PagedStorage(filename=table_name, columns=columns)
+        s._load_stats()
+        return s
+
+    @property
+    def number_of_pages(self) -> int:
+        return self._file.stat().st_size // PAGE_SIZE
+
+    def _read_page(self, page_number: int) -> bytes:
+        with self._file.open("rb") as f:
+            f.seek(page_number * PAGE_SIZE)
+            return f.read(PAGE_SIZE)
+
+    def _decode_page(self, page: bytes) -> DecodedPage:
+        rows = []
+        for record in page_records(page):
+            decoded, end = self._codec.decode(record)
+            if len(decoded) != 1 or end != len(record):
+                raise ValueError("corrupt record in page")
+            rows.append(tuple(decoded[0]))
+        return tuple(rows)
+
+    def insert(self, row: Sequence[Union[int, str]]) -> None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> List[int]:
+        """Add rows to the last page and new pages after it, and write all of these pages at once"""
+        records = [self._codec.encode(row) for row in rows]
+        for record in records:
+            if len(record) + SLOT.size > PAGE_SIZE - PAGE_HEADER.size:
+                raise ValueError(f"row of {len(record)} bytes does not fit in a page")
+        page_number = self.number_of_pages - 1
+        if page_number != self._last_page_number:
+            self._last_page = bytearray(self._read_page(page_number)) if page_number > 0 else None
+            self._last_page_number = page_number
+        first_page_number = page_number
+        pages: List[bytearray] = []
+        if self._last_page is not None:
+            pages.append(self._last_page)
+        else:
+            first_page_number += 1
+        locations = []
+        for record in records:
+            if not pages or free_space(pages[-1]) < len(record) + SLOT.size:
+                pages.append(empty_page())
+            slot_count, _ = PAGE_HEADER.unpack_from(pages[-1], 0)
+            locations.append((first_page_number + len(pages) - 1) << SLOT_BITS | slot_count)
+            add_record(pages[-1], record)
+        if not pages:
+            return []
+        with self._file.open("br+") as f:
+            if self.stats is not None:
+                self.stats.update(rows, (first_page_number + len(pages) - page_number - 1) * PAGE_SIZE)
+                f.seek(self._stats_offset)
+                f.write(self.stats.to_bytes())
+            f.seek(first_page_number * PAGE_SIZE)
+            f.write(b"".join(pages))
+        self._last_page = pages[-1]
+        self._last_page_number = first_page_number + len(pages) - 1
+        for page_offset in range(len(pages)):
+            self._pool.invalidate((self._pool_key, first_page_number + page_offset))
+        return locations
+
+    @property
+    def end_location(self) -> int:
+        """The location after the last row of the last page"""
+        page_number = self.number_of_pages - 1
+        if page_number == 0:
+            return 0
+        slot_count, _ = PAGE_HEADER.unpack_from(self._read_page(page_number), 0)
+        return page_number << SLOT_BITS | slot_count
+
+    def _page(self, page_number: int) -> DecodedPage:
+        return self._pool.get(
+            (self._pool_key, page_number), lambda: self._decode_page(self._read_scanned_page(page_number))
+        )
+
+    def _read_scanned_page(self, page_number: int) -> bytes:
+        page = self._read_page(page_number)
+        self._bytes_read += len(page)
+        return page
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes of pages read for rows, which counts only the pages missing from the buffer pool"""
+        return self._bytes_read
+
+    def read_rows_with_locations(self, columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Row]]:
+        for page_number in range(1, self.number_of_pages):
+            for slot, row in enumerate(self._page(page_number)):
+                yield page_number << SLOT_BITS | slot, list(row)
+
+    def read_rows_at(self, locations: Iterable[int], columns: Optional[Sequence[int]] = None) -> Iterator[Row]:
+        mask = (1 << SLOT_BITS) - 1
+        for location in locations:
+            yield list(self._page(location >> SLOT_BITS)[location & mask])
+
+    def read_rows(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Union[int, str]]]:
+        """Yield every row, from pages that are decoded whole and kept in the buffer pool"""
+        matches = None if row_filter is None else row_filter[1]
+        for page_number in range(1, self.number_of_pages):
+            for cells in self._page(page_number):
+                row = list(cells)
+                if matches is None or matches(row):
+                    yield row
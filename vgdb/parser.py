@@ -2,7 +2,17 @@ from typing import Iterator, List, Optional, Sequence, Tuple, Type, Union
 
 from vgdb.lexer import Lexer
 from vgdb.sql_token import Token, TokenType
-from vgdb.statement import Conjunction, CreateTable, Insert, OrderBy, Select, WhereStatement
+from vgdb.statement import (
+    Conjunction,
+    CreateIndex,
+    CreateTable,
+    Explain,
+    Insert,
+    OrderBy,
+    Parameter,
+    Select,
+    WhereStatement,
+)
 from vgdb.type import string_to_type
 from vgdb.where import Predicate, Where
 
@@ -12,6 +22,7 @@ class Parser:
         self.lexer = lexer
         self.current_token = self.lexer.next_token()
         self.next_token = self.lexer.next_token()
+        self.parameter_count = 0
 
     def advance_token(self) -> None:
         self.current_token = self.next_token
@@ -33,6 +44,12 @@ class Parser:
             raise ValueError(f"expected any of {token_types}, was {self.current_token}")
         return self.current_token
 
+    def parse_parameter(self) -> Parameter:
+        parameter = Parameter(self.parameter_count)
+        self.parameter_count += 1
+        self.advance_token()
+        return parameter
+
     def parse_full_where(self) -> WhereStatement:
         where: List[Where] = []
         conjunctions: List[Conjunction] = []
@@ -64,6 +81,8 @@ class Parser:
         )
         predicate = Predicate(token.literal)
         self.advance_token()
+        if self.current_token_is(TokenType.PARAMETER):
+            return Where(column=column, predicate=predicate, value=self.parse_parameter())
         if token.token_type == TokenType.LIKE:
             token = self.expect_token_is(TokenType.STRING)
         else:
@@ -149,9 +168,15 @@ class Parser:
         )
 
     def parse_insert_values(self) -> List[Union[str, int]]:
-        values = []
+        values: List[Union[str, int]] = []
         done = False
         while not done:
+            if self.current_token_is(TokenType.PARAMETER):
+                values.append(self.parse_parameter())
+                if self.current_token_is(TokenType.COMMA):
+                    self.advance_token()
+                    continue
+                break
             if self.current_token is None or not any(
                 self.current_token.token_type == type_ for type_ in (TokenType.STRING, TokenType.INT)
             ):
@@ -164,12 +189,22 @@ class Parser:
             value = self.current_token.literal
             values.append(value)
             self.advance_token()
-            if self.current_token.token_type == TokenType.COMMA:
+            if self.current_token_is(TokenType.COMMA):
                 self.advance_token()
             else:
                 done = True
         return values
 
+    def parse_insert_row(self) -> List[Union[str, int]]:
+        if self.current_token is None or not self.current_token.token_type == TokenType.LPAREN:
+            raise ValueError(f"expected LPAREN token, was {self.current_token}")
+        self.advance_token()
+        values = self.parse_insert_values()
+        if self.current_token is None or not self.current_token.token_type == TokenType.RPAREN:
+            raise ValueError(f"expected RPAREN token, was {self.current_token}")
+        self.advance_token()
+        return values
+
     def parse_insert(self) -> Insert:
         if self.current_token is None or not self.current_token.token_type == TokenType.INTO:
             raise ValueError(f"expected INTO token, was {self.current_token}")
@@ -181,16 +216,13 @@ class Parser:
         if self.current_token is None or not self.current_token.token_type == TokenType.VALUES:
             raise ValueError(f"expected VALUES token, was {self.current_token}")
         self.advance_token()
-        if self.current_token is None or not self.current_token.token_type == TokenType.LPAREN:
-            raise ValueError(f"expected LPAREN token, was {self.current_token}")
-        self.advance_token()
-        values = self.parse_insert_values()
-        if self.current_token is None or not self.current_token.token_type == TokenType.RPAREN:
-            raise ValueError(f"expected RPAREN token, was {self.current_token}")
-        self.advance_token()
+        rows = [self.parse_insert_row()]
+        while self.current_token_is(TokenType.COMMA):
+            self.advance_token()
+            rows.append(self.parse_insert_row())
         if self.current_token is not None and self.current_token.token_type is not TokenType.SEMICOLON:
             raise ValueError(f"Expected no more tokens, got {self.current_token}")
-        return Insert(values=values, table_name=table_name)
+        return Insert(values=rows, table_name=table_name)
 
     def parse_create_table_columns(self) -> List[Tuple[str, Type]]:
         columns: List[Tuple[str, Type]] = []
@@ -224,8 +256,44 @@ class Parser:
             raise ValueError(f"Expected no more tokens, got {self.current_token}")
         return CreateTable(table_name=table_name, columns=columns)
 
-    def parse(self) -> Iterator[Union[Select, Insert, CreateTable]]:
-        statement: Union[Select, Insert, CreateTable]
+    def parse_create_index(self) -> CreateIndex:
+        self.expect_token_is(TokenType.INDEX)
+        self.advance_token()
+        token = self.expect_token_is(TokenType.IDENTIFIER)
+        index_name = str(token.literal)
+        self.advance_token()
+        self.expect_token_is(TokenType.ON)
+        self.advance_token()
+        token = self.expect_token_is(TokenType.IDENTIFIER)
+        table_name = str(token.literal)
+        self.advance_token()
+        self.expect_token_is(TokenType.LPAREN)
+        self.advance_token()
+        token = self.expect_token_is(TokenType.IDENTIFIER)
+        column = str(token.literal)
+        self.advance_token()
+        self.expect_token_is(TokenType.RPAREN)
+        self.advance_token()
+        kind: Optional[str] = None
+        if self.current_token_is(TokenType.USING):
+            self.advance_token()
+            token = self.expect_token_is(TokenType.IDENTIFIER)
+            kind = str(token.literal)
+            self.advance_token()
+        if self.current_token is not None and self.current_token.token_type is not TokenType.SEMICOLON:
+            raise ValueError(f"Expected no more tokens, got {self.current_token}")
+        return CreateIndex(index_name=index_name, table_name=table_name, column=column, kind=kind)
+
+    def parse_explain(self) -> Explain:
+        analyze = self.current_token_is(TokenType.ANALYZE)
+        if analyze:
+            self.advance_token()
+        self.expect_token_is(TokenType.SELECT)
+        self.advance_token()
+        return Explain(select=self.parse_select(), analyze=analyze)
+
+    def parse(self) -> Iterator[Union[Select, Insert, CreateTable, CreateIndex, Explain]]:
+        statement: Union[Select, Insert, CreateTable, CreateIndex, Explain]
         while self.current_token is not None:
             if self.current_token.token_type == TokenType.SEMICOLON:
                 self.advance_token()
@@ -238,6 +306,12 @@ class Parser:
                 yield self.parse_insert()
             elif self.current_token.token_type == TokenType.CREATE:
                 self.advance_token()
-                yield self.parse_create_table()
+                if self.current_token_is(TokenType.INDEX):
+                    yield self.parse_create_index()
+                else:
+                    yield self.parse_create_table()
+            elif self.current_token.token_type == TokenType.EXPLAIN:
+                self.advance_token()
+                yield self.parse_explain()
             else:
                 raise ValueError(f"Statement beginning with token type {self.current_token} not supported")
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, List, Sequence, Tuple, Union
+
+from vgdb.lexer import Lexer
+from vgdb.parser import Parser
+from vgdb.statement import CreateIndex, CreateTable, Explain, Insert, Parameter, Select, WhereStatement
+
+DEFAULT_STATEMENT_CACHE_CAPACITY = 256
+
+ParsedStatement = Union[CreateTable, CreateIndex, Insert, Select, Explain]
+
+
+def has_parameters(statement: ParsedStatement) -> bool:
+    """Whether a statement still has ? placeholders in place of values"""
+    if isinstance(statement, Insert):
+        return any(isinstance(value, Parameter) for row in statement.values for value in row)
+    select = statement.select if isinstance(statement, Explain) else statement
+    if isinstance(select, Select) and select.where is not None:
+        return any(isinstance(w.value, Parameter) for w in select.where.conditions)
+    return False
+
+
+class PreparedStatement:
+    """A parsed statement whose ? placeholders are filled in by bind, without lexing or parsing it again"""
+
+    def __init__(self, statement: ParsedStatement, parameter_count: int) -> None:
+        self.statement = statement
+        self.parameter_count = parameter_count
+        self._insert_parameters: List[Tuple[int, int, int]] = []
+        if isinstance(statement, Insert):
+            self._insert_parameters = [
+                (i, j, value)
+                for i, row in enumerate(statement.values)
+                for j, value in enumerate(row)
+                if isinstance(value, Parameter)
+            ]
+
+    @classmethod
+    def from_sql(cls, sql: str) -> "PreparedStatement":
+        parser = Parser(lexer=Lexer(program=sql))
+        statements = list(parser.parse())
+        if len(statements) != 1:
+            raise ValueError(f"expected one statement to prepare, got {len(statements)}")
+        return cls(statements[0], parser.parameter_count)
+
+    def bind(self, parameters: Sequence[Union[int, str]] = ()) -> ParsedStatement:
+        """The statement with the placeholder at each position replaced by the parameter at that position"""
+        if len(parameters) != self.parameter_count:
+            raise ValueError(f"expected {self.parameter_count} parameters, got {len(parameters)}")
+        if self.parameter_count == 0:
+            return self.statement
+        for parameter in parameters:
+            if type(parameter) is int:
+                if not -2_147_483_648 <= parameter <= 2_147_483_647:
+                    raise ValueError("int value must be a 4 byte int, between -2 147 483 648 and 2 147 483 647")
+            elif type(parameter) is not str:
+                raise ValueError(f"parameter {parameter!r} is not an int or a string")
+        statement = self.statement
+        if isinstance(statement, Insert):
+            values = [list(row) for row in statement.values]
+            for i, j, position in self._insert_parameters:
+                values[i][j] = parameters[position]
+            return replace(statement, values=values)
+        if isinstance(statement, Explain):
+            return replace(statement, select=self._bind_select(statement.select, parameters))
+        if isinstance(statement, Select):
+            return self._bind_select(statement, parameters)
+        return statement
+
+    @staticmethod
+    def _bind_select(select: Select, parameters: Sequence[Union[int, str]]) -> Select:
+        if select.where is None:
+            return select
+        conditions = [
+            replace(w, value=parameters[w.value]) if isinstance(w.value, Parameter) else w
+            for w in select.where.conditions
+        ]
+        return replace(select, where=WhereStatement(conditions=conditions, conjunctions=select.where.conjunctions))
+
+
+class StatementCache:
+    """Size-bounded LRU cache of prepared statements, keyed by their SQL text"""
+
+    def __init__(self, capacity: int = DEFAULT_STATEMENT_CACHE_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("statement cache capacity must be at least one statement")
+        self.capacity = capacity
+        self._statements: "OrderedDict[str, PreparedStatement]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, sql: str) -> PreparedStatement:
+        statement = self._statements.get(sql)
+        if statement is not None:
+            self.hits += 1
+            self._statements.move_to_end(sql)
+            return statement
+        self.misses += 1
+        statement = PreparedStatement.from_sql(sql)
+        self._statements[sql] = statement
+        if len(self._statements) > self.capacity:
+            self._statements.popitem(last=False)
+        return statement
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "statements": len(self._statements),
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,122 @@
+import struct
+import sys
+from bisect import bisect_left
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from vgdb.storage import FORMAT_MARKER, NULL_BYTE
+
+SORTED_FORMAT = b"S"
+SORTED_HEADER = struct.Struct("<QQQ")
+LOCATION = struct.Struct("<Q")
+MIN_TAIL_TO_MERGE = 1024
+
+Entry = Tuple[str, int]
+
+
+class SortedKeys:
+    """Text keys and row locations in key order, stored in one file and searched in memory
+
+    The file holds FORMAT_MARKER and SORTED_FORMAT, the number of sorted entries, the size of their keys and the
+    end location of the table it covers; the locations of the sorted entries as 8 byte ints and their keys, each
+    null-terminated; and a tail of the entries inserted since, each a location followed by its key. The whole
+    file is read on open. Inserts are appended to the tail, and the file is written again in order once the tail
+    holds more than a quarter of the entries. The tail on open, and the entries of an insert, are added to the
+    entries with one sort, which only has to sort them and merge them into the run of entries already in order.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.entries: List[Entry] = []
+        self.end = 0
+        self._sorted_count = 0
+        self._keys_size = 0
+        self._tail_count = 0
+
+    def create(self, entries: Iterable[Entry], end: int) -> None:
+        self.entries = sorted(entries)
+        self.end = end
+        self._write()
+
+    def _header(self) -> bytes:
+        return FORMAT_MARKER + SORTED_FORMAT + SORTED_HEADER.pack(self._sorted_count, self._keys_size, self.end)
+
+    def _write(self) -> None:
+        keys = b"".join(key.encode("ascii") + NULL_BYTE for key, _ in self.entries)
+        locations = struct.pack(f"<{len(self.entries)}Q", *(location for _, location in self.entries))
+        self._sorted_count = len(self.entries)
+        self._keys_size = len(keys)
+        self._tail_count = 0
+        self._path.write_bytes(self._header() + locations + keys)
+
+    def open(self) -> bool:
+        """Read the entries, returning False if the file is missing or ends in the middle of an entry"""
+        try:
+            data = self._path.read_bytes()
+        except FileNotFoundError:
+            return False
+        prefix = FORMAT_MARKER + SORTED_FORMAT
+        if not data.startswith(prefix) or len(data) < len(prefix) + SORTED_HEADER.size:
+            return False
+        count, keys_size, end = SORTED_HEADER.unpack_from(data, len(prefix))
+        position = len(prefix) + SORTED_HEADER.size
+        if len(data) < position + count * LOCATION.size + keys_size:
+            return False
+        locations = struct.unpack_from(f"<{count}Q", data, position)
+        position += count * LOCATION.size
+        keys = data[position : position + keys_size].decode("ascii").split("\0")[:-1]
+        position += keys_size
+        if len(keys) != count:
+            return False
+        entries = list(zip(keys, locations))
+        tail = []
+        while position < len(data):
+            null_position = data.find(NULL_BYTE, position + LOCATION.size)
+            if null_position < 0:
+                return False
+            (location,) = LOCATION.unpack_from(data, position)
+            tail.append((data[position + LOCATION.size : null_position].decode("ascii"), location))
+            position = null_position + 1
+        entries += tail
+        entries.sort()
+        self.entries = entries
+        self.end = end
+        self._sorted_count, self._keys_size, self._tail_count = count, keys_size, len(tail)
+        return True
+
+    def insert_many(self, entries: Iterable[Entry], end: int) -> None:
+        new_entries = list(entries)
+        records = [LOCATION.pack(location) + key.encode("ascii") + NULL_BYTE for key, location in new_entries]
+        self.entries += new_entries
+        self.entries.sort()
+        self._tail_count += len(records)
+        self.end = end
+        if self._tail_count > max(MIN_TAIL_TO_MERGE, len(self.entries) // 4):
+            self._write()
+            return
+        with self._path.open("r+b") as f:
+            f.seek(0, 2)
+            f.write(b"".join(records))
+            f.seek(0)
+            f.write(self._header())
+
+    def range(
+        self,
+        low: Optional[str] = None,
+        high: Optional[str] = None,
+        low_inclusive: bool = True,
+        high_inclusive: bool = True,
+    ) -> List[Entry]:
+        """The entries with keys between low and high in order, where a missing bound is unbounded"""
+        start, stop = 0, len(self.entries)
+        if low is not None:
+            start = bisect_left(self.entries, (low, -1) if low_inclusive else (low, sys.maxsize))
+        if high is not None:
+            stop = bisect_left(self.entries, (high, sys.maxsize) if high_inclusive else (high, -1))
+        return self.entries[start:stop]
+
+    def descending(self) -> Iterator[Entry]:
+        """Yield the entries in descending key order, with the entries of each key still in location order"""
+        for _, group in groupby(reversed(self.entries), key=lambda entry: entry[0]):
+            yield from reversed(list(group))
@@ -35,6 +35,12 @@ class TokenType(Enum):
     DESC = "desc"
     LIKE = "like"
     OFFSET = "offset"
+    INDEX = "index"
+    ON = "on"
+    USING = "using"
+    EXPLAIN = "explain"
+    ANALYZE = "analyze"
+    PARAMETER = "?"
     SEMICOLON = ";"
 
 
@@ -58,6 +64,11 @@ keywords = {
     "desc": TokenType.DESC,
     "like": TokenType.LIKE,
     "offset": TokenType.OFFSET,
+    "index": TokenType.INDEX,
+    "on": TokenType.ON,
+    "using": TokenType.USING,
+    "explain": TokenType.EXPLAIN,
+    "analyze": TokenType.ANALYZE,
 }
 
 operators = {
@@ -10,9 +10,16 @@ class Statement:
     pass
 
 
+class Parameter(int):
+    """A ? placeholder in a statement, standing in for a value until the parameter at its position is bound"""
+
+    def __repr__(self) -> str:
+        return f"Parameter({int(self)})"
+
+
 @dataclass
 class Insert(Statement):
-    values: List[Union[int, str]]
+    values: List[List[Union[int, str]]]
     table_name: str
 
 
@@ -47,3 +54,17 @@ class Select(Statement):
 class CreateTable(Statement):
     table_name: str
     columns: List[Tuple[str, Type]]
+
+
+@dataclass
+class CreateIndex(Statement):
+    index_name: str
+    table_name: str
+    column: str
+    kind: Optional[str] = None
+
+
+@dataclass
+class Explain(Statement):
+    select: Select
+    analyze: bool = False
@@ -0,0 +1,138 @@
+import struct
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Type, Union
+
+from vgdb.where import Predicate
+
+TEXT_PREFIX_LENGTH = 16
+HAS_VALUES = 1
+MAX_IS_TRUNCATED = 2
+
+COUNTS_STRUCT = struct.Struct("<QQ")
+INT_STATS_STRUCT = struct.Struct("<BII")
+TEXT_STATS_STRUCT = struct.Struct(f"<B{TEXT_PREFIX_LENGTH}s{TEXT_PREFIX_LENGTH}s")
+
+
+def like_prefix(pattern: str) -> str:
+    """The literal part of a LIKE pattern before its first wildcard"""
+    for i, character in enumerate(pattern):
+        if character in "%_":
+            return pattern[:i]
+    return pattern
+
+
+def prefix_successor(prefix: str) -> str:
+    """The smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+@dataclass
+class ColumnStats:
+    """Smallest and largest value in a column
+
+    For text stored in a table header, min and max are cut to TEXT_PREFIX_LENGTH characters. A cut min is
+    still a lower bound, but a cut max is not an upper bound, so max_is_exact is then False.
+    """
+
+    min: Optional[Union[int, str]] = None
+    max: Optional[Union[int, str]] = None
+    max_is_exact: bool = True
+
+    def update(self, value: Union[int, str]) -> None:
+        if self.min is None or value < self.min:  # type: ignore
+            self.min = value
+        if self.max_is_exact and (self.max is None or value > self.max):  # type: ignore
+            self.max = value
+
+    def may_match(self, predicate: Predicate, value: Union[int, str]) -> bool:
+        """False if no value in the column can satisfy the predicate"""
+        low, high = self.min, self.max
+        if low is None or high is None:
+            return False
+        if predicate == Predicate.LIKE:
+            prefix = like_prefix(str(value))
+            if not prefix:
+                return True
+            return low < prefix_successor(prefix) and (not self.max_is_exact or high >= prefix)  # type: ignore
+        if predicate == Predicate.LT:
+            return low < value  # type: ignore
+        if predicate == Predicate.LTEQ:
+            return low <= value  # type: ignore
+        if not self.max_is_exact:
+            return True
+        if predicate == Predicate.EQUALS:
+            return low <= value <= high  # type: ignore
+        if predicate == Predicate.NOT_EQUALS:
+            return not low == high == value
+        if predicate == Predicate.GT:
+            return high > value  # type: ignore
+        if predicate == Predicate.GTEQ:
+            return high >= value  # type: ignore
+        return True
+
+
+@dataclass
+class TableStats:
+    """Row count, size of the row data in bytes, and per-column stats, maintained on insert
+
+    The stats serialize to a block of fixed size for a given schema, so a table header can be updated in place.
+    """
+
+    types: Sequence[Type]
+    row_count: int = 0
+    byte_size: int = 0
+    columns: List[ColumnStats] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.columns:
+            self.columns = [ColumnStats() for _ in self.types]
+
+    def update(self, rows: Sequence[Sequence[Union[int, str]]], byte_size: int) -> None:
+        for i, (column, typ) in enumerate(zip(self.columns, self.types)):
+            values = [typ(row[i]) for row in rows]
+            if values:
+                column.update(min(values))
+                column.update(max(values))
+        self.row_count += len(rows)
+        self.byte_size += byte_size
+
+    @staticmethod
+    def block_size(types: Sequence[Type]) -> int:
+        return COUNTS_STRUCT.size + sum(
+            INT_STATS_STRUCT.size if typ == int else TEXT_STATS_STRUCT.size for typ in types
+        )
+
+    def to_bytes(self) -> bytes:
+        parts = [COUNTS_STRUCT.pack(self.row_count, self.byte_size)]
+        for column, typ in zip(self.columns, self.types):
+            flags = HAS_VALUES if column.min is not None else 0
+            if typ == int:
+                parts.append(INT_STATS_STRUCT.pack(flags, column.min or 0, column.max or 0))
+            else:
+                low = str(column.min or "").encode("ascii")
+                high = str(column.max or "").encode("ascii")
+                if len(high) > TEXT_PREFIX_LENGTH or not column.max_is_exact:
+                    flags |= MAX_IS_TRUNCATED
+                parts.append(TEXT_STATS_STRUCT.pack(flags, low, high))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, types: Sequence[Type], data: bytes) -> "TableStats":
+        row_count, byte_size = COUNTS_STRUCT.unpack_from(data, 0)
+        position = COUNTS_STRUCT.size
+        columns = []
+        for typ in types:
+            column = ColumnStats()
+            if typ == int:
+                flags, low, high = INT_STATS_STRUCT.unpack_from(data, position)
+                position += INT_STATS_STRUCT.size
+            else:
+                flags, low_bytes, high_bytes = TEXT_STATS_STRUCT.unpack_from(data, position)
+                position += TEXT_STATS_STRUCT.size
+                low = low_bytes.rstrip(b"\x00").decode("ascii")
+                high = high_bytes.rstrip(b"\x00").decode("ascii")
+                column.max_is_exact = not flags & MAX_IS_TRUNCATED
+            if flags & HAS_VALUES:
+                column.min, column.max = low, high
+            columns.append(column)
+        return cls(types=types, row_count=row_count, byte_size=byte_size, columns=columns)
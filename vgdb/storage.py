@@ -1,15 +1,30 @@
 import io
+import mmap
+import os
 from abc import ABC, abstractmethod
+from itertools import accumulate, chain
 from pathlib import Path
-from typing import IO, Dict, Iterator, List, Sequence, Tuple, Type, Union
+from typing import IO, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Type, Union
 
 from vgdb import VGDB_FILE_SUFFIX
+from vgdb.batch import BATCH_SIZE, Batch, BatchFilter, batched_blocks, batched_rows
+from vgdb.codec import Row, RowCodec, RowFilter
+from vgdb.stats import TableStats
 from vgdb.type import string_to_type, type_to_string
+from vgdb.writer import TableWriter, WritePolicy
+from vgdb.zone_map import BlockFilter, ZoneMap
 
 NUMBER_OF_COLUMNS_INT_LENGTH = 1
 INT_BYTE_SIZE = 4
 NULL_BYTE = b"\x00"
 ENDIANNESS = "little"
+FORMAT_MARKER = b"\x00VGDB"
+PAGED_FORMAT = b"P"
+COLUMNAR_FORMAT = b"C"
+ROW_FORMAT = b"R"
+ROW_WINDOW_SIZE = 4096
+
+ReadMode = Literal["buffered", "mmap"]
 
 
 def read_null_terminated_string(f: IO[bytes]) -> str:
@@ -42,17 +57,106 @@ def read_int(f: IO[bytes]) -> int:
     return int.from_bytes(f.read(INT_BYTE_SIZE), byteorder=ENDIANNESS)
 
 
+def write_schema(f: IO[bytes], columns: Dict[str, Type]) -> None:
+    write_tiny_int(f, len(columns))
+    for column_name, column_type in columns.items():
+        f.write(string_to_null_terminated_byte_string(column_name))
+        f.write(string_to_null_terminated_byte_string(type_to_string[column_type]))
+
+
+def read_schema(f: IO[bytes]) -> List[Tuple[str, Type]]:
+    columns: List[Tuple[str, Type]] = []
+    number_of_columns = read_tiny_int(f)
+    for _ in range(number_of_columns):
+        column_name = read_null_terminated_string(f)
+        column_type = read_null_terminated_string(f)
+        columns.append((column_name, string_to_type[column_type]))
+    return columns
+
+
+def storage_format(table_name: str) -> Optional[bytes]:
+    """Return the format tag of a table file, or None for the original unpaged row format
+
+    The original format starts with the number of columns, which is never zero, so
+    a zero byte followed by the rest of FORMAT_MARKER is unambiguous.
+    """
+    with open(f"{table_name}.{VGDB_FILE_SUFFIX}", "rb") as f:
+        marker = f.read(len(FORMAT_MARKER) + 1)
+    if marker[: len(FORMAT_MARKER)] != FORMAT_MARKER:
+        return None
+    return marker[len(FORMAT_MARKER) :]
+
+
 class StorageInterface(ABC):
     _columns: Dict[str, Type]
+    _columns_as_they_came: Sequence[Tuple[str, Type]]
+    stats: Optional[TableStats] = None
+    blocks_skipped = 0
+
+    @property
+    @abstractmethod
+    def bytes_read(self) -> int:
+        """Number of bytes of table data that reads of rows have gone through"""
+        ...
 
     @abstractmethod
     def insert(self, row: Sequence[Union[int, str]]) -> None:
         ...
 
     @abstractmethod
-    def read_rows(self) -> Iterator[List[Union[int, str]]]:
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> List[int]:
+        """Insert rows as one statement, and return the location of each row"""
+        ...
+
+    @property
+    @abstractmethod
+    def end_location(self) -> int:
+        """A location that changes whenever rows are added, to tell whether an index covers every row"""
+        ...
+
+    @abstractmethod
+    def read_rows_with_locations(self, columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Row]]:
+        """Yield every row of the table along with its location, with cells not in columns possibly None"""
+        ...
+
+    @abstractmethod
+    def read_rows_at(self, locations: Iterable[int], columns: Optional[Sequence[int]] = None) -> Iterator[Row]:
+        """Yield the rows at locations, in the order given, with cells not in columns possibly None"""
         ...
 
+    @abstractmethod
+    def read_rows(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Union[int, str]]]:
+        """Yield every row of the table
+
+        If columns is given, only the cells at these indices are needed, and the others may be None.
+        If block_filter is given, storages with a zone map skip the blocks of rows whose stats it rejects,
+        and count them in blocks_skipped. Rows in other blocks are yielded whether they match or not.
+        If row_filter is given, only the rows it accepts are yielded. Storages that decode rows decode the
+        cells of its columns first, and the other cells only for the rows it accepts.
+        """
+        ...
+
+    def read_batches(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+        batch_size: int = BATCH_SIZE,
+        batch_filter: Optional[BatchFilter] = None,
+    ) -> Iterator[Batch]:
+        """Yield the rows read_rows yields, batch_size rows at a time as columns
+
+        batch_filter, if given, selects the same rows from a batch as row_filter accepts. Storages that read
+        columns may apply it to batches of the columns of row_filter instead of calling row_filter on each row.
+        """
+        rows = self.read_rows(columns=columns, block_filter=block_filter, row_filter=row_filter)
+        return batched_rows(rows, len(self._columns), batch_size, columns)
+
     @abstractmethod
     def persist(self) -> None:
         ...
@@ -61,6 +165,15 @@ class StorageInterface(ABC):
     def from_file(cls, table_name: str) -> "StorageInterface":
         ...
 
+    def flush(self) -> None:
+        pass
+
+    def delete(self) -> None:
+        pass
+
+    def invalidate_cache(self) -> None:
+        pass
+
     def _infer_header_bytes(self) -> int:
         s = NUMBER_OF_COLUMNS_INT_LENGTH
         for column_name, column_type in self._columns.items():
@@ -73,26 +186,98 @@ class PersistentStorage(StorageInterface):
     """Storage layer for a table
 
     Table file schema:
+    - FORMAT_MARKER and ROW_FORMAT
     - Number of columns as NUMBER_OF_COLUMNS_INT_LENGTH sized int
     - Sequence of column names and types. These strings are terminated by a null byte
+    - TableStats, as a block of fixed size that is updated in place
     - Sequence of rows
+
+    A ZoneMap of the rows is kept in {table}.vgdb.zones, and rebuilt from the rows if it is missing or out of date.
+
+    Files from before the stats were added have no FORMAT_MARKER, ROW_FORMAT or stats, and can still be
+    read and written. Their stats are unknown.
+
+    Inserted rows go through a TableWriter, which buffers them according to its WritePolicy.
+    With read_mode "mmap", scans decode straight from a memory map of the file, which is kept between scans
+    and only mapped again when the file has grown.
     """
 
-    def __init__(self, filename: str, columns: Sequence[Tuple[str, Type]]) -> None:
+    def __init__(
+        self,
+        filename: str,
+        columns: Sequence[Tuple[str, Type]],
+        write_policy: Optional[WritePolicy] = None,
+        read_mode: ReadMode = "buffered",
+        has_stats: bool = True,
+    ) -> None:
         self._file = Path(f"{filename}.{VGDB_FILE_SUFFIX}")
         self._filename = filename
         self._spec = tuple(type_ for name, type_ in columns)
         self._columns_as_they_came = columns
         self._columns: Dict[str, Type] = {name: type_ for name, type_ in columns}
-        self._header_bytes = self._infer_header_bytes()
+        self._has_stats = has_stats
+        self._stats_offset = len(FORMAT_MARKER) + len(ROW_FORMAT) + self._infer_header_bytes()
+        if has_stats:
+            self._header_bytes = self._stats_offset + TableStats.block_size(self._spec)
+        else:
+            self._header_bytes = self._infer_header_bytes()
+        self._codec = RowCodec(self._spec)
+        self._writer = TableWriter(self._file, write_policy, before_flush=self._write_metadata)
+        self._read_mode = read_mode
+        self._mapped: Optional[mmap.mmap] = None
+        self.stats: Optional[TableStats] = None
+        self._zones_file = Path(f"{self._file}.zones")
+        self._zone_map: Optional[ZoneMap] = None
+        self.blocks_skipped = 0
+
+    @property
+    def writer(self) -> TableWriter:
+        return self._writer
 
     def persist(self) -> None:
         self._error_if_exists()
         with self._file.open("wb") as f:
-            write_tiny_int(f, len(self._spec))
-            for column_name, column_type in self._columns.items():
-                f.write(string_to_null_terminated_byte_string(column_name))
-                f.write(string_to_null_terminated_byte_string(type_to_string[column_type]))
+            if self._has_stats:
+                f.write(FORMAT_MARKER)
+                f.write(ROW_FORMAT)
+            write_schema(f, self._columns)
+            if self._has_stats:
+                self.stats = TableStats(types=self._spec)
+                f.write(self.stats.to_bytes())
+
+    def _write_metadata(self, f: IO[bytes]) -> None:
+        """Write the stats and zone map describing rows that are about to be flushed"""
+        if self.stats is not None:
+            f.seek(self._stats_offset)
+            f.write(self.stats.to_bytes())
+        if self._zone_map is not None:
+            self._zone_map.save()
+
+    def _load_zones(self) -> ZoneMap:
+        self._writer.flush()
+        size = self._file.stat().st_size
+        zone_map = ZoneMap.load(self._zones_file, self._spec, self._header_bytes, size)
+        if zone_map is None:
+            zone_map = ZoneMap(self._zones_file, self._spec, self._header_bytes)
+            with self._file.open("rb") as f:
+                f.seek(self._header_bytes)
+                rows = list(self._codec.iter_file(f))
+            zone_map.add(rows, [len(self._codec.encode(row)) for row in rows])
+            zone_map.save()
+        self._zone_map = zone_map
+        return zone_map
+
+    def _load_stats(self) -> None:
+        """Read the stats from the header, and only trust them if they cover exactly the rows in the file"""
+        self.stats = None
+        if not self._has_stats:
+            return
+        with self._file.open("rb") as f:
+            f.seek(self._stats_offset)
+            stats = TableStats.from_bytes(self._spec, f.read(TableStats.block_size(self._spec)))
+            size = os.fstat(f.fileno()).st_size
+        if stats.byte_size == size - self._header_bytes:
+            self.stats = stats
 
     def _error_if_exists(self) -> None:
         try:
@@ -102,49 +287,162 @@ class PersistentStorage(StorageInterface):
             raise ValueError("File exists")
 
     def delete(self) -> None:
+        self._writer.discard()
+        self._mapped = None
+        self._zone_map = None
         self._file.unlink()
+        ZoneMap(self._zones_file, self._spec, self._header_bytes).delete()
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def invalidate_cache(self) -> None:
+        self._writer.flush()
+        self._mapped = None
+        self._zone_map = None
+        self._load_stats()
 
     @classmethod
-    def from_file(cls, table_name: str) -> "PersistentStorage":
-        columns: List[Tuple[str, Type]] = []
-        with open(f"{table_name}.{VGDB_FILE_SUFFIX}", "br+") as f:
-            number_of_columns = read_tiny_int(f)
-            for _ in range(number_of_columns):
-                column_name = read_null_terminated_string(f)
-                column_type = read_null_terminated_string(f)
-                columns.append((column_name, string_to_type[column_type]))
-        s = PersistentStorage(filename=table_name, columns=columns)
+    def from_file(
+        cls, table_name: str, write_policy: Optional[WritePolicy] = None, read_mode: ReadMode = "buffered"
+    ) -> "PersistentStorage":
+        with open(f"{table_name}.{VGDB_FILE_SUFFIX}", "rb") as f:
+            has_stats = f.read(len(FORMAT_MARKER) + len(ROW_FORMAT)) == FORMAT_MARKER + ROW_FORMAT
+            if not has_stats:
+                f.seek(0)
+            columns = read_schema(f)
+        s = PersistentStorage(
+            filename=table_name, columns=columns, write_policy=write_policy, read_mode=read_mode, has_stats=has_stats
+        )
+        s._load_stats()
         return s
 
     def insert(self, row: Sequence[Union[int, str]]) -> None:
-        values: List[bytes] = []
-        for cell, typ in zip(row, self._columns.values()):
-            if typ == str:
-                values.append(string_to_null_terminated_byte_string(str(cell)))
-            elif typ == int:
-                values.append(int(cell).to_bytes(INT_BYTE_SIZE, byteorder=ENDIANNESS))
-            else:
-                raise ValueError(f"{cell} is of unsupported type {typ}")
-        with self._file.open("ba+") as f:
-            for v in values:
-                f.write(v)
-
-    def read_rows(self) -> Iterator[List[Union[int, str]]]:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> List[int]:
+        records = [self._codec.encode(row) for row in rows]
+        sizes = [len(record) for record in records]
+        with self._writer.lock:
+            if self.stats is not None:
+                self.stats.update(rows, sum(sizes))
+            zone_map = self._load_zones() if self._zone_map is None else self._zone_map
+            locations = list(accumulate(sizes[:-1], initial=zone_map.end)) if rows else []
+            zone_map.add(rows, sizes)
+            self._writer.write(b"".join(records))
+            self._writer.end_statement()
+        return locations
+
+    @property
+    def end_location(self) -> int:
+        """The byte offset of the next row to be inserted"""
+        zone_map = self._load_zones() if self._zone_map is None else self._zone_map
+        return zone_map.end
+
+    @property
+    def bytes_read(self) -> int:
+        return self._codec.bytes_read
+
+    def read_rows_with_locations(self, columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Row]]:
+        self._writer.flush()
+        with self._file.open("rb") as f:
+            yield from self._codec.iter_file_with_positions(f, self._header_bytes)
+
+    def read_rows_at(self, locations: Iterable[int], columns: Optional[Sequence[int]] = None) -> Iterator[Row]:
+        """Yield the rows starting at the byte offsets in locations
+
+        Without a memory map, the file is read ROW_WINDOW_SIZE bytes at a time, so nearby rows share a read.
+        """
+        self._writer.flush()
+        if self._read_mode == "mmap":
+            mapped = self._map()
+            for location in locations:
+                row, _ = self._codec.decode_row(mapped, location) if mapped is not None else (None, 0)
+                if row is None:
+                    raise ValueError(f"no row at location {location}")
+                yield row
+            return
         with self._file.open("rb") as f:
-            f.read(self._header_bytes)
-            while len(f.peek(1)) > 0:  # type: ignore
-                row: List[Union[int, str]] = []
-                for typ in self._columns.values():
-                    if typ == str:
-                        s = read_null_terminated_string(f)
-                        row.append(s)
-                    elif typ == int:
-                        i = read_int(f)
-                        row.append(i)
-                    else:
-                        raise ValueError("unsupported type")
+            window_start = 0
+            window = b""
+            for location in locations:
+                row = None
+                if window_start <= location:
+                    row, _ = self._codec.decode_row(window, location - window_start)
+                window_size = ROW_WINDOW_SIZE
+                while row is None:
+                    f.seek(location)
+                    window_start = location
+                    window = f.read(window_size)
+                    row, end = self._codec.decode_row(window, 0)
+                    if row is None and len(window) < window_size:
+                        raise ValueError(f"no row at location {location}")
+                    window_size *= 2
                 yield row
 
+    def read_rows(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Union[int, str]]]:
+        return chain.from_iterable(self._read_blocks(columns, block_filter, row_filter))
+
+    def read_batches(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+        batch_size: int = BATCH_SIZE,
+        batch_filter: Optional[BatchFilter] = None,
+    ) -> Iterator[Batch]:
+        blocks = self._read_blocks(columns, block_filter, row_filter)
+        return batched_blocks(blocks, len(self._spec), batch_size, columns)
+
+    def _read_blocks(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Row]]:
+        """Yield the rows read_rows yields as the lists the codec decodes them in"""
+        self._writer.flush()
+        ranges: List[Tuple[int, Optional[int]]] = [(self._header_bytes, None)]
+        if block_filter is not None:
+            zone_map = self._zone_map
+            if zone_map is None or zone_map.end != self._file.stat().st_size:
+                zone_map = self._load_zones()
+            block_ranges, skipped = zone_map.ranges(block_filter)
+            self.blocks_skipped += skipped
+            ranges = list(block_ranges)
+        if self._read_mode == "mmap":
+            mapped = self._map()
+            if mapped is not None:
+                for start, end in ranges:
+                    end = len(mapped) if end is None else end
+                    yield from self._codec.iter_buffer_blocks(
+                        mapped, start, end, columns=columns, row_filter=row_filter
+                    )
+            return
+        with self._file.open("rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                size = None if end is None else end - start
+                yield from self._codec.iter_file_blocks(f, size=size, columns=columns, row_filter=row_filter)
+
+    def _map(self) -> Optional[mmap.mmap]:
+        """Map the file into memory, reusing the previous map if the file has not changed size
+
+        A map that is replaced stays valid for scans still using it, and is closed once they are done.
+        """
+        with self._file.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= self._header_bytes:
+                return None
+            if self._mapped is None or len(self._mapped) != size:
+                self._mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        return self._mapped
+
 
 class InMemoryStorage(StorageInterface):
     def __init__(self, name: str, columns: Sequence[Tuple[str, Type]]) -> None:
@@ -153,41 +451,74 @@ class InMemoryStorage(StorageInterface):
         self._columns_as_they_came = columns
         self._columns: Dict[str, Type] = {name: type_ for name, type_ in columns}
         self._header_bytes = self._infer_header_bytes()
+        self._codec = RowCodec(self._spec)
         self.file = io.BytesIO()
         self._length = 0
+        self.stats: TableStats = TableStats(types=self._spec)
 
     def insert(self, row: Sequence[Union[int, str]]) -> None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> List[int]:
+        records = [self._codec.encode(row) for row in rows]
+        sizes = [len(record) for record in records]
+        self.stats.update(rows, sum(sizes))
+        locations = list(accumulate(sizes[:-1], initial=self._length)) if rows else []
         f = self.file
         f.seek(self._length)
-        values: List[bytes] = []
-        for cell, typ in zip(row, self._columns.values()):
-            if typ == str:
-                values.append(string_to_null_terminated_byte_string(str(cell)))
-            elif typ == int:
-                values.append(int(cell).to_bytes(INT_BYTE_SIZE, byteorder=ENDIANNESS))
-            else:
-                raise ValueError(f"{cell} is of unsupported type {typ}")
-        for v in values:
-            f.write(v)
+        f.write(b"".join(records))
         self._length = f.tell()
-
-    def read_rows(self) -> Iterator[List[Union[int, str]]]:
-        f = self.file
-        f.seek(0)
-        f.read(self._header_bytes)
-        while f.tell() < self._length:
-            row: List[Union[int, str]] = []
-            for typ in self._columns.values():
-                if typ == str:
-                    s = read_null_terminated_string(f)
-                    row.append(s)
-                elif typ == int:
-                    i = read_int(f)
-                    row.append(i)
-                else:
-                    raise ValueError("unsupported type")
+        return locations
+
+    @property
+    def end_location(self) -> int:
+        return self._length
+
+    @property
+    def bytes_read(self) -> int:
+        return self._codec.bytes_read
+
+    def read_rows_with_locations(self, columns: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Row]]:
+        data = self.file.getvalue()
+        location = self._header_bytes
+        while location < self._length:
+            row, end = self._codec.decode_row(data, location, self._length)
+            if row is None:
+                raise ValueError("table data ends with an incomplete row")
+            yield location, row
+            location = end
+
+    def read_rows_at(self, locations: Iterable[int], columns: Optional[Sequence[int]] = None) -> Iterator[Row]:
+        data = self.file.getvalue()
+        for location in locations:
+            row, _ = self._codec.decode_row(data, location, self._length)
+            if row is None:
+                raise ValueError(f"no row at location {location}")
             yield row
 
+    def read_rows(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[List[Union[int, str]]]:
+        data = self.file.getvalue()
+        return self._codec.iter_buffer(data, self._header_bytes, self._length, columns=columns, row_filter=row_filter)
+
+    def read_batches(
+        self,
+        columns: Optional[Sequence[int]] = None,
+        block_filter: Optional[BlockFilter] = None,
+        row_filter: Optional[RowFilter] = None,
+        batch_size: int = BATCH_SIZE,
+        batch_filter: Optional[BatchFilter] = None,
+    ) -> Iterator[Batch]:
+        data = self.file.getvalue()
+        blocks = self._codec.iter_buffer_blocks(
+            data, self._header_bytes, self._length, columns=columns, row_filter=row_filter
+        )
+        return batched_blocks(blocks, len(self._spec), batch_size, columns)
+
     def persist(self) -> None:
         f = self.file
         f.seek(0)
@@ -196,6 +527,7 @@ class InMemoryStorage(StorageInterface):
             f.write(string_to_null_terminated_byte_string(column_name))
             f.write(string_to_null_terminated_byte_string(type_to_string[column_type]))
         self._length = self._header_bytes
+        self.stats = TableStats(types=self._spec)
 
     def from_file(cls, table_name: str) -> "InMemoryStorage":
         columns: List[Tuple[str, Type]] = []
@@ -1,40 +1,89 @@
 import re
-from functools import partial
-from itertools import islice
-from operator import and_, eq, ge, gt, itemgetter, le, lt, ne, or_
-from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Type, Union
+import struct
+from functools import lru_cache, partial
+from operator import eq, ge, gt, itemgetter, le, lt, ne
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Type, Union
 
-from vgdb.statement import Conjunction, OrderBy, WhereStatement
-from vgdb.storage import InMemoryStorage, PersistentStorage, StorageInterface
+from vgdb import kernels
+from vgdb.batch import Batch, BatchFilter
+from vgdb.codec import Row
+from vgdb.columnar_storage import ColumnarStorage
+from vgdb.external_sort import SORT_MEMORY_BUDGET, ExternalSort, SortCounters
+from vgdb.index import Index, index_kinds, read_index_definitions, write_index_definitions
+from vgdb.paged_storage import PagedStorage
+from vgdb.statement import Conjunction, OrderBy, Select, WhereStatement
+from vgdb.stats import ColumnStats, TableStats, like_prefix
+from vgdb.storage import (
+    COLUMNAR_FORMAT,
+    PAGED_FORMAT,
+    InMemoryStorage,
+    PersistentStorage,
+    ReadMode,
+    StorageInterface,
+    storage_format,
+)
 from vgdb.type import type_to_string
 from vgdb.where import Predicate, Where
+from vgdb.writer import WritePolicy
 
+INT_KEY_OFFSET = 1 << 63
+INT_KEY_MAX = (1 << 64) - 1
+INVERT_BYTES = bytes(255 - i for i in range(256))
 
-def create_sort_key(
-    indices: Sequence[int], descending: Sequence[bool]
-) -> Callable[[Sequence[Union[str, int]]], Tuple[Union[str, int], ...]]:
-    signs = [2 * int(b) - 1 for b in descending]
 
-    def sort_key(row: Sequence[Union[str, int]]) -> Tuple[Union[str, int], ...]:
-        return tuple(-sign * row[i] for i, sign in zip(indices, signs))
+def create_sort_key(
+    indices: Sequence[int], descending: Sequence[bool], types: Sequence[Type]
+) -> Callable[[Sequence[Union[str, int]]], Any]:
+    """Generate a function giving the sort key of a row for the columns at indices
 
-    return sort_key
+    If every column is ascending, the key is the tuple of the cells. Otherwise it is one bytes value that
+    sorts like the row: ints are offset to be unsigned and packed big-endian, text has null bytes escaped
+    and ends with two null bytes, and the bytes of descending columns are inverted.
+    """
+    if not any(descending):
+        return itemgetter(*indices)
+    namespace: Dict[str, Any] = {"pack": struct.Struct(">Q").pack, "INVERT_BYTES": INVERT_BYTES}
+    parts = []
+    for i, desc in zip(indices, descending):
+        if types[i] == int:
+            offset = INT_KEY_MAX - INT_KEY_OFFSET if desc else INT_KEY_OFFSET
+            parts.append(f"pack({offset} - row[{i}])" if desc else f"pack({offset} + row[{i}])")
+        else:
+            text = f"(row[{i}].encode('ascii').replace(b'\\x00', b'\\x00\\xff') + b'\\x00\\x00')"
+            parts.append(f"{text}.translate(INVERT_BYTES)" if desc else text)
+    exec(compile(f"def sort_key(row):\n    return {' + '.join(parts)}\n", "<sort key>", "exec"), namespace)
+    return namespace["sort_key"]  # type: ignore
 
 
+@lru_cache(maxsize=256)
 def create_like_key(like: str) -> Callable[[str], bool]:
-    pattern = "^"
-    for i in like:
-        if i == "%":
-            pattern += "(.*)"
-        elif i == "_":
-            pattern += "(.){1}"
-        else:
-            pattern += i
-    pattern += "$"
-    regex_rule = re.compile(pattern)
+    """A function telling whether a string matches the LIKE pattern like
+
+    Patterns without _ and with % only at the ends are answered with string methods, and any other
+    pattern with a regex, run only on strings starting with the literal prefix of the pattern.
+    Compiled patterns are cached across queries.
+    """
+    like = re.sub("%+", "%", like)
+    if "_" not in like:
+        literal = like.strip("%")
+        if "%" not in literal:
+            starts, ends = not like.startswith("%"), not like.endswith("%")
+            if not literal and like:
+                return lambda cell: True
+            if starts and ends:
+                return lambda cell: cell == literal
+            if starts:
+                return lambda cell: cell.startswith(literal)
+            if ends:
+                return lambda cell: cell.endswith(literal)
+            return lambda cell: literal in cell
+    pattern = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in like.rstrip("%"))
+    regex_rule = re.compile(pattern, re.DOTALL)
+    match = regex_rule.match if like.endswith("%") else regex_rule.fullmatch
+    prefix = like_prefix(like)
 
     def f(cell: str) -> bool:
-        return regex_rule.search(cell) is not None
+        return cell.startswith(prefix) and match(cell) is not None
 
     return f
 
@@ -47,21 +96,31 @@ predicate_map: Dict[Predicate, Callable[[Union[int, str], Union[int, str]], bool
     Predicate.LTEQ: ge,
     Predicate.GTEQ: le,
 }
-conjunction_map: Dict[Conjunction, Callable[[bool, bool], bool]] = {
-    Conjunction.AND: and_,
-    Conjunction.OR: or_,
+operator_source: Dict[Predicate, str] = {
+    Predicate.EQUALS: "==",
+    Predicate.NOT_EQUALS: "!=",
+    Predicate.LT: "<",
+    Predicate.GT: ">",
+    Predicate.LTEQ: "<=",
+    Predicate.GTEQ: ">=",
 }
 
 
-def reduce_booleans_using_conjunctions(
-    predicate_results: List[bool], conjunctions: Sequence[Callable[[bool, bool], bool]]
-) -> bool:
-    if len(predicate_results) == 1:
-        return predicate_results[0]
-    combined_value = conjunctions[0](predicate_results[0], predicate_results[1])
-    return reduce_booleans_using_conjunctions(
-        predicate_results=[combined_value] + predicate_results[2:], conjunctions=conjunctions[1:]
-    )
+def conjunction_groups(conjunctions: Sequence[Conjunction]) -> List[List[int]]:
+    """Indices of the conditions joined by AND, in the groups that are joined by OR
+
+    AND binds tighter than OR, so a OR b AND c is a OR (b AND c), giving [[0], [1, 2]].
+    """
+    groups = [[0]]
+    for i, conjunction in enumerate(conjunctions, start=1):
+        if conjunction == Conjunction.OR:
+            groups.append([i])
+        else:
+            groups[-1].append(i)
+    return groups
+
+
+StorageType = Literal["in-memory", "persistent", "paged", "columnar"]
 
 
 class Table:
@@ -69,29 +128,207 @@ class Table:
         self,
         name: str,
         columns: Sequence[Tuple[str, Type]],
-        storage_type: Literal["in-memory", "persistent"] = "persistent",
+        storage_type: StorageType = "persistent",
+        write_policy: Optional[WritePolicy] = None,
+        read_mode: ReadMode = "buffered",
+        storage: Optional[StorageInterface] = None,
     ) -> None:
         self.name = name
+        self.storage_type = storage_type
         self._file: StorageInterface
-        if storage_type == "in-memory":
+        if storage is not None:
+            self._file = storage
+        elif storage_type == "in-memory":
             self._file = InMemoryStorage(name=name, columns=columns)
         elif storage_type == "persistent":
-            self._file = PersistentStorage(filename=name, columns=columns)
+            self._file = PersistentStorage(
+                filename=name, columns=columns, write_policy=write_policy, read_mode=read_mode
+            )
+        elif storage_type == "paged":
+            self._file = PagedStorage(filename=name, columns=columns)
+        elif storage_type == "columnar":
+            self._file = ColumnarStorage(filename=name, columns=columns)
+        else:
+            raise ValueError(f"unknown storage type {storage_type}")
         self._columns: Dict[str, Type] = {name: typ for name, typ in columns}
         self._types = tuple(self._columns.values())
+        self.indexes: Dict[str, Index] = {}
+        self.indexes_used: List[str] = []
+        self._load_indexes()
+        self.sort_memory_budget = SORT_MEMORY_BUDGET
+        self.sort_counters = SortCounters()
 
     def persist(self) -> None:
         try:
             self._file.persist()
         except FileExistsError:
             raise ValueError(f"table {self.name} already exists")
+        if self.storage_type != "in-memory":
+            write_index_definitions(self.name, [])
+        self.indexes = {}
+
+    def delete(self) -> None:
+        """Delete the table and its indexes"""
+        for index in self.indexes.values():
+            index.delete()
+        write_index_definitions(self.name, [])
+        self.indexes = {}
+        self._file.delete()
+
+    def _load_indexes(self) -> None:
+        self.indexes = {}
+        if self.storage_type == "in-memory":
+            return
+        for name, column, kind in read_index_definitions(self.name):
+            column_type = self._types[self.column_name_to_index(column)]
+            self.indexes[name] = index_kinds[kind](self.name, name, column, column_type)
+
+    def create_index(self, name: str, column: str, kind: Optional[str] = None) -> None:
+        """Create an index of the given kind on column and build it from the rows in the table
+
+        Without a kind, the first kind in index_kinds that supports the type of the column is used.
+        """
+        if self.storage_type == "in-memory":
+            raise ValueError("indexes can only be created on tables stored in files")
+        if name in self.indexes:
+            raise ValueError(f"index {name} already exists on table {self.name}")
+        column_type = self._types[self.column_name_to_index(column)]
+        if kind is None:
+            kind = next(k for k, index_class in index_kinds.items() if column_type in index_class.types)
+        index_class = index_kinds.get(kind)
+        if index_class is None:
+            raise ValueError(f"unknown index kind {kind}, expected one of {', '.join(index_kinds)}")
+        if column_type not in index_class.types:
+            raise ValueError(f"{kind} index cannot be created on {type_to_string[column_type]} column {column}")
+        index = index_class(self.name, name, column, column_type)
+        self._build_index(index)
+        self.indexes[name] = index
+        write_index_definitions(self.name, self.indexes.values())
+
+    def _build_index(self, index: Index) -> None:
+        column_index = self.column_name_to_index(index.column)
+        end = self._file.end_location
+        rows = self._file.read_rows_with_locations(columns=[column_index])
+        index.build(((row[column_index], location) for location, row in rows), end)
+
+    def _fresh_index(self, index: Index) -> Index:
+        """Return index, after building it again if it is missing or does not cover every row"""
+        if index.end is None:
+            index.open()
+        if index.end != self._file.end_location:
+            self._build_index(index)
+        return index
+
+    def indexed_rows(
+        self, where: Optional[WhereStatement], order_by: Optional[OrderBy], columns: Optional[Sequence[int]] = None
+    ) -> Optional[Tuple[Iterator[Row], bool]]:
+        """Read the rows through an index, if one applies to where or order_by
+
+        Returns the rows, which include every row satisfying where, and whether they are already in the order
+        of order_by. Indexes on conditions of where are preferred: the locations of every equality condition
+        with an index are intersected, and otherwise a range condition with an index is used.
+        Returns None if no index applies, and the table should be scanned instead.
+        The names of the indexes read are left in indexes_used.
+        """
+        self.indexes_used = []
+        if not self.indexes:
+            return None
+        order_column: Optional[str] = None
+        descending = False
+        if order_by is not None and len(order_by.columns) == 1:
+            order_column, descending = order_by.columns[0], order_by.descending[0]
+        if where is not None and all(c == Conjunction.AND for c in where.conjunctions):
+            lookups = []
+            for w in where.conditions:
+                for index in self.indexes.values():
+                    if index.column == w.column:
+                        locations = self._fresh_index(index).lookup(w)
+                        if locations is not None:
+                            lookups.append((w, index, locations))
+            equalities: Dict[int, Iterator[int]] = {}
+            for w, index, locations in lookups:
+                if w.predicate == Predicate.EQUALS and id(w) not in equalities:
+                    equalities[id(w)] = locations
+                    self.indexes_used.append(index.name)
+            if len(equalities) > 1:
+                common = set.intersection(*(set(locations) for locations in equalities.values()))
+                return self._file.read_rows_at(sorted(common), columns=columns), False
+            if lookups:
+                w, index, locations = min(lookups, key=lambda lookup: lookup[0].predicate != Predicate.EQUALS)
+                self.indexes_used = [index.name]
+                in_order = (
+                    index.lookup_is_ordered
+                    and index.column == order_column
+                    and (not descending or w.predicate == Predicate.EQUALS)
+                )
+                if in_order:
+                    return self._file.read_rows_at(locations, columns=columns), True
+                return self._file.read_rows_at(sorted(locations), columns=columns), False
+        if order_column is not None:
+            for index in self.indexes.values():
+                if index.column == order_column:
+                    locations = self._fresh_index(index).ordered(descending=descending)
+                    if locations is not None:
+                        self.indexes_used = [index.name]
+                        return self._file.read_rows_at(locations, columns=columns), True
+        return None
 
     @property
     def columns(self) -> str:
         return "(" + ", ".join(f"{name} {type_to_string[typ]}" for name, typ in self._columns.items()) + ")"
 
-    def all_rows(self) -> Iterator[List[Union[int, str]]]:
-        return self._file.read_rows()
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def width(self) -> int:
+        return len(self._types)
+
+    @property
+    def types(self) -> Tuple[Type, ...]:
+        return self._types
+
+    def all_rows(
+        self, columns: Optional[Sequence[int]] = None, where: Optional[WhereStatement] = None
+    ) -> Iterator[List[Union[int, str]]]:
+        """Yield every row, where only the cells at the indices in columns are guaranteed to be read
+
+        If where is given, only the rows satisfying it are yielded. Blocks of rows that the zone map shows
+        cannot satisfy it are skipped, and the cells of the other columns are only decoded for rows satisfying it.
+        """
+        if where is None:
+            return self._file.read_rows(columns=columns)
+        where_columns = [self.column_name_to_index(w.column) for w in where.conditions]
+        return self._file.read_rows(
+            columns=columns,
+            block_filter=self.stats_filter(where),
+            row_filter=(where_columns, self.compile_where(where)),
+        )
+
+    def all_batches(
+        self, columns: Optional[Sequence[int]] = None, where: Optional[WhereStatement] = None
+    ) -> Iterator[Batch]:
+        """Yield the rows all_rows yields, in batches of columns"""
+        if where is None:
+            return self._file.read_batches(columns=columns)
+        where_columns = [self.column_name_to_index(w.column) for w in where.conditions]
+        return self._file.read_batches(
+            columns=columns,
+            block_filter=self.stats_filter(where),
+            row_filter=(where_columns, self.compile_where(where)),
+            batch_filter=self.compile_batch_where(where),
+        )
+
+    @property
+    def blocks_skipped(self) -> int:
+        """Number of blocks of rows that scans have skipped using the zone map"""
+        return self._file.blocks_skipped
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes of table data that reads of rows have gone through"""
+        return self._file.bytes_read
 
     def column_name_to_index(self, c: str) -> int:
         try:
@@ -110,6 +347,17 @@ class Table:
             column_indices_to_select.append(j)
         return column_indices_to_select
 
+    def referenced_column_indices(self, select: Select) -> Optional[List[int]]:
+        """Indices of the columns select reads, or None if it reads all of them"""
+        if select.columns == ["all"]:
+            return None
+        names = set(select.columns)
+        if select.where is not None:
+            names.update(w.column for w in select.where.conditions)
+        if select.order_by is not None:
+            names.update(select.order_by.columns)
+        return sorted(self.column_name_to_index(name) for name in names)
+
     def create_predicate(self, where: Where) -> Callable[[Union[int, str]], bool]:
         column_index = self.column_name_to_index(where.column)
         type_of_column = self._types[column_index]
@@ -125,47 +373,192 @@ class Table:
             predicate = partial(predicate_operator, where_value_typed)
         return predicate
 
-    def where(self, rows: Iterable[List[Union[str, int]]], where: WhereStatement) -> Iterator[List[Union[str, int]]]:
-        conjunctions = [conjunction_map[c] for c in where.conjunctions]
-        predicates = [self.create_predicate(w) for w in where.conditions]
-        column_indices = [self.column_name_to_index(w.column) for w in where.conditions]
-        getters = [itemgetter(c) for c in column_indices]
-        for row in rows:
-            predicate_results = [predicate(getter(row)) for getter, predicate in zip(getters, predicates)]
-            should_yield = reduce_booleans_using_conjunctions(
-                predicate_results=predicate_results, conjunctions=conjunctions
-            )
-            if should_yield:
-                yield row
+    def _where_source(
+        self, where: WhereStatement, cell: Callable[[int], str], vectorized: bool = False
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Python source of an expression for where, and the names it uses, where cell(i) reads column i
+
+        If vectorized, the cells are arrays, and the expression combines their comparisons into a mask.
+        """
+        namespace: Dict[str, Any] = {}
+        terms = []
+        for i, w in enumerate(where.conditions):
+            column_index = self.column_name_to_index(w.column)
+            if w.predicate == Predicate.LIKE:
+                namespace[f"like_{i}"] = self.create_predicate(w)
+                terms.append(f"like_{i}({cell(column_index)})")
+            else:
+                namespace[f"value_{i}"] = self._types[column_index](w.value)
+                terms.append(f"({cell(column_index)} {operator_source[w.predicate]} value_{i})")
+        and_, or_ = (" & ", " | ") if vectorized else (" and ", " or ")
+        groups = conjunction_groups(where.conjunctions)
+        return or_.join("(" + and_.join(terms[i] for i in group) + ")" for group in groups), namespace
+
+    def compile_where(self, where: WhereStatement) -> Callable[[Sequence[Union[int, str]]], bool]:
+        """Generate one function telling whether a row satisfies where
+
+        The conditions are combined with and/or as in SQL, so evaluation stops as soon as the result is known,
+        and column indices and constants of the column types are bound into the generated code.
+        """
+        condition, namespace = self._where_source(where, lambda i: f"row[{i}]")
+        exec(compile(f"def matches(row):\n    return {condition}\n", "<where>", "exec"), namespace)
+        return namespace["matches"]  # type: ignore
+
+    def compile_batch_where(self, where: WhereStatement) -> BatchFilter:
+        """Generate one function giving the selection of the live rows of a batch that satisfy where
+
+        The condition is generated as in compile_where, but reads the cells from the columns of the batch.
+        If NumPy is installed and every condition compares an int column to an int, the comparisons run on
+        whole columns as arrays and are combined as boolean masks instead.
+        """
+        columns = sorted({self.column_name_to_index(w.column) for w in where.conditions})
+        if kernels.numpy is not None and all(self._is_int_comparison(w) for w in where.conditions):
+            condition, namespace = self._where_source(where, lambda i: f"column_{i}", vectorized=True)
+            namespace.update(asarray=kernels.numpy.asarray, flatnonzero=kernels.numpy.flatnonzero)
+            lines = [
+                "def select(batch):",
+                "    live = None if batch.selection is None else asarray(batch.selection, dtype='intp')",
+            ]
+            for i in columns:
+                lines += [
+                    f"    column_{i} = asarray(batch.columns[{i}])",
+                    "    if live is not None:",
+                    f"        column_{i} = column_{i}[live]",
+                ]
+            lines += [
+                f"    selected = flatnonzero({condition})",
+                "    return (selected if live is None else live[selected]).tolist()",
+            ]
+        else:
+            condition, namespace = self._where_source(where, lambda i: f"column_{i}[k]")
+            namespace["take"] = kernels.take
+            lines = ["def select(batch):"]
+            lines += [f"    column_{i} = take(batch.columns[{i}])" for i in columns]
+            lines.append(f"    return [k for k in batch.live if {condition}]")
+        exec(compile("\n".join(lines), "<batch where>", "exec"), namespace)
+        return namespace["select"]  # type: ignore
+
+    def _is_int_comparison(self, w: Where) -> bool:
+        if w.predicate == Predicate.LIKE or self._types[self.column_name_to_index(w.column)] != int:
+            return False
+        return 0 <= int(w.value) <= kernels.MAX_INT
 
-    def order_by(self, rows: Iterable[List[Union[str, int]]], order_by: OrderBy) -> Iterator[List[Union[str, int]]]:
+    def sort_key(self, order_by: OrderBy) -> Callable[[Sequence[Union[int, str]]], Any]:
         order_by_indices = self.column_indices_from_names(order_by.columns)
         if order_by_indices is None:
             raise ValueError(
                 f"incorrect columns {', '.join(order_by.columns)} in ORDER BY: table has schema {self.columns}"
             )
-        sort_key = create_sort_key(order_by_indices, order_by.descending)
-        return iter(sorted(rows, key=sort_key))
-
-    def limit(
-        self, rows: Iterable[List[Union[str, int]]], limit: int, offset: Optional[int]
-    ) -> Iterator[List[Union[str, int]]]:
-        if offset is None:
-            return islice(rows, limit)
-        else:
-            return islice(rows, offset, limit + offset)
+        return create_sort_key(order_by_indices, order_by.descending, self._types)
+
+    def order_by(
+        self,
+        rows: Iterable[Sequence[Union[str, int]]],
+        order_by: OrderBy,
+        columns: Optional[Sequence[int]] = None,
+    ) -> Iterator[Sequence[Union[str, int]]]:
+        """Sort rows by an ExternalSort within sort_memory_budget, counted in sort_counters
+
+        Only the cells at the indices in columns are kept. A sort with a limit is done by the Sort operator.
+        """
+        sort_key = self.sort_key(order_by)
+        external_sort = ExternalSort(
+            self._types, sort_key, columns=columns, memory_budget=self.sort_memory_budget, counters=self.sort_counters
+        )
+        return external_sort.sort(rows)
+
+    @property
+    def stats(self) -> Optional[TableStats]:
+        """Stats maintained by the storage on insert, or None if they are not known for the table file"""
+        return self._file.stats
+
+    @property
+    def row_count(self) -> Optional[int]:
+        return None if self.stats is None else self.stats.row_count
+
+    @property
+    def byte_size(self) -> Optional[int]:
+        return None if self.stats is None else self.stats.byte_size
+
+    def column_stats(self, column: str) -> Optional[ColumnStats]:
+        if self.stats is None:
+            return None
+        return self.stats.columns[self.column_name_to_index(column)]
+
+    def stats_filter(self, where: WhereStatement) -> Callable[[TableStats], bool]:
+        """Create a function telling whether any row summarized by some stats can satisfy where"""
+        for w in where.conditions:
+            self.create_predicate(w)
+        conditions = []
+        for w in where.conditions:
+            column_index = self.column_name_to_index(w.column)
+            value = str(w.value) if w.predicate == Predicate.LIKE else self._types[column_index](w.value)
+            conditions.append((column_index, w.predicate, value))
+        groups = [[conditions[i] for i in group] for group in conjunction_groups(where.conjunctions)]
+
+        def may_match(stats: TableStats) -> bool:
+            return any(all(stats.columns[i].may_match(predicate, value) for i, predicate, value in g) for g in groups)
+
+        return may_match
+
+    def may_match(self, where: WhereStatement) -> bool:
+        """False if the stats show that no row can satisfy where, without reading any rows"""
+        stats_filter = self.stats_filter(where)
+        return self.stats is None or stats_filter(self.stats)
 
     def insert(self, row: Sequence[Union[int, str]]) -> None:
-        self._file.insert(row)
+        """Insert row as one statement, which is durable according to the write policy of the table"""
+        self.insert_many([row])
+
+    def insert_many(self, rows: Sequence[Sequence[Union[int, str]]]) -> None:
+        """Insert rows as one statement, encoding all of them before anything is written, and update the indexes"""
+        if not self.indexes:
+            self._file.insert_many(rows)
+            return
+        indexes = [self._fresh_index(index) for index in self.indexes.values()]
+        locations = self._file.insert_many(rows)
+        end = self._file.end_location
+        for index in indexes:
+            i = self.column_name_to_index(index.column)
+            index.insert_many(((row[i], location) for row, location in zip(rows, locations)), end)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def invalidate_cache(self) -> None:
+        """Forget anything cached from the table file, after it may have been changed by someone else"""
+        self._file.invalidate_cache()
+        self._load_indexes()
 
     @classmethod
-    def from_file(cls, name: str, storage_type: Literal["in-memory", "persistent"] = "persistent") -> "Table":
-        s = PersistentStorage.from_file(name)
-        rows = list(s.read_rows())
+    def from_file(
+        cls,
+        name: str,
+        storage_type: Optional[StorageType] = None,
+        write_policy: Optional[WritePolicy] = None,
+        read_mode: ReadMode = "buffered",
+    ) -> "Table":
+        """Open the table stored in the file for name, reading only the header of the file
+
+        By default the table keeps the storage type of the file, while "in-memory" loads a copy of its rows.
+        """
+        s: StorageInterface
+        file_storage_type: StorageType
+        file_format = storage_format(name)
+        if file_format == PAGED_FORMAT:
+            s = PagedStorage.from_file(name)
+            file_storage_type = "paged"
+        elif file_format == COLUMNAR_FORMAT:
+            s = ColumnarStorage.from_file(name)
+            file_storage_type = "columnar"
+        else:
+            s = PersistentStorage.from_file(name, write_policy=write_policy, read_mode=read_mode)
+            file_storage_type = "persistent"
         columns = s._columns_as_they_came
-        t = Table(name, columns, storage_type=storage_type)
+        if storage_type is None or storage_type == file_storage_type:
+            return Table(name, columns, storage_type=file_storage_type, storage=s)
+        t = Table(name, columns, storage_type=storage_type, write_policy=write_policy, read_mode=read_mode)
         if storage_type == "in-memory":
             t.persist()
-            for row in rows:
-                t.insert(row)
+            t.insert_many(list(s.read_rows()))
         return t
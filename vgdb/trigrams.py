@@ -0,0 +1,170 @@
+import re
+import struct
+from collections import defaultdict
+from pathlib import Path
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+
+from vgdb.storage import FORMAT_MARKER, NULL_BYTE
+
+TRIGRAM_FORMAT = b"T"
+TRIGRAM_HEADER = struct.Struct("<QQQQ")
+DIRECTORY_ENTRY = struct.Struct("<3sQQ")
+LOCATION = struct.Struct("<Q")
+MIN_TAIL_TO_MERGE = 1024
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def like_trigrams(pattern: str) -> Set[str]:
+    """The trigrams of the literal parts of a LIKE pattern, which every matching string contains"""
+    return set().union(*(trigrams(part) for part in re.split("[%_]", pattern)))
+
+
+class TrigramPostings:
+    """Inverted index from the trigrams of text keys to the locations of the rows holding them
+
+    The file holds FORMAT_MARKER and TRIGRAM_FORMAT, the number of trigrams, the number of locations in their
+    posting lists, the number of keys and the end location of the table it covers; a directory of every
+    trigram with the offset and length of its posting list; the posting lists as 8 byte locations in order;
+    and a tail of the keys inserted since, each a location followed by its null-terminated key. Only the
+    header, the directory and the tail are read on open, and a posting list is read from the file when a lookup
+    needs it. The file is written again once the tail holds more than a quarter of the keys.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._directory: Dict[str, Tuple[int, int]] = {}
+        self._postings_start = 0
+        self._tail: DefaultDict[str, List[int]] = defaultdict(list)
+        self._location_count = 0
+        self.key_count = 0
+        self._tail_count = 0
+        self.end = 0
+
+    def create(self, entries: Iterable[Tuple[str, int]], end: int) -> None:
+        postings: DefaultDict[str, List[int]] = defaultdict(list)
+        key_count = 0
+        for key, location in entries:
+            for trigram in trigrams(key):
+                postings[trigram].append(location)
+            key_count += 1
+        self.end = end
+        self._write(postings, key_count)
+
+    def _header(self) -> bytes:
+        counts = (len(self._directory), self._location_count, self.key_count, self.end)
+        return FORMAT_MARKER + TRIGRAM_FORMAT + TRIGRAM_HEADER.pack(*counts)
+
+    def _write(self, postings: Dict[str, List[int]], key_count: int) -> None:
+        directory = {}
+        lists = []
+        offset = 0
+        for trigram in sorted(postings):
+            locations = sorted(postings[trigram])
+            directory[trigram] = (offset, len(locations))
+            lists.append(struct.pack(f"<{len(locations)}Q", *locations))
+            offset += len(locations) * LOCATION.size
+        self._directory = directory
+        self._location_count = offset // LOCATION.size
+        self.key_count = key_count
+        self._tail = defaultdict(list)
+        self._tail_count = 0
+        entries = b"".join(DIRECTORY_ENTRY.pack(t.encode("ascii"), *directory[t]) for t in directory)
+        header = self._header()
+        self._postings_start = len(header) + len(entries)
+        self._path.write_bytes(header + entries + b"".join(lists))
+
+    def open(self) -> bool:
+        """Read the directory and tail, returning False if the file is missing or ends in the middle of an entry"""
+        prefix = FORMAT_MARKER + TRIGRAM_FORMAT
+        try:
+            with self._path.open("rb") as f:
+                header = f.read(len(prefix) + TRIGRAM_HEADER.size)
+                if not header.startswith(prefix) or len(header) < len(prefix) + TRIGRAM_HEADER.size:
+                    return False
+                trigram_count, location_count, key_count, end = TRIGRAM_HEADER.unpack_from(header, len(prefix))
+                directory_data = f.read(trigram_count * DIRECTORY_ENTRY.size)
+                postings_start = len(header) + len(directory_data)
+                if len(directory_data) < trigram_count * DIRECTORY_ENTRY.size:
+                    return False
+                postings_end = postings_start + location_count * LOCATION.size
+                if self._path.stat().st_size < postings_end:
+                    return False
+                f.seek(postings_end)
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        directory = {}
+        for trigram, offset, count in DIRECTORY_ENTRY.iter_unpack(directory_data):
+            directory[trigram.decode("ascii")] = (offset, count)
+        tail: DefaultDict[str, List[int]] = defaultdict(list)
+        tail_count = 0
+        position = 0
+        while position < len(data):
+            null_position = data.find(NULL_BYTE, position + LOCATION.size)
+            if null_position < 0:
+                return False
+            (location,) = LOCATION.unpack_from(data, position)
+            for trigram in trigrams(data[position + LOCATION.size : null_position].decode("ascii")):
+                tail[trigram].append(location)
+            position = null_position + 1
+            tail_count += 1
+        self._directory = directory
+        self._postings_start = postings_start
+        self._tail = tail
+        self._location_count = location_count
+        self.key_count, self._tail_count, self.end = key_count, tail_count, end
+        return True
+
+    def _read_postings(self, wanted: Iterable[str]) -> Dict[str, List[int]]:
+        """The locations of the rows whose key contains each trigram in wanted, reading each posting list it has"""
+        postings = {trigram: list(self._tail.get(trigram, [])) for trigram in wanted}
+        stored = [trigram for trigram in postings if trigram in self._directory]
+        if not stored:
+            return postings
+        with self._path.open("rb") as f:
+            for trigram in stored:
+                offset, count = self._directory[trigram]
+                f.seek(self._postings_start + offset)
+                postings[trigram][:0] = struct.unpack(f"<{count}Q", f.read(count * LOCATION.size))
+        return postings
+
+    def postings(self, trigram: str) -> List[int]:
+        """The locations of the rows whose key contains trigram, in order"""
+        return self._read_postings([trigram])[trigram]
+
+    def insert_many(self, entries: Iterable[Tuple[str, int]], end: int) -> None:
+        records = []
+        for key, location in entries:
+            for trigram in trigrams(key):
+                self._tail[trigram].append(location)
+            records.append(LOCATION.pack(location) + key.encode("ascii") + NULL_BYTE)
+        self._tail_count += len(records)
+        self.key_count += len(records)
+        self.end = end
+        if self._tail_count > max(MIN_TAIL_TO_MERGE, self.key_count // 4):
+            self._write(self._read_postings(sorted({*self._directory, *self._tail})), self.key_count)
+            return
+        with self._path.open("r+b") as f:
+            f.seek(0, 2)
+            f.write(b"".join(records))
+            f.seek(0)
+            f.write(self._header())
+
+    def lookup(self, pattern: str) -> Optional[List[int]]:
+        """The locations of the rows whose key contains every trigram of the literal parts of a LIKE pattern
+
+        Returns None if the literal parts are too short to hold a trigram.
+        """
+        wanted = like_trigrams(pattern)
+        if not wanted:
+            return None
+        lists = sorted(self._read_postings(wanted).values(), key=len)
+        common = set(lists[0])
+        for locations in lists[1:]:
+            if not common:
+                break
+            common.intersection_update(locations)
+        return sorted(common)
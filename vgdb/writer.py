@@ -0,0 +1,145 @@
+import atexit
+import os
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import IO, Callable, List, Optional, Set
+
+
+class Durability(Enum):
+    STATEMENT = "statement"
+    GROUP = "group"
+    FSYNC = "fsync"
+
+
+@dataclass
+class WritePolicy:
+    """When buffered rows are written to the table file
+
+    - STATEMENT: at the end of every statement, so rows reach the operating system before the statement returns
+    - GROUP: group commit, once group_commit_ms has passed since the last flush or max_buffer_bytes are buffered
+    - FSYNC: as GROUP, and every flush is followed by an fsync
+
+    Under GROUP and FSYNC, rows are also flushed by a timer group_commit_ms after they are buffered, so they
+    reach the table file within that window even if no other statement or read comes along.
+    """
+
+    durability: Durability = Durability.STATEMENT
+    group_commit_ms: float = 10.0
+    max_buffer_bytes: int = 1 << 16
+
+
+class TableWriter:
+    """Long-lived appender for a table file
+
+    Encoded rows are buffered in memory and written with a single write per flush, through a file
+    that stays open between statements. Writers holding buffered rows are flushed at interpreter exit.
+
+    If before_flush is given, every flush first calls it with the open table file, so headers and other
+    metadata are updated before the rows they describe.
+
+    Group commit timers flush from another thread while holding lock, which callers also hold while they
+    update metadata along with the rows they write.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        policy: Optional[WritePolicy] = None,
+        before_flush: Optional[Callable[[IO[bytes]], None]] = None,
+    ) -> None:
+        self._path = path
+        self.policy = WritePolicy() if policy is None else policy
+        self._before_flush = before_flush
+        self._file: Optional[IO[bytes]] = None
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self.lock = threading.RLock()
+        self.flushes = 0
+        self.fsyncs = 0
+        self.bytes_written = 0
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    def write(self, record: bytes) -> None:
+        with self.lock:
+            self._buffer.append(record)
+            self._buffered_bytes += len(record)
+            _writers_with_buffered_rows.add(self)
+            if self._buffered_bytes >= self.policy.max_buffer_bytes:
+                self.flush()
+            elif self.policy.durability != Durability.STATEMENT and self._timer is None:
+                self._timer = threading.Timer(self.policy.group_commit_ms / 1000, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def end_statement(self) -> None:
+        if self.policy.durability == Durability.STATEMENT:
+            self.flush()
+        elif (time.monotonic() - self._last_flush) * 1000 >= self.policy.group_commit_ms:
+            self.flush()
+
+    def _flush_on_timer(self) -> None:
+        with self.lock:
+            self._timer = None
+            self.flush()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> None:
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = self._path.open("ab" if self._before_flush is None else "r+b")
+        if self._before_flush is not None:
+            self._before_flush(self._file)
+        data = b"".join(self._buffer)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._file.flush()
+        if self.policy.durability == Durability.FSYNC:
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        self._buffer = []
+        self._buffered_bytes = 0
+        self.flushes += 1
+        self.bytes_written += len(data)
+        _writers_with_buffered_rows.discard(self)
+
+    def close(self) -> None:
+        with self.lock:
+            self._cancel_timer()
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        with self.lock:
+            self._buffer = []
+            self._buffered_bytes = 0
+            _writers_with_buffered_rows.discard(self)
+            self.close()
+
+
+_writers_with_buffered_rows: Set[TableWriter] = set()
+
+
+@atexit.register
+def flush_all_writers() -> None:
+    for writer in list(_writers_with_buffered_rows):
+        writer.flush()
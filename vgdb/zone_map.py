@@ -0,0 +1,114 @@
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, Type, Union
+
+from vgdb.stats import TableStats
+
+ROWS_PER_BLOCK = 1024
+START_STRUCT = struct.Struct("<Q")
+
+BlockFilter = Callable[[TableStats], bool]
+
+
+@dataclass
+class Zone:
+    """A block of consecutive rows, starting at position start
+
+    stats.byte_size is the number of positions the block spans, so the next block starts at end.
+    """
+
+    start: int
+    stats: TableStats
+
+    @property
+    def end(self) -> int:
+        return self.start + self.stats.byte_size
+
+
+class ZoneMap:
+    """Min/max summaries of every block of ROWS_PER_BLOCK consecutive rows in a table
+
+    Positions are whatever the storage addresses rows by: byte offsets in a row file, or row numbers in a
+    columnar table. The zones are stored in a file next to the table, one record of fixed size per block,
+    and only the records of blocks that changed are written again.
+    """
+
+    def __init__(self, path: Path, types: Sequence[Type], start: int, rows_per_block: int = ROWS_PER_BLOCK) -> None:
+        self._path = path
+        self._types = tuple(types)
+        self._start = start
+        self.rows_per_block = rows_per_block
+        self.zones: List[Zone] = []
+        self._dirty_from = 0
+
+    @property
+    def record_size(self) -> int:
+        return START_STRUCT.size + TableStats.block_size(self._types)
+
+    @property
+    def end(self) -> int:
+        return self.zones[-1].end if self.zones else self._start
+
+    def add(self, rows: Sequence[Sequence[Union[int, str]]], sizes: Sequence[int]) -> None:
+        """Add rows after the last block, where sizes are the number of positions each row takes"""
+        if not rows:
+            return
+        if self.zones:
+            self._dirty_from = min(self._dirty_from, len(self.zones) - 1)
+        i = 0
+        while i < len(rows):
+            if not self.zones or self.zones[-1].stats.row_count >= self.rows_per_block:
+                self.zones.append(Zone(start=self.end, stats=TableStats(types=self._types)))
+            room = self.rows_per_block - self.zones[-1].stats.row_count
+            self.zones[-1].stats.update(rows[i : i + room], sum(sizes[i : i + room]))
+            i += room
+
+    def save(self) -> None:
+        """Write the records of the blocks changed since the last save"""
+        data = b"".join(
+            START_STRUCT.pack(zone.start) + zone.stats.to_bytes() for zone in self.zones[self._dirty_from :]
+        )
+        with self._path.open("r+b" if self._path.exists() else "wb") as f:
+            f.seek(self._dirty_from * self.record_size)
+            f.write(data)
+            f.truncate()
+        self._dirty_from = len(self.zones)
+
+    def delete(self) -> None:
+        if self._path.exists():
+            self._path.unlink()
+
+    @classmethod
+    def load(cls, path: Path, types: Sequence[Type], start: int, end: int) -> Optional["ZoneMap"]:
+        """Read the zones from path, or None if they are missing or do not tile the positions [start, end)"""
+        zone_map = cls(path, types, start)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if len(data) % zone_map.record_size:
+            return None
+        for offset in range(0, len(data), zone_map.record_size):
+            (zone_start,) = START_STRUCT.unpack_from(data, offset)
+            stats = TableStats.from_bytes(types, data[offset + START_STRUCT.size : offset + zone_map.record_size])
+            if zone_start != zone_map.end:
+                return None
+            zone_map.zones.append(Zone(start=zone_start, stats=stats))
+        if zone_map.end != end:
+            return None
+        zone_map._dirty_from = len(zone_map.zones)
+        return zone_map
+
+    def ranges(self, block_filter: BlockFilter) -> Tuple[List[Tuple[int, int]], int]:
+        """The [start, end) ranges of consecutive blocks that block_filter accepts, and the number of skipped blocks"""
+        ranges: List[Tuple[int, int]] = []
+        skipped = 0
+        for zone in self.zones:
+            if not block_filter(zone.stats):
+                skipped += 1
+            elif ranges and ranges[-1][1] == zone.start:
+                ranges[-1] = (ranges[-1][0], zone.end)
+            else:
+                ranges.append((zone.start, zone.end))
+        return ranges, skipped